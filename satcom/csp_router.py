@@ -0,0 +1,238 @@
+import asyncio
+import collections
+import inspect
+import threading
+
+from satcom import csp_v1
+
+N_ADDRESSES = 1 << csp_v1.FLEN_ADDR
+N_PORTS = 1 << csp_v1.FLEN_PORT
+N_PRIORITIES = 1 << csp_v1.FLEN_PRIO
+
+
+class _Binding():
+    __slots__ = ('handler', 'destination', 'port')
+
+    def __init__(self, handler, destination, port):
+        self.handler = handler
+        self.destination = destination
+        self.port = port
+
+    def specificity(self) -> int:
+        """Number of wildcards, bindings with fewer take precedence"""
+        return (self.destination is None) + (self.port is None)
+
+
+class CSPRouter():
+    """Dispatches CSP packets to handlers by destination address and port
+
+    Handlers are looked up in a 32x64 table indexed by the route key of
+    the packet header, so routing a packet costs the same regardless of
+    how many handlers are bound. Routed packets wait in one queue per
+    priority and are dispatched strictly by priority, 0 (critical) first.
+    At most queue_size packets may wait for each address and port, and
+    further packets are dropped until they drain.
+
+    Handlers receive a csp_v1.Packet. dispatch runs them in the calling
+    thread, or submits them to executor if one is given; dispatch_async
+    and serve additionally await coroutine handlers on the event loop,
+    with up to max_in_flight handlers running on the executor at once.
+    Exceptions raised by handlers are counted in failed, and the latest
+    is kept in last_error; the packet is dropped and dispatch goes on.
+    The router itself is not thread-safe: route and dispatch should be
+    called from one thread, or one event loop.
+    """
+
+    def __init__(self, queue_size: int = 64, executor=None, max_in_flight: int = 16):
+        if queue_size < 1:
+            raise ValueError('queue_size must be positive')
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be positive')
+        self.queue_size = queue_size
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self._bindings = []
+        self._table = [None] * (N_ADDRESSES * N_PORTS)
+        self._queued = [0] * (N_ADDRESSES * N_PORTS)
+        self._queues = [collections.deque() for _ in range(N_PRIORITIES)]
+        self._ready = None
+
+        self.routed = 0
+        self.dropped = 0
+        self.unrouted = 0
+        self.failed = 0
+        self.last_error = None
+        # executor callbacks run on worker threads
+        self._failed_lock = threading.Lock()
+
+    def bind(self, handler, destination: int = None, port: int = None):
+        """Routes packets for destination and port to handler
+
+        None matches any address or port. A binding naming both address
+        and port takes precedence over one with wildcards, and otherwise
+        the latest binding wins.
+        """
+        if destination is not None and not 0 <= destination < N_ADDRESSES:
+            raise ValueError(f'destination must be 0-{N_ADDRESSES - 1}')
+        if port is not None and not 0 <= port < N_PORTS:
+            raise ValueError(f'port must be 0-{N_PORTS - 1}')
+        self._bindings = [
+            b for b in self._bindings
+            if b.destination != destination or b.port != port
+        ]
+        self._bindings.append(_Binding(handler, destination, port))
+        self._rebuild()
+
+    def unbind(self, destination: int = None, port: int = None):
+        """Removes the binding for exactly destination and port"""
+        self._bindings = [
+            b for b in self._bindings
+            if b.destination != destination or b.port != port
+        ]
+        self._rebuild()
+
+    def _rebuild(self):
+        """Recomputes the dispatch table from the bindings"""
+        table = [None] * (N_ADDRESSES * N_PORTS)
+        # stable sort, so later bindings of equal precedence win
+        for b in sorted(self._bindings, key=_Binding.specificity, reverse=True):
+            addrs = range(N_ADDRESSES) if b.destination is None else (b.destination,)
+            ports = range(N_PORTS) if b.port is None else (b.port,)
+            for addr in addrs:
+                for port in ports:
+                    table[(addr << csp_v1.FLEN_PORT) | port] = b.handler
+        self._table = table
+
+    def handler(self, destination: int, port: int):
+        """Returns the handler packets for destination and port are routed to"""
+        return self._table[(destination << csp_v1.FLEN_PORT) | port]
+
+    def route(self, pkt) -> bool:
+        """Queues an encoded packet or csp_v1.Packet for dispatch
+
+        Returns False if no handler is bound or its queue is full.
+        """
+        if isinstance(pkt, csp_v1.Packet):
+            hdr = pkt.header
+            key = (hdr.destination << csp_v1.FLEN_PORT) | hdr.destination_port
+            priority = hdr.priority
+        else:
+            if len(pkt) < csp_v1.HEADER_LENGTH_BYTES:
+                raise ValueError('insufficient data')
+            key = csp_v1.route_key(pkt)
+            priority = pkt[0] >> (8 - csp_v1.FLEN_PRIO)
+
+        handler = self._table[key]
+        if handler is None:
+            self.unrouted += 1
+            return False
+        if self._queued[key] >= self.queue_size:
+            self.dropped += 1
+            return False
+
+        self._queued[key] += 1
+        self._queues[priority].append((key, handler, pkt))
+        self.routed += 1
+        if self._ready is not None:
+            self._ready.set()
+        return True
+
+    def route_batch(self, packets) -> int:
+        """Queues each of a sequence of encoded packets, returning how many were queued"""
+        return sum(self.route(pkt) for pkt in packets)
+
+    @property
+    def pending(self) -> int:
+        """Number of packets awaiting dispatch"""
+        return sum(len(q) for q in self._queues)
+
+    def _next(self):
+        """Dequeues the oldest packet of the highest priority"""
+        for q in self._queues:
+            if q:
+                key, handler, pkt = q.popleft()
+                self._queued[key] -= 1
+                if not isinstance(pkt, csp_v1.Packet):
+                    pkt = csp_v1.Packet.from_bytes(bytes(pkt))
+                return handler, pkt
+        return None
+
+    def dispatch(self, limit: int = None) -> int:
+        """Runs handlers for queued packets, returning how many were dispatched"""
+        n = 0
+        while limit is None or n < limit:
+            item = self._next()
+            if item is None:
+                break
+            handler, pkt = item
+            if self.executor is not None:
+                self.executor.submit(handler, pkt).add_done_callback(self._handler_done)
+            else:
+                try:
+                    handler(pkt)
+                except Exception as e:
+                    self._handler_failed(e)
+            n += 1
+        return n
+
+    def _handler_failed(self, exc: Exception):
+        with self._failed_lock:
+            self.failed += 1
+            self.last_error = exc
+
+    def _handler_done(self, fut):
+        """Records the exception of a handler run on the executor"""
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            self._handler_failed(exc)
+
+    async def dispatch_async(self, limit: int = None) -> int:
+        """Like dispatch, awaiting coroutine handlers in priority order
+
+        Plain handlers run in executor when one is given, up to
+        max_in_flight at once, and all of them have finished when
+        dispatch_async returns.
+        """
+        loop = asyncio.get_running_loop()
+        running = set()
+        n = 0
+        try:
+            while limit is None or n < limit:
+                item = self._next()
+                if item is None:
+                    break
+                handler, pkt = item
+                n += 1
+                if self.executor is not None and not inspect.iscoroutinefunction(handler):
+                    if len(running) >= self.max_in_flight:
+                        _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    fut = loop.run_in_executor(self.executor, handler, pkt)
+                    fut.add_done_callback(self._handler_done)
+                    running.add(fut)
+                    continue
+                try:
+                    if inspect.iscoroutinefunction(handler):
+                        await handler(pkt)
+                    else:
+                        handler(pkt)
+                except Exception as e:
+                    self._handler_failed(e)
+        finally:
+            if running:
+                await asyncio.wait(running)
+        return n
+
+    async def serve(self):
+        """Dispatches packets as they are routed, until cancelled"""
+        self._ready = asyncio.Event()
+        if self.pending:
+            self._ready.set()
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                await self.dispatch_async()
+        finally:
+            self._ready = None
@@ -1,14 +1,56 @@
-from pydantic import BaseModel
+import hashlib
+import hmac
+import struct
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is an optional dependency, used for bulk route keys
+    np = None
+
 from satcom.utils import utils
 
 HEADER_LENGTH_BYTES = 4
+# the header is a single big endian 32 bit word
+HEADER_STRUCT = struct.Struct('>I')
 # field lengths (# bits)
 FLEN_PRIO  = 2
 FLEN_ADDR  = 5
 FLEN_PORT  = 6
 FLEN_FLAGS = 8
 
-class PacketHeader(BaseModel):
+# flags, as in libcsp v1
+FLAG_CRC32 = 0x01
+FLAG_RDP   = 0x02
+FLAG_XTEA  = 0x04
+FLAG_HMAC  = 0x08
+FLAG_FRAG  = 0x10
+
+# field offsets (# bits from the least significant bit)
+SHIFT_PRIO  = 32 - FLEN_PRIO
+SHIFT_SRC   = SHIFT_PRIO - FLEN_ADDR
+SHIFT_DST   = SHIFT_SRC - FLEN_ADDR
+SHIFT_DPORT = SHIFT_DST - FLEN_PORT
+SHIFT_SPORT = SHIFT_DPORT - FLEN_PORT
+
+# destination and destination_port are adjacent, so together they form an
+# 11 bit route key: destination << FLEN_PORT | destination_port
+ROUTE_KEY_MASK = (1 << (FLEN_ADDR + FLEN_PORT)) - 1
+
+# (priority, destination, source) by the top 12 bits of the header word
+_ADDR_TABLE = tuple(
+    (i >> (FLEN_ADDR * 2), i & 0x1F, (i >> FLEN_ADDR) & 0x1F)
+    for i in range(1 << (FLEN_PRIO + FLEN_ADDR * 2))
+)
+# (destination_port, source_port) by the 12 bits below them
+_PORT_TABLE = tuple(
+    (i >> FLEN_PORT, i & 0x3F)
+    for i in range(1 << (FLEN_PORT * 2))
+)
+
+@dataclass(slots=True)
+class PacketHeader():
     # 2 bits, conventionally
     # 0 (cricical), 1 (high), 2 (norm), 3 (low)
     priority: int = 0
@@ -21,7 +63,8 @@ class PacketHeader(BaseModel):
     destination_port: int = 0
     source_port: int = 0
 
-    #flags: int = 0
+    # 8 bits, see FLAG_*
+    flags: int = 0
 
     def err(self):
         """Throws an error if any params are out of bounds"""
@@ -35,82 +78,50 @@ class PacketHeader(BaseModel):
             return ValueError('PacketHeader.destination_port must be 0-63')
         if self.source_port < 0 or self.source_port > 63:
             return ValueError('PacketHeader.source_port must be 0-63')
+        if self.flags < 0 or self.flags > 255:
+            return ValueError('PacketHeader.flags must be 0-255')
         return None
 
+    def _to_word(self) -> int:
+        """Packs CSP packet header metadata into a 32 bit word"""
+        return (
+            (self.priority << SHIFT_PRIO)
+            | (self.source << SHIFT_SRC)
+            | (self.destination << SHIFT_DST)
+            | (self.destination_port << SHIFT_DPORT)
+            | (self.source_port << SHIFT_SPORT)
+            | self.flags
+        ) & 0xFFFFFFFF
+
     def to_bytes(self) -> bytes:
         """Packs CSP packet header metadata into a bytes"""
-        header = 0
-        cursor = 0
-        bitmask32 = 0xFFFFFFFF
-
-        cursor += FLEN_PRIO
-        header |= (self.priority << (32 - cursor)) & bitmask32
-
-        cursor += FLEN_ADDR
-        header |= (self.source << (32 - cursor)) & bitmask32
-
-        cursor += FLEN_ADDR
-        header |= (self.destination << (32 - cursor)) & bitmask32
-
-        cursor += FLEN_PORT
-        header |= (self.destination_port << (32 - cursor)) & bitmask32
-
-        cursor += FLEN_PORT
-        header |= (self.source_port << (32 - cursor)) & bitmask32
-
-        cursor += FLEN_FLAGS
-        header |= (0 << (32 - cursor)) & bitmask32
-
-        bs = bytearray(HEADER_LENGTH_BYTES)
-        bs = utils.pack_uint_big_endian(header)
+        return HEADER_STRUCT.pack(self._to_word())
 
-        return bytes(bs)
+    def pack_into(self, buf, offset: int = 0):
+        """Packs CSP packet header metadata into buf at offset"""
+        HEADER_STRUCT.pack_into(buf, offset, self._to_word())
 
     @classmethod
     def from_bytes(cls, bs: bytes):
         """Hydrates the CSP packet header metadata from a bytes"""
         if len(bs) != HEADER_LENGTH_BYTES:
             raise ValueError('unexpected header length')
+        return cls.unpack_from(bs)
 
-        hdr = utils.unpack_uint_big_endian(bs)
-        offset = 0
-        bitmask32 = 0xFFFFFFFF
-
-        val = (hdr << offset) & bitmask32
-        cls.priority = val >> (32 - FLEN_PRIO)
-        offset += FLEN_PRIO
-
-        val = (hdr << offset) & bitmask32
-        cls.source = val >> (32 - FLEN_ADDR)
-        offset += FLEN_ADDR
-
-        val = (hdr << offset) & bitmask32
-        cls.destination = val >> (32 - FLEN_ADDR)
-        offset += FLEN_ADDR
-
-        val = (hdr << offset) & bitmask32
-        cls.destination_port = val >> (32 - FLEN_PORT)
-        offset += FLEN_PORT
-
-        val = (hdr << offset) & bitmask32
-        cls.source_port = val >> (32 - FLEN_PORT)
-        offset += FLEN_PORT
-
-        # not implemented, so ignored
-        val = (hdr << offset) & bitmask32
-        _ = val >> (32 - FLEN_FLAGS)
-        offset += FLEN_FLAGS
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        """Hydrates the CSP packet header metadata from buf at offset"""
+        try:
+            hdr, = HEADER_STRUCT.unpack_from(buf, offset)
+        except struct.error as e:
+            raise ValueError(f'cannot unpack CSP header: {e}') from e
+        return cls._from_word(hdr)
 
-        obj = cls(
-            priority = cls.priority,
-            source = cls.source,
-            destination = cls.destination,
-            destination_port = cls.destination_port,
-            source_port = cls.source_port
-        )
+    @classmethod
+    def _from_word(cls, hdr: int):
+        """Hydrates the CSP packet header metadata from a 32 bit word"""
+        return cls(*_ADDR_TABLE[hdr >> SHIFT_DST], *_PORT_TABLE[(hdr >> SHIFT_SPORT) & 0xFFF], hdr & 0xFF)
 
-        return obj
-    
 class Packet():
     def __init__(self, data: bytes, header=None):
         self.header = header or PacketHeader()
@@ -136,7 +147,7 @@ class Packet():
     def to_bytes(self) -> bytes:
         """Encodes CSP packet and data into bytes"""
         buf = bytearray(self._make_buffer(len(self.data)))
-        buf[:HEADER_LENGTH_BYTES] = self.header.to_bytes()
+        self.header.pack_into(buf, 0)
         buf[HEADER_LENGTH_BYTES:] = self.data
 
         return bytes(buf)
@@ -147,12 +158,321 @@ class Packet():
         if len(bs) < HEADER_LENGTH_BYTES:
             raise ValueError('insufficient data')
 
-        hbs, dbs = bs[0:HEADER_LENGTH_BYTES], bs[HEADER_LENGTH_BYTES:]
-        hdr = PacketHeader.from_bytes(hbs)
+        hdr = PacketHeader.unpack_from(bs, 0)
+        dbs = bs[HEADER_LENGTH_BYTES:]
 
         obj = cls(
             header = hdr,
             data = dbs
         )
 
-        return obj
\ No newline at end of file
+        return obj
+
+class PacketView():
+    """Read-only CSP packet over a slice of a larger buffer
+
+    CSP v1 headers carry no length, so the view spans the rest of the
+    buffer unless a length is given. Header fields are decoded from the
+    underlying memoryview when accessed, and data is a sub-view. The
+    buffer must not be modified while views are in use.
+    """
+    __slots__ = ('_view',)
+
+    def __init__(self, buf, offset: int = 0, length: int = None):
+        mv = utils.byte_view(buf)
+        if length is None:
+            length = len(mv) - offset
+        if length < HEADER_LENGTH_BYTES or offset + length > len(mv):
+            raise ValueError('insufficient data')
+        self._view = mv[offset:offset+length].toreadonly()
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def _word(self) -> int:
+        return HEADER_STRUCT.unpack_from(self._view, 0)[0]
+
+    @property
+    def header(self) -> PacketHeader:
+        """Decodes the full header"""
+        return PacketHeader.unpack_from(self._view, 0)
+
+    @property
+    def priority(self) -> int:
+        return self._view[0] >> 6
+
+    @property
+    def source(self) -> int:
+        return (self._view[0] >> 1) & 0x1F
+
+    @property
+    def destination(self) -> int:
+        return route_key(self._view) >> FLEN_PORT
+
+    @property
+    def destination_port(self) -> int:
+        return route_key(self._view) & 0x3F
+
+    @property
+    def source_port(self) -> int:
+        return (self._word() >> SHIFT_SPORT) & 0x3F
+
+    @property
+    def flags(self) -> int:
+        return self._view[3]
+
+    @property
+    def data(self) -> memoryview:
+        """Sub-view of the packet data"""
+        return self._view[HEADER_LENGTH_BYTES:]
+
+    def to_bytes(self) -> bytes:
+        """Copies the packet out of the buffer"""
+        return self._view.tobytes()
+
+    def to_packet(self) -> Packet:
+        """Hydrates a Packet from the view"""
+        return Packet.from_bytes(self._view.tobytes())
+
+
+def route_key(buf, offset: int = 0) -> int:
+    """Returns the route key of the CSP packet at offset in buf
+
+    The key is destination << FLEN_PORT | destination_port, read straight
+    from the header bytes without decoding the other fields.
+    """
+    return ((buf[offset] & 0x01) << 10) | (buf[offset+1] << 2) | (buf[offset+2] >> 6)
+
+
+def route_keys(buf, offsets):
+    """Returns the route key of each CSP packet at offsets in buf
+
+    With numpy, the keys of all packets are gathered at once into an
+    array; destination is keys >> FLEN_PORT and destination_port is
+    keys & 0x3F. Without numpy, a list is returned.
+    """
+    mv = utils.byte_view(buf)
+    if np is None:
+        return [route_key(mv, o) for o in offsets]
+
+    arr = np.frombuffer(mv, dtype=np.uint8)
+    o = np.asarray(offsets, dtype=np.intp)
+    if len(o) and (o.min() < 0 or o.max() + HEADER_LENGTH_BYTES > len(arr)):
+        raise ValueError('insufficient data')
+    keys = (arr[o] & 0x01).astype(np.uint16) << 10
+    keys |= arr[o + 1].astype(np.uint16) << 2
+    keys |= arr[o + 2] >> 6
+    return keys
+
+
+def packet_route_keys(packets) -> list:
+    """Returns the route key of each of a sequence of encoded CSP packets"""
+    return [((p[0] & 0x01) << 10) | (p[1] << 2) | (p[2] >> 6) for p in packets]
+
+
+# CRC32C (Castagnoli), reflected; zlib.crc32 uses the IEEE polynomial instead
+CRC32C_POLY = 0x82F63B78
+CRC32_LENGTH_BYTES = 4
+CRC32_STRUCT = struct.Struct('>I')
+
+
+def _make_crc32c_table() -> tuple:
+    table = []
+    for i in range(256):
+        ck = i
+        for _ in range(8):
+            ck = (ck >> 1) ^ CRC32C_POLY if ck & 1 else ck >> 1
+        table.append(ck)
+    return tuple(table)
+
+
+CRC32C_TABLE = _make_crc32c_table()
+
+
+def crc32c(data, ck: int = 0) -> int:
+    """Computes the CRC32C of data, continuing from the CRC ck of preceding data"""
+    table = CRC32C_TABLE
+    ck ^= 0xFFFFFFFF
+    for b in data:
+        ck = table[(ck ^ b) & 0xFF] ^ (ck >> 8)
+    return ck ^ 0xFFFFFFFF
+
+
+HMAC_LENGTH_BYTES = 4
+
+
+class HMACKey():
+    """HMAC-SHA1 key for CSP packets
+
+    The inner and outer key pads are hashed once, when the key is set,
+    and each digest continues from copies of that state. CSP truncates
+    the digest to HMAC_LENGTH_BYTES.
+    """
+    __slots__ = ('_hmac',)
+
+    def __init__(self, key: bytes):
+        self._hmac = hmac.new(key, digestmod=hashlib.sha1)
+
+    def digest(self, *parts) -> bytes:
+        """Returns the truncated HMAC of the concatenated parts"""
+        h = self._hmac.copy()
+        for part in parts:
+            h.update(part)
+        return h.digest()[:HMAC_LENGTH_BYTES]
+
+
+def encode_packet(pkt: Packet, hmac_key: HMACKey = None, include_header: bool = False) -> bytes:
+    """Encodes a CSP packet with the trailers its header flags call for
+
+    As in libcsp, the HMAC is appended first and the CRC32 last, each
+    covering the data before it and, with include_header, the header.
+    """
+    flags = pkt.header.flags
+    if flags & FLAG_XTEA:
+        raise ValueError('XTEA is not supported')
+
+    n = len(pkt.data)
+    size = HEADER_LENGTH_BYTES + n
+    if flags & FLAG_HMAC:
+        size += HMAC_LENGTH_BYTES
+    if flags & FLAG_CRC32:
+        size += CRC32_LENGTH_BYTES
+    buf = bytearray(size)
+    mv = memoryview(buf)
+
+    pkt.header.pack_into(buf, 0)
+    end = HEADER_LENGTH_BYTES + n
+    buf[HEADER_LENGTH_BYTES:end] = pkt.data
+    start = 0 if include_header else HEADER_LENGTH_BYTES
+    if flags & FLAG_HMAC:
+        if hmac_key is None:
+            raise ValueError('HMAC flag set without a key')
+        buf[end:end+HMAC_LENGTH_BYTES] = hmac_key.digest(mv[start:end])
+        end += HMAC_LENGTH_BYTES
+    if flags & FLAG_CRC32:
+        CRC32_STRUCT.pack_into(buf, end, crc32c(mv[start:end]))
+
+    return bytes(buf)
+
+
+def decode_packet(bs: bytes, hmac_key: HMACKey = None, include_header: bool = False) -> Packet:
+    """Hydrates a CSP packet, verifying and removing the trailers its flags call for"""
+    if len(bs) < HEADER_LENGTH_BYTES:
+        raise ValueError('insufficient data')
+
+    hdr = PacketHeader.unpack_from(bs, 0)
+    if hdr.flags & FLAG_XTEA:
+        raise ValueError('XTEA is not supported')
+
+    mv = memoryview(bs)
+    end = len(bs)
+    start = 0 if include_header else HEADER_LENGTH_BYTES
+    if hdr.flags & FLAG_CRC32:
+        end -= CRC32_LENGTH_BYTES
+        if end < HEADER_LENGTH_BYTES:
+            raise ValueError('insufficient data')
+        got, = CRC32_STRUCT.unpack_from(bs, end)
+        want = crc32c(mv[start:end])
+        if got != want:
+            raise ValueError(f'CRC32 mismatch: got={got:#010x} want={want:#010x}')
+    if hdr.flags & FLAG_HMAC:
+        if hmac_key is None:
+            raise ValueError('HMAC flag set without a key')
+        end -= HMAC_LENGTH_BYTES
+        if end < HEADER_LENGTH_BYTES:
+            raise ValueError('insufficient data')
+        want = hmac_key.digest(mv[start:end])
+        if not hmac.compare_digest(bytes(mv[end:end+HMAC_LENGTH_BYTES]), want):
+            raise ValueError('HMAC mismatch')
+
+    return Packet(bytes(mv[HEADER_LENGTH_BYTES:end]), hdr)
+
+
+# fragment trailer (offset, total size), as in libcsp's SFP
+SFP_HEADER_STRUCT = struct.Struct('>II')
+
+
+def fragment(data: bytes, header: PacketHeader, mtu: int) -> list:
+    """Splits data into packets of at most mtu data bytes plus a fragment trailer
+
+    Each packet copies header, with FLAG_FRAG set. Trailers for other
+    flags are added by encode_packet as usual.
+    """
+    if mtu < 1:
+        raise ValueError('mtu must be positive')
+    flags = header.flags | FLAG_FRAG
+    mv = memoryview(data)
+    total = len(data)
+    pkts = []
+    for offset in range(0, max(total, 1), mtu):
+        chunk = mv[offset:offset+mtu]
+        buf = bytearray(len(chunk) + SFP_HEADER_STRUCT.size)
+        buf[:len(chunk)] = chunk
+        SFP_HEADER_STRUCT.pack_into(buf, len(chunk), offset, total)
+        hdr = PacketHeader(
+            priority=header.priority,
+            destination=header.destination,
+            source=header.source,
+            destination_port=header.destination_port,
+            source_port=header.source_port,
+            flags=flags
+        )
+        pkts.append(Packet(bytes(buf), hdr))
+    return pkts
+
+
+class Reassembler():
+    """Reassembles data from fragmented CSP packets
+
+    Fragments must arrive in order, as libcsp sends them. Data is
+    collected in a buffer of max_size bytes allocated once; a fragment
+    that does not continue the data in progress restarts reassembly.
+    discarded counts each fragment that could not be used and each
+    abandoned transfer once, counting a fragment that abandons the data
+    in progress as one event.
+    """
+
+    def __init__(self, max_size: int):
+        self._buf = bytearray(max_size)
+        self._received = 0
+        self._total = None
+        self.discarded = 0
+
+    def _clear(self):
+        self._received = 0
+        self._total = None
+
+    def reset(self):
+        """Abandons the data in progress"""
+        if self._received:
+            self.discarded += 1
+        self._clear()
+
+    def feed(self, pkt: Packet):
+        """Adds a fragment, returning the data it completes or None"""
+        if not pkt.header.flags & FLAG_FRAG:
+            raise ValueError('packet is not a fragment')
+        data = pkt.data
+        n = len(data) - SFP_HEADER_STRUCT.size
+        if n < 0:
+            raise ValueError('insufficient data')
+        offset, total = SFP_HEADER_STRUCT.unpack_from(data, n)
+        if total > len(self._buf) or offset + n > total:
+            raise ValueError(f'fragment out of bounds: offset={offset} length={n} total={total}')
+
+        if offset != self._received or (self._total is not None and total != self._total):
+            if offset != 0:
+                # neither continues the data in progress nor starts new data
+                self._clear()
+                self.discarded += 1
+                return None
+            self.reset()
+        self._total = total
+        self._buf[offset:offset+n] = memoryview(data)[:n]
+        self._received += n
+
+        if self._received < total:
+            return None
+        out = bytes(self._buf[:total])
+        self._clear()
+        return out
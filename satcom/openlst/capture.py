@@ -0,0 +1,263 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+
+from satcom.openlst import crc
+from satcom.openlst.client_packet_lib import ClientPacketView
+from satcom.openlst.space_packet_lib import (
+    SPACE_PACKET_FOOTER_LENGTH,
+    SPACE_PACKET_HEADER_LENGTH,
+    SpacePacketView,
+)
+
+# A capture file is a file header, then one record per packet, then an
+# index of all records and a fixed size trailer locating the index:
+#
+#   magic, version, kind
+#   (timestamp, length, crc status, packet bytes) per record
+#   (packet offset, timestamp, length, crc status) per record
+#   index offset, record count, trailer magic
+#
+# Records carry their own timestamp and length, so the index of a file
+# left without one (e.g. by a crash) can be rebuilt by scanning them.
+CAPTURE_MAGIC = b'OLSTCAP\0'
+CAPTURE_TRAILER_MAGIC = b'OLSTIDX\0'
+CAPTURE_VERSION = 1
+
+FILE_HEADER_STRUCT = struct.Struct('<8sHH4x')
+RECORD_HEADER_STRUCT = struct.Struct('<dHBx')
+INDEX_ENTRY_STRUCT = struct.Struct('<QdHBx')
+TRAILER_STRUCT = struct.Struct('<QQ8s')
+
+# what the records hold
+KIND_SPACE = 1
+KIND_CLIENT = 2
+
+# crc status of a record
+CRC_NONE = 0
+CRC_OK = 1
+CRC_BAD = 2
+
+
+def _space_crc_status(packet) -> int:
+    n = len(packet)
+    if n < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH:
+        return CRC_BAD
+    ok = crc.crc16(memoryview(packet)[:n-2]) == (packet[n-2] | (packet[n-1] << 8))
+    return CRC_OK if ok else CRC_BAD
+
+
+def _scan_records(buf, offset: int, end: int) -> list:
+    """Rebuilds index entries by walking records from offset, stopping at the first incomplete one"""
+    entries = []
+    last = float('-inf')
+    while offset + RECORD_HEADER_STRUCT.size <= end:
+        timestamp, length, status = RECORD_HEADER_STRUCT.unpack_from(buf, offset)
+        start = offset + RECORD_HEADER_STRUCT.size
+        # a partly written index past the records does not parse as records
+        if start + length > end or status > CRC_BAD or not timestamp >= last:
+            break
+        last = timestamp
+        entries.append((start, timestamp, length, status))
+        offset = start + length
+    return entries
+
+
+def _read_index(buf, recover: bool) -> tuple:
+    """Returns the kind, index offset and record count of a capture, or the scanned entries if recovering"""
+    if len(buf) < FILE_HEADER_STRUCT.size:
+        raise ValueError('not a capture file')
+    magic, version, kind = FILE_HEADER_STRUCT.unpack_from(buf, 0)
+    if magic != CAPTURE_MAGIC:
+        raise ValueError('not a capture file')
+    if version != CAPTURE_VERSION:
+        raise ValueError(f'unsupported capture version {version}')
+
+    if len(buf) >= FILE_HEADER_STRUCT.size + TRAILER_STRUCT.size:
+        index_offset, count, magic = TRAILER_STRUCT.unpack_from(buf, len(buf) - TRAILER_STRUCT.size)
+        if magic == CAPTURE_TRAILER_MAGIC and index_offset + count * INDEX_ENTRY_STRUCT.size + TRAILER_STRUCT.size == len(buf):
+            return kind, index_offset, count, None
+    if not recover:
+        raise ValueError('capture file has no index, open with recover=True')
+    return kind, None, None, _scan_records(buf, FILE_HEADER_STRUCT.size, len(buf))
+
+
+class CaptureWriter():
+    """Appends packets to a capture file
+
+    Records are written as packets arrive and the index is written by
+    close. Opening an existing capture appends to it, rebuilding its
+    index first if it was never closed. Timestamps, seconds since the
+    epoch by default, must not decrease, so that readers can search them.
+    """
+
+    def __init__(self, path, kind: int = KIND_SPACE):
+        self.path = path
+        self._entries = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, 'r+b')
+            try:
+                with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    file_kind, index_offset, count, entries = _read_index(mm, recover=True)
+                    if entries is None:
+                        entries = list(INDEX_ENTRY_STRUCT.iter_unpack(mm[index_offset:index_offset+count*INDEX_ENTRY_STRUCT.size]))
+                        end = index_offset
+                    elif entries:
+                        end = entries[-1][0] + entries[-1][2]
+                    else:
+                        end = FILE_HEADER_STRUCT.size
+            except ValueError:
+                self._file.close()
+                raise
+            if file_kind != kind:
+                self._file.close()
+                raise ValueError(f'capture holds kind {file_kind}, not {kind}')
+            self._entries = entries
+            self._file.seek(end)
+            self._file.truncate()
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(FILE_HEADER_STRUCT.pack(CAPTURE_MAGIC, CAPTURE_VERSION, kind))
+        self.kind = kind
+        self._offset = self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def write(self, packet, timestamp: float = None, crc_status: int = None) -> int:
+        """Appends an encoded packet, or anything with to_bytes, returning its index
+
+        The crc status of space packets is checked unless given.
+        """
+        if hasattr(packet, 'to_bytes'):
+            packet = packet.to_bytes()
+        if timestamp is None:
+            timestamp = time.time()
+        if self._entries and timestamp < self._entries[-1][1]:
+            raise ValueError(f'timestamp {timestamp} precedes the last record')
+        if crc_status is None:
+            crc_status = _space_crc_status(packet) if self.kind == KIND_SPACE else CRC_NONE
+
+        n = len(packet)
+        self._file.write(RECORD_HEADER_STRUCT.pack(timestamp, n, crc_status))
+        self._file.write(packet)
+        start = self._offset + RECORD_HEADER_STRUCT.size
+        self._entries.append((start, timestamp, n, crc_status))
+        self._offset = start + n
+        return len(self._entries) - 1
+
+    def flush(self):
+        """Flushes written records to the file, without an index"""
+        self._file.flush()
+
+    def close(self):
+        """Writes the index and trailer and closes the file"""
+        if self._file.closed:
+            return
+        pack = INDEX_ENTRY_STRUCT.pack
+        self._file.write(b''.join(pack(*e) for e in self._entries))
+        self._file.write(TRAILER_STRUCT.pack(self._offset, len(self._entries), CAPTURE_TRAILER_MAGIC))
+        self._file.close()
+
+
+class _IndexColumn():
+    """Read-only sequence over one field of the index, for bisect"""
+    __slots__ = ('_reader', '_field')
+
+    def __init__(self, reader, field: int):
+        self._reader = reader
+        self._field = field
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    def __getitem__(self, i: int):
+        return self._reader.entry(i)[self._field]
+
+
+class CaptureReader():
+    """Memory-mapped reader of a capture file
+
+    Opening reads only the file header and trailer; index entries are
+    unpacked from the mapping when accessed. Packets are returned as
+    SpacePacketView or ClientPacketView over the mapping, which stays
+    mapped after the reader is closed until the last view is released.
+    """
+
+    def __init__(self, path, recover: bool = False):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.kind, self._index_offset, self._count, self._entries = _read_index(self._mm, recover)
+        except ValueError:
+            self._mm.close()
+            raise
+        if self._entries is not None:
+            self._count = len(self._entries)
+        self._view_class = SpacePacketView if self.kind == KIND_SPACE else ClientPacketView
+        self.timestamps = _IndexColumn(self, 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmaps the file, or leaves that to the views still using it"""
+        if self._mm is None:
+            return
+        try:
+            self._mm.close()
+        except BufferError:
+            # views hold exports of the mapping, which is unmapped when they are released
+            pass
+        self._mm = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def entry(self, i: int) -> tuple:
+        """Returns the (packet offset, timestamp, length, crc status) of record i"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError('record index out of range')
+        if self._entries is not None:
+            return self._entries[i]
+        return INDEX_ENTRY_STRUCT.unpack_from(self._mm, self._index_offset + i * INDEX_ENTRY_STRUCT.size)
+
+    def timestamp(self, i: int) -> float:
+        return self.entry(i)[1]
+
+    def crc_status(self, i: int) -> int:
+        return self.entry(i)[3]
+
+    def __getitem__(self, i: int):
+        """Returns a view of packet i"""
+        offset, _, length, _ = self.entry(i)
+        return self._view_class(self._mm, offset, length)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def time_range(self, start: float = None, end: float = None) -> range:
+        """Returns the indexes of records with start <= timestamp < end, by bisection"""
+        lo = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+        hi = self._count if end is None else bisect.bisect_left(self.timestamps, end, lo)
+        return range(lo, hi)
+
+    def between(self, start: float = None, end: float = None):
+        """Yields views of packets with start <= timestamp < end"""
+        for i in self.time_range(start, end):
+            yield self[i]
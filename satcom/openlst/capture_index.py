@@ -0,0 +1,164 @@
+import array
+import bisect
+import os
+import struct
+
+from satcom.openlst.capture import KIND_SPACE, CaptureReader
+
+# A sidecar index is a header followed by one entry per capture record,
+# in record order, holding the fields queries filter on.
+INDEX_MAGIC = b'OLSTCIX\0'
+INDEX_VERSION = 1
+INDEX_HEADER_STRUCT = struct.Struct('<8sH6x')
+# timestamp, hardware_id, port, destination, command_number, crc status
+INDEX_RECORD_STRUCT = struct.Struct('<dHBBBB')
+
+# fields that can be queried for equality, in INDEX_RECORD_STRUCT order
+INDEX_FIELDS = ('hardware_id', 'port', 'destination', 'command_number', 'crc_status')
+
+
+def sidecar_path(capture_path) -> str:
+    """Returns the path of the sidecar index of a capture file"""
+    return os.fspath(capture_path) + '.idx'
+
+
+class CaptureIndex():
+    """Sidecar index of the packet fields of a capture file
+
+    Holds the sorted record timestamps and, for each value of each of
+    INDEX_FIELDS, the sorted indexes of the records having it. A query
+    bisects the timestamps and the postings of the fields it filters on,
+    and intersects them, so only matching records are ever read from
+    the capture. update appends entries for records added to the capture
+    since the index was last updated, saving them to the sidecar file.
+    """
+
+    def __init__(self, capture_path, path=None):
+        self.capture_path = capture_path
+        self.path = path or sidecar_path(capture_path)
+        self.timestamps = array.array('d')
+        self.postings = {field: {} for field in INDEX_FIELDS}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _add(self, timestamp: float, *fields):
+        i = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        for field, value in zip(INDEX_FIELDS, fields):
+            postings = self.postings[field]
+            ids = postings.get(value)
+            if ids is None:
+                ids = postings[value] = array.array('I')
+            ids.append(i)
+
+    def _reset(self):
+        self.timestamps = array.array('d')
+        self.postings = {field: {} for field in INDEX_FIELDS}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            bs = f.read()
+        if len(bs) < INDEX_HEADER_STRUCT.size:
+            return
+        magic, version = INDEX_HEADER_STRUCT.unpack_from(bs, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f'not a capture index: {self.path}')
+        # a partly written last entry is dropped, and rewritten by update
+        end = INDEX_HEADER_STRUCT.size + (len(bs) - INDEX_HEADER_STRUCT.size) // INDEX_RECORD_STRUCT.size * INDEX_RECORD_STRUCT.size
+        for entry in INDEX_RECORD_STRUCT.iter_unpack(memoryview(bs)[INDEX_HEADER_STRUCT.size:end]):
+            self._add(*entry)
+
+    def update(self, reader: CaptureReader = None) -> int:
+        """Indexes records appended to the capture, returning how many were added
+
+        If the capture no longer matches the index, e.g. it was replaced,
+        the index is rebuilt. Records too short to hold a packet header and
+        footer are indexed with fields of 0.
+        """
+        if reader is None:
+            with CaptureReader(self.capture_path, recover=True) as reader:
+                return self.update(reader)
+
+        start = len(self)
+        if len(reader) < start or (start and reader.timestamp(start - 1) != self.timestamps[-1]) \
+                or not os.path.exists(self.path):
+            self._reset()
+            start = 0
+        if start == 0:
+            with open(self.path, 'wb') as f:
+                f.write(INDEX_HEADER_STRUCT.pack(INDEX_MAGIC, INDEX_VERSION))
+
+        space = reader.kind == KIND_SPACE
+        entries = []
+        for i in range(start, len(reader)):
+            try:
+                view = reader[i]
+            except ValueError:
+                # too short to have fields, e.g. a truncated capture of a bad packet
+                fields = (0, 0, 0, 0)
+            else:
+                fields = (view.hardware_id, view.port if space else 0, view.destination, view.command_number)
+                del view
+            entry = (reader.timestamp(i), *fields, reader.crc_status(i))
+            self._add(*entry)
+            entries.append(INDEX_RECORD_STRUCT.pack(*entry))
+
+        with open(self.path, 'r+b') as f:
+            f.seek(INDEX_HEADER_STRUCT.size + start * INDEX_RECORD_STRUCT.size)
+            f.truncate()
+            f.write(b''.join(entries))
+        return len(entries)
+
+    def query(self, start: float = None, end: float = None, **fields) -> list:
+        """Returns the indexes of records with start <= timestamp < end and the given field values
+
+        e.g. query(t1, t2, hardware_id=300, command_number=17)
+        """
+        lo = 0 if start is None else bisect.bisect_left(self.timestamps, start)
+        hi = len(self) if end is None else bisect.bisect_left(self.timestamps, end, lo)
+        if lo >= hi:
+            return []
+
+        ranges = []
+        for field, value in fields.items():
+            if field not in self.postings:
+                raise ValueError(f'{field} is not indexed, use one of {INDEX_FIELDS}')
+            ids = self.postings[field].get(value)
+            if ids is None:
+                return []
+            ranges.append((ids, bisect.bisect_left(ids, lo), bisect.bisect_left(ids, hi)))
+        if not ranges:
+            return list(range(lo, hi))
+
+        # walk the shortest postings, checking membership in the others by bisection
+        ranges.sort(key=lambda r: r[2] - r[1])
+        (ids, a, b), others = ranges[0], ranges[1:]
+        out = []
+        for i in ids[a:b]:
+            for other, oa, ob in others:
+                j = bisect.bisect_left(other, i, oa, ob)
+                if j == ob or other[j] != i:
+                    break
+            else:
+                out.append(i)
+        return out
+
+
+def search(capture_paths, start: float = None, end: float = None, **fields):
+    """Yields (capture path, record index, timestamp, packet bytes) of matching records across captures
+
+    Each capture's sidecar index is brought up to date first.
+    """
+    for path in capture_paths:
+        index = CaptureIndex(path)
+        with CaptureReader(path, recover=True) as reader:
+            index.update(reader)
+            for i in index.query(start, end, **fields):
+                view = reader[i]
+                bs = view.to_bytes()
+                del view
+                yield path, i, reader.timestamp(i), bs
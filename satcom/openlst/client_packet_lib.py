@@ -1,12 +1,20 @@
-from pydantic import BaseModel
+import struct
+from dataclasses import dataclass
 
 from satcom.utils import utils
 
 
+# start bytes preceding each client packet on the ground radio serial link
+CLIENT_PACKET_ASM = bytes([0x22, 0x69])
+
 CLIENT_PACKET_HEADER_LENGTH = 7
 
+# length, hardware_id, sequence_number, destination, command_number
+CLIENT_PACKET_HEADER_STRUCT = struct.Struct('<BHHBB')
+
 
-class ClientPacketHeader(BaseModel):
+@dataclass(slots=True)
+class ClientPacketHeader():
     length: int = 0
     hardware_id: int = 0
     sequence_number: int = 0
@@ -27,33 +35,38 @@ class ClientPacketHeader(BaseModel):
             return ValueError('command_number must be 0-255')
         return None
 
+    def _fields(self) -> tuple:
+        return (self.length, self.hardware_id, self.sequence_number, self.destination, self.command_number)
+
     def to_bytes(self):
         """Packs client packet header metadata into bytes"""
-        bs = bytearray(CLIENT_PACKET_HEADER_LENGTH)
-
-        bs[0] = self.length
-        bs[1:3] = utils.pack_ushort_little_endian(self.hardware_id)
-        bs[3:5] = utils.pack_ushort_little_endian(self.sequence_number)
-        bs[5] = self.destination
-        bs[6] = self.command_number
-
-        return bytes(bs)
+        try:
+            return CLIENT_PACKET_HEADER_STRUCT.pack(*self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack client packet header: {e}') from e
+
+    def pack_into(self, buf, offset: int = 0):
+        """Packs client packet header metadata into buf at offset"""
+        try:
+            CLIENT_PACKET_HEADER_STRUCT.pack_into(buf, offset, *self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack client packet header: {e}') from e
 
     @classmethod
     def from_bytes(cls, bs: bytes):
         """Hydrates the client packet header metadata from bytes"""
         if len(bs) != CLIENT_PACKET_HEADER_LENGTH:
             raise ValueError('unexpected header length')
+        return cls.unpack_from(bs)
 
-        obj = cls(
-            length = bs[0],
-            hardware_id = utils.unpack_ushort_little_endian(bs[1:3]),
-            sequence_number = utils.unpack_ushort_little_endian(bs[3:5]),
-            destination = bs[5],
-            command_number = bs[6]
-        )
-
-        return obj
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        """Hydrates the client packet header metadata from buf at offset"""
+        try:
+            # fields are declared in wire order
+            return cls(*CLIENT_PACKET_HEADER_STRUCT.unpack_from(buf, offset))
+        except struct.error as e:
+            raise ValueError(f'cannot unpack client packet header: {e}') from e
 
 class ClientPacket():
     def __init__(self, data: bytes, header=None):
@@ -76,8 +89,8 @@ class ClientPacket():
 
     def to_bytes(self):
         """Encodes client packet and data into bytes"""
-        buf = bytearray(CLIENT_PACKET_HEADER_LENGTH)
-        buf[:CLIENT_PACKET_HEADER_LENGTH] = self.header.to_bytes()
+        buf = bytearray(CLIENT_PACKET_HEADER_LENGTH + len(self.data))
+        self.header.pack_into(buf, 0)
         buf[CLIENT_PACKET_HEADER_LENGTH:] = self.data
 
         return bytes(buf)
@@ -88,7 +101,7 @@ class ClientPacket():
         if len(bs) < CLIENT_PACKET_HEADER_LENGTH:
             raise ValueError('insufficient data')
 
-        hdr = ClientPacketHeader.from_bytes(bs[0:CLIENT_PACKET_HEADER_LENGTH])
+        hdr = ClientPacketHeader.unpack_from(bs, 0)
 
         obj = cls(
             data = bs[CLIENT_PACKET_HEADER_LENGTH:],
@@ -96,3 +109,64 @@ class ClientPacket():
         )
 
         return obj
+
+class ClientPacketView():
+    """Read-only client packet over a slice of a larger buffer
+
+    Header fields are unpacked from the underlying memoryview when
+    accessed, and data is a sub-view. The buffer must not be modified
+    while views are in use.
+    """
+    __slots__ = ('_view',)
+
+    def __init__(self, buf, offset: int = 0, length: int = None):
+        mv = utils.byte_view(buf)
+        if length is None:
+            if offset >= len(mv):
+                raise ValueError('insufficient data')
+            # the length byte counts the bytes following it
+            length = mv[offset] + 1
+        if length < CLIENT_PACKET_HEADER_LENGTH or offset + length > len(mv):
+            raise ValueError('insufficient data')
+        self._view = mv[offset:offset+length].toreadonly()
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    @property
+    def header(self) -> ClientPacketHeader:
+        """Decodes the full header"""
+        return ClientPacketHeader.unpack_from(self._view, 0)
+
+    @property
+    def length(self) -> int:
+        return self._view[0]
+
+    @property
+    def hardware_id(self) -> int:
+        return self._view[1] | (self._view[2] << 8)
+
+    @property
+    def sequence_number(self) -> int:
+        return self._view[3] | (self._view[4] << 8)
+
+    @property
+    def destination(self) -> int:
+        return self._view[5]
+
+    @property
+    def command_number(self) -> int:
+        return self._view[6]
+
+    @property
+    def data(self) -> memoryview:
+        """Sub-view of the packet data"""
+        return self._view[CLIENT_PACKET_HEADER_LENGTH:]
+
+    def to_bytes(self) -> bytes:
+        """Copies the packet out of the buffer"""
+        return self._view.tobytes()
+
+    def to_packet(self) -> ClientPacket:
+        """Hydrates a ClientPacket from the view"""
+        return ClientPacket.from_bytes(self._view.tobytes())
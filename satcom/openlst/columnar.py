@@ -0,0 +1,109 @@
+try:
+    import numpy as np
+except ImportError:
+    # numpy is required by this module, but optional for the package
+    np = None
+
+from satcom.openlst import crc
+from satcom.openlst.space_packet_lib import (
+    SPACE_PACKET_FOOTER_LENGTH,
+    SPACE_PACKET_HEADER_LENGTH,
+)
+from satcom.utils import utils
+
+# One row per packet: header and footer fields, where the packet and its
+# data sit in the source buffer, and whether the received CRC matches
+SPACE_PACKET_DTYPE = [
+    ('offset', 'i8'),
+    ('length', 'u1'),
+    ('port', 'u1'),
+    ('sequence_number', 'u2'),
+    ('destination', 'u1'),
+    ('command_number', 'u1'),
+    ('hardware_id', 'u2'),
+    ('crc16', 'u2'),
+    ('crc_ok', '?'),
+    ('data_offset', 'i8'),
+    ('data_length', 'u2'),
+]
+
+_NUMPY_CRC16_TABLE = None if np is None else np.array(crc.CRC16_TABLE, dtype=np.uint16)
+
+
+def space_packet_offsets(buf) -> list:
+    """Returns the offset of each of a run of concatenated space packets"""
+    mv = utils.byte_view(buf)
+    offsets = []
+    offset = 0
+    n = len(mv)
+    while offset < n:
+        length = mv[offset] + 1
+        if length < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH or offset + length > n:
+            raise ValueError(f'malformed packet at offset {offset}')
+        offsets.append(offset)
+        offset += length
+    return offsets
+
+
+def _crc16_rows(arr, starts, lengths):
+    """Computes the CRC-16 of many spans of arr in lockstep, one span per row"""
+    table = _NUMPY_CRC16_TABLE
+    ck = np.full(len(starts), crc.CRC16_INIT, dtype=np.uint16)
+    if len(starts) == 0:
+        return ck
+    for j in range(int(lengths.max())):
+        active = lengths > j
+        if not active.all():
+            idx = np.flatnonzero(active)
+            c = ck[idx]
+            ck[idx] = (c << 8) ^ table[(c >> 8) ^ arr[starts[idx] + j]]
+        else:
+            ck = (ck << 8) ^ table[(ck >> 8) ^ arr[starts + j]]
+    return ck
+
+
+def decode_space_packets(buf, offsets=None, check_crc: bool = True):
+    """Decodes many space packets into a numpy structured array
+
+    buf holds concatenated space packets, each prefixed by its length
+    byte, unless offsets gives where each packet starts. Fields of all
+    packets are gathered with array operations rather than one
+    SpacePacket per row, and data stays in buf at data_offset. With
+    check_crc, the CRCs of all rows are computed in lockstep.
+    """
+    if np is None:
+        raise ImportError('decode_space_packets requires numpy')
+
+    if offsets is None:
+        offsets = space_packet_offsets(buf)
+    arr = np.frombuffer(utils.byte_view(buf), dtype=np.uint8)
+    o = np.asarray(offsets, dtype=np.int64)
+
+    rows = np.zeros(len(o), dtype=SPACE_PACKET_DTYPE)
+    if len(o) == 0:
+        return rows
+
+    lengths = arr[o].astype(np.int64) + 1
+    end = o + lengths
+    if (lengths < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH).any() or (end > len(arr)).any():
+        raise ValueError('malformed packet')
+
+    rows['offset'] = o
+    rows['length'] = arr[o]
+    rows['port'] = arr[o + 1]
+    rows['sequence_number'] = arr[o + 2] | (arr[o + 3].astype(np.uint16) << 8)
+    rows['destination'] = arr[o + 4]
+    rows['command_number'] = arr[o + 5]
+    rows['hardware_id'] = arr[end - 4] | (arr[end - 3].astype(np.uint16) << 8)
+    rows['crc16'] = arr[end - 2] | (arr[end - 1].astype(np.uint16) << 8)
+    rows['data_offset'] = o + SPACE_PACKET_HEADER_LENGTH
+    rows['data_length'] = lengths - SPACE_PACKET_HEADER_LENGTH - SPACE_PACKET_FOOTER_LENGTH
+    if check_crc:
+        rows['crc_ok'] = _crc16_rows(arr, o, lengths - 2) == rows['crc16']
+
+    return rows
+
+
+def to_columns(rows) -> dict:
+    """Splits a structured array from decode_space_packets into a dict of arrays"""
+    return {name: rows[name] for name in rows.dtype.names}
@@ -0,0 +1,71 @@
+CRC16_POLY = 0x8005
+CRC16_INIT = 0xFFFF
+
+
+def _make_crc16_table(poly: int) -> tuple:
+    """Builds the 256-entry lookup table for an MSB-first CRC-16"""
+    table = []
+    for i in range(256):
+        ck = i << 8
+        for _ in range(8):
+            if ck & 0x8000:
+                ck = ((ck << 1) ^ poly) & 0xFFFF
+            else:
+                ck = (ck << 1) & 0xFFFF
+        table.append(ck)
+    return tuple(table)
+
+
+CRC16_TABLE = _make_crc16_table(CRC16_POLY)
+
+
+def crc16(data, ck: int = CRC16_INIT) -> int:
+    """Computes the OpenLST CRC-16 of data
+
+    Passing a previous result as ck continues the computation, so
+    crc16(b, crc16(a)) == crc16(a + b).
+    """
+    table = CRC16_TABLE
+    for b in data:
+        ck = ((ck << 8) & 0xFF00) ^ table[(ck >> 8) ^ b]
+    return ck
+
+
+def crc16_batch(buf, spans) -> list:
+    """Computes the CRC-16 of many (offset, length) spans of a single buffer
+
+    Spans are read through a memoryview, so no per-packet copies are made.
+    """
+    table = CRC16_TABLE
+    mv = memoryview(buf)
+    rv = []
+    for offset, length in spans:
+        ck = CRC16_INIT
+        for b in mv[offset:offset+length]:
+            ck = ((ck << 8) & 0xFF00) ^ table[(ck >> 8) ^ b]
+        rv.append(ck)
+    return rv
+
+
+class CRC16():
+    """Incremental CRC-16 calculator"""
+
+    def __init__(self, data=b''):
+        self.value = CRC16_INIT
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        """Feeds more bytes into the checksum"""
+        self.value = crc16(data, self.value)
+        return self
+
+    def copy(self):
+        """Returns an independent copy of the calculator state"""
+        obj = CRC16()
+        obj.value = self.value
+        return obj
+
+    def digest(self) -> bytes:
+        """Returns the checksum as 2 big endian bytes"""
+        return self.value.to_bytes(2, byteorder='big')
@@ -0,0 +1,177 @@
+import collections
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+
+from satcom.openlst.receiver import MAX_ENCODED_LENGTH, OpenLSTReceiver
+from satcom.openlst.space_packet_lib import SPACE_PACKET_MAX_LENGTH, SpacePacket
+
+# frame and packet lengths are native ints at the start of a slot
+_LENGTH_SIZE = 4
+
+
+def _slot_layout(batch_size: int) -> tuple:
+    """Returns the offsets of the input lengths, input frames, output lengths and output packets"""
+    in_lengths = 0
+    in_frames = in_lengths + batch_size * _LENGTH_SIZE
+    out_lengths = in_frames + batch_size * MAX_ENCODED_LENGTH
+    out_packets = out_lengths + batch_size * _LENGTH_SIZE
+    size = out_packets + batch_size * SPACE_PACKET_MAX_LENGTH
+    return in_lengths, in_frames, out_lengths, out_packets, size
+
+
+# per worker process state
+_attached = {}
+_receiver = None
+
+
+def _decode_slot(name: str, batch_size: int, count: int) -> int:
+    """Decodes the frames in a shared memory slot into its packet buffer
+
+    Runs in a worker process. A packet length of 0 marks a malformed frame.
+    """
+    global _receiver
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _attached[name] = shared_memory.SharedMemory(name=name)
+    if _receiver is None:
+        _receiver = OpenLSTReceiver()
+
+    in_lengths, in_frames, out_lengths, out_packets, _ = _slot_layout(batch_size)
+    mv = shm.buf
+    frame_lengths = mv[in_lengths:in_frames].cast('i')
+    packet_lengths = mv[out_lengths:out_packets].cast('i')
+    try:
+        for i in range(count):
+            offset = in_frames + i * MAX_ENCODED_LENGTH
+            try:
+                bs = _receiver.receive(mv[offset:offset+frame_lengths[i]]).to_bytes()
+            except ValueError:
+                packet_lengths[i] = 0
+                continue
+            offset = out_packets + i * SPACE_PACKET_MAX_LENGTH
+            mv[offset:offset+len(bs)] = bs
+            packet_lengths[i] = len(bs)
+    finally:
+        frame_lengths.release()
+        packet_lengths.release()
+    return count
+
+
+class DecodePool():
+    """Decodes OpenLST frames into SpacePackets across worker processes
+
+    Frames are copied in batches of batch_size into shared memory slots,
+    decoded by OpenLSTReceiver in a ProcessPoolExecutor and read back
+    from the same slots, so only slot names cross the process boundary.
+    At most max_pending batches are in flight: process reads further
+    frames only as decoded packets are consumed, and packets come out in
+    the order their frames went in.
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = 256, max_pending: int = None):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * workers
+        self._layout = _slot_layout(batch_size)
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        self._slots = []
+        self._free = []
+
+        self.frames = 0
+        self.dropped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stops the workers and releases the shared memory"""
+        self._executor.shutdown(wait=True)
+        for shm in self._slots:
+            shm.close()
+            shm.unlink()
+        self._slots = []
+        self._free = []
+
+    def _slot(self) -> shared_memory.SharedMemory:
+        if self._free:
+            return self._free.pop()
+        shm = shared_memory.SharedMemory(create=True, size=self._layout[-1])
+        self._slots.append(shm)
+        return shm
+
+    def _fill(self, shm, frames) -> int:
+        """Copies up to batch_size frames into a slot, returning how many"""
+        in_lengths, in_frames, _, _, _ = self._layout
+        mv = shm.buf
+        lengths = mv[in_lengths:in_frames].cast('i')
+        count = 0
+        try:
+            for frame in frames:
+                n = min(len(frame), MAX_ENCODED_LENGTH)
+                offset = in_frames + count * MAX_ENCODED_LENGTH
+                mv[offset:offset+n] = memoryview(frame)[:n]
+                lengths[count] = n
+                count += 1
+                if count == self.batch_size:
+                    break
+        finally:
+            lengths.release()
+        return count
+
+    def _read(self, shm, count: int) -> list:
+        """Hydrates the packets decoded into a slot"""
+        _, _, out_lengths, out_packets, _ = self._layout
+        mv = shm.buf
+        lengths = mv[out_lengths:out_packets].cast('i')
+        packets = []
+        try:
+            for i in range(count):
+                n = lengths[i]
+                if n == 0:
+                    self.dropped += 1
+                    continue
+                offset = out_packets + i * SPACE_PACKET_MAX_LENGTH
+                packets.append(SpacePacket.from_bytes(bytes(mv[offset:offset+n])))
+        finally:
+            lengths.release()
+        return packets
+
+    def process(self, frames):
+        """Yields a SpacePacket for each frame, in order, counting and skipping malformed ones"""
+        frames = iter(frames)
+        pending = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_pending:
+                    shm = self._slot()
+                    count = self._fill(shm, frames)
+                    if count < self.batch_size:
+                        exhausted = True
+                    if count == 0:
+                        self._free.append(shm)
+                        break
+                    self.frames += count
+                    fut = self._executor.submit(_decode_slot, shm.name, self.batch_size, count)
+                    pending.append((fut, shm, count))
+
+                if not pending:
+                    return
+                fut, shm, count = pending.popleft()
+                fut.result()
+                packets = self._read(shm, count)
+                self._free.append(shm)
+                yield from packets
+        finally:
+            # the workers may still be writing to abandoned slots
+            for fut, shm, _ in pending:
+                concurrent.futures.wait([fut])
+                self._free.append(shm)
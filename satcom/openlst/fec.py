@@ -8,25 +8,28 @@
 # This code was copied from https://github.com/rzimmerman/gr-openlst at
 # commit 09ba2480de7f5f620f398f387ab402bbf75fa64e
 # 
-aTrellisSourceStateLut = (
-    (0, 4), (0, 4), (1, 5), (1, 5), (2, 6), (2, 6), (3, 7), (3, 7),
-)
-aTrellisTransitionOutput = (
-    (0, 3), (3, 0), (1, 2), (2, 1), (3, 0), (0, 3), (2, 1), (1, 2),
-)
-aTrellisTransitionInput = (0, 1, 0, 1, 0, 1, 0, 1,)
+import struct
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it speeds up bulk interleaving and batch decoding
+    np = None
+
+from satcom.openlst import viterbi
+
+aTrellisSourceStateLut = viterbi.TRELLIS_SOURCE_STATES
+aTrellisTransitionOutput = viterbi.TRELLIS_TRANSITION_OUTPUT
+aTrellisTransitionInput = viterbi.TRELLIS_TRANSITION_INPUT
 
 
 def hamming_weight(byte: int) -> int:
     """Return the number of one bits in a byte"""
-    return sum(int(b) for b in f"{byte:b}")
+    return bin(byte).count("1")
 
 
-def interleave(chunk: bytes) -> bytes:
-    """Interleave or deinterleave a 4 byte chunk"""
-    if len(chunk) != 4:
-        raise ValueError("interleaving only works on 4 byte chunks")
-    chunk_int = int.from_bytes(chunk, byteorder='little')
+def _interleave_bits(chunk_int: int) -> int:
+    """Transpose the 4x4 grid of bit pairs in a 32 bit chunk, one pair at a time"""
     grid = []
     for _ in range(4):
         row = []
@@ -41,7 +44,70 @@ def interleave(chunk: bytes) -> bytes:
         for y in range(4):
             flipped = flipped << 2
             flipped |= grid[y][x]
-    return flipped.to_bytes(4, byteorder='little')
+    return flipped
+
+
+# INTERLEAVE_TABLES[i][b] is the interleaved (little endian) chunk value
+# contributed by byte b at position i of the chunk. Interleaving only
+# moves bit pairs around, so a chunk interleaves to the OR of the
+# contributions of its four bytes.
+INTERLEAVE_TABLES = tuple(
+    tuple(_interleave_bits(b << (8 * i)) for b in range(256))
+    for i in range(4)
+)
+
+# Buffers at least this long use the numpy path of interleave_frame
+_NUMPY_MIN_BYTES = 256
+_NUMPY_INTERLEAVE_TABLES = None if np is None else np.array(INTERLEAVE_TABLES, dtype=np.uint32)
+
+
+def interleave(chunk: bytes) -> bytes:
+    """Interleave or deinterleave a 4 byte chunk"""
+    if len(chunk) != 4:
+        raise ValueError("interleaving only works on 4 byte chunks")
+    t0, t1, t2, t3 = INTERLEAVE_TABLES
+    b0, b1, b2, b3 = chunk
+    return (t0[b0] | t1[b1] | t2[b2] | t3[b3]).to_bytes(4, byteorder='little')
+
+
+def deinterleave(chunk: bytes) -> bytes:
+    """Deinterleave a 4 byte chunk
+
+    Interleaving transposes a 4x4 grid, so it is its own inverse.
+    """
+    return interleave(chunk)
+
+
+def _interleave_frame_numpy(frame) -> bytes:
+    """Interleave every 4 byte chunk of a buffer with numpy table lookups"""
+    chunks = np.frombuffer(frame, dtype=np.uint8).reshape(-1, 4)
+    tables = _NUMPY_INTERLEAVE_TABLES
+    words = tables[0][chunks[:, 0]]
+    for i in range(1, 4):
+        words |= tables[i][chunks[:, i]]
+    return words.astype('<u4').tobytes()
+
+
+def interleave_frame(frame: bytes) -> bytes:
+    """Interleave or deinterleave every 4 byte chunk of a buffer in one call"""
+    if len(frame) % 4 != 0:
+        raise ValueError("frame length must be a multiple of 4 bytes")
+    if np is not None and len(frame) >= _NUMPY_MIN_BYTES:
+        return _interleave_frame_numpy(frame)
+
+    t0, t1, t2, t3 = INTERLEAVE_TABLES
+    mv = memoryview(frame).cast('B')
+    words = [
+        t0[b0] | t1[b1] | t2[b2] | t3[b3]
+        for b0, b1, b2, b3 in zip(mv[0::4], mv[1::4], mv[2::4], mv[3::4])
+    ]
+    return struct.pack(f"<{len(words)}I", *words)
+
+
+def deinterleave_frame(frame: bytes) -> bytes:
+    """Deinterleave every 4 byte chunk of a frame"""
+    return interleave_frame(frame)
+
 
 def decode_fec_chunk():
     """decode_fec_chunk returns a generator for FEC decode/correction
@@ -51,54 +117,121 @@ def decode_fec_chunk():
 
     The caller passes in 4 byte chunks using the `send` function. The
     generator yields decoded chunks.
+
+    This is a compatibility wrapper around viterbi.ViterbiDecoder; prefer
+    decode_fec when the whole frame is available.
     """
-    path_bits = 0
-    cost = [[100] * 8, [0] * 8]
-    path = [[0] * 8, [0] * 8]
-    last_buf = 0
-    cur_buf = 1
-    out = []
+    decoder = viterbi.ViterbiDecoder()
+    out = b""
 
     while True:
-        chunk = yield bytes(out)
-        chunk = interleave(chunk)
-
-        symbols = []
-        for b in chunk:
-            for _ in range(4):
-                symbols.append((b & 0xc0) >> 6)
-                b <<= 2
-        out = []
-        for symbol in symbols:
-            # check each state in the trellis
-            min_cost = 0xff
-            for dest_state in range(8):
-                input_bit = aTrellisTransitionInput[dest_state]
-                src_state0 = aTrellisSourceStateLut[dest_state][0]
-                cost0 = cost[last_buf][src_state0]
-                cost0 += hamming_weight(symbol ^ aTrellisTransitionOutput[dest_state][0])
-                src_state1 = aTrellisSourceStateLut[dest_state][1]
-                cost1 = cost[last_buf][src_state1]
-                cost1 += hamming_weight(symbol ^ aTrellisTransitionOutput[dest_state][1])
-
-                if cost0 < cost1:
-                    cost[cur_buf][dest_state] = cost0
-                    min_cost = min(min_cost, cost0)
-                    path[cur_buf][dest_state] = (path[last_buf][src_state0] << 1) | input_bit
-                else:
-                    cost[cur_buf][dest_state] = cost1
-                    min_cost = min(min_cost, cost1)
-                    path[cur_buf][dest_state] = (path[last_buf][src_state1] << 1) | input_bit
-            path_bits += 1
-
-
-            if path_bits >= 32:
-                out.append((path[cur_buf][0] >> 24) & 0xff)
-                path_bits -= 8
-            last_buf = (last_buf + 1) % 2
-            cur_buf = (cur_buf + 1) % 2
-            for i in range(8):
-                cost[last_buf][i] -= min_cost
+        chunk = yield out
+        out = decoder.decode(deinterleave(chunk))
+
+
+def decode_fec(frame: bytes) -> bytes:
+    """Decode a complete FEC + interleaved frame
+
+    Output is identical to passing the frame through decode_fec_chunk
+    4 bytes at a time and concatenating the results.
+    """
+    return viterbi.ViterbiDecoder().decode(deinterleave_frame(frame))
+
+
+def _frame_symbols_numpy(frames):
+    """Deinterleave an (N, L) uint8 array of frames into (N, 4L) 2-bit symbols"""
+    n, length = frames.shape
+    chunks = frames.reshape(n, length // 4, 4)
+    # pairs[..., byte, i] is the i-th bit pair of each byte, MSB first
+    pairs = np.stack([(chunks >> shift) & 0x3 for shift in (6, 4, 2, 0)], axis=-1)
+    # deinterleaving transposes the 4x4 grid of bit pairs in every chunk
+    return pairs[:, :, ::-1, ::-1].transpose(0, 1, 3, 2).reshape(n, length * 4)
+
+
+def decode_fec_batch(frames):
+    """Decode many equal length FEC + interleaved frames at once
+
+    Accepts an (N, L) uint8 array or a sequence of N equal length bytes
+    objects. All N trellises are run in lockstep as numpy array operations.
+    Returns a tuple of the decoded (N, M) uint8 array and the (N,) path
+    metrics, i.e. the number of bit errors corrected in each frame. Each
+    row is identical to the output of decode_fec for that frame.
+    """
+    if np is None:
+        raise ImportError("decode_fec_batch requires numpy")
+
+    if isinstance(frames, np.ndarray):
+        frames = np.asarray(frames, dtype=np.uint8)
+    else:
+        frames = list(frames)
+        lengths = set(len(f) for f in frames)
+        if len(lengths) > 1:
+            raise ValueError("frames must all have the same length")
+        length = lengths.pop() if lengths else 0
+        frames = np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(len(frames), length)
+
+    if frames.ndim != 2:
+        raise ValueError("frames must be an (N, L) array")
+    if frames.shape[1] % 4 != 0:
+        raise ValueError("frame length must be a multiple of 4 bytes")
+
+    return viterbi.decode_symbols_numpy(_frame_symbols_numpy(frames))
+
+
+# Deinterleaved symbol k of a 4 byte chunk is interleaved symbol
+# DEINTERLEAVE_SYMBOL_ORDER[k], counting 2-bit symbols MSB first
+DEINTERLEAVE_SYMBOL_ORDER = tuple(4 * (3 - k % 4) + (3 - k // 4) for k in range(16))
+_SOFT_CHUNK = 32
+
+
+def deinterleave_soft(soft):
+    """Deinterleave soft values, one per coded bit, moving whole symbols
+
+    The length must be a multiple of 32 values (one 4 byte chunk). A numpy
+    array is returned for numpy input, and a list otherwise.
+    """
+    if len(soft) % _SOFT_CHUNK != 0:
+        raise ValueError("soft values must be a multiple of 32 per frame")
+    if np is not None and isinstance(soft, np.ndarray):
+        shape = soft.shape
+        pairs = soft.reshape(-1, 16, 2)[:, DEINTERLEAVE_SYMBOL_ORDER, :]
+        return pairs.reshape(shape)
+
+    out = []
+    for c in range(0, len(soft), _SOFT_CHUNK):
+        for k in DEINTERLEAVE_SYMBOL_ORDER:
+            out.append(soft[c + 2*k])
+            out.append(soft[c + 2*k + 1])
+    return out
+
+
+def decode_fec_soft(soft) -> bytes:
+    """Decode a complete FEC + interleaved frame of soft values
+
+    soft holds one quantized value per coded bit in air order, positive
+    for a 1, see viterbi.quantize_soft. With values of +-1 the output is
+    identical to decode_fec.
+    """
+    return viterbi.SoftViterbiDecoder().decode(deinterleave_soft(soft))
+
+
+def decode_fec_soft_batch(soft):
+    """Decode many equal length frames of soft values at once
+
+    Accepts an (N, 8L) array, one row of quantized soft values per
+    frame, and returns the decoded (N, M) uint8 array and (N,) path
+    metrics as decode_fec_batch does.
+    """
+    if np is None:
+        raise ImportError("decode_fec_soft_batch requires numpy")
+
+    soft = np.asarray(soft)
+    if soft.ndim != 2:
+        raise ValueError("soft values must be an (N, 8L) array")
+    if soft.shape[1] % _SOFT_CHUNK != 0:
+        raise ValueError("soft values must be a multiple of 32 per frame")
+    n = soft.shape[0]
+    return viterbi.decode_soft_numpy(deinterleave_soft(soft.reshape(-1)).reshape(n, -1))
 
 
 # From CC1110 DN504 (A)
@@ -110,29 +243,101 @@ FEC_ENCODE_TABLE = [
 ]
 
 
+# Trellis termination bytes appended to every encoded payload
+FEC_TERMINATOR = b"\x0b\x0b"
+
+
+def _encode_fec_byte(key: int) -> int:
+    """Encode one byte from the register state, returning the 16 bit output
+
+    The key is the FEC register before the byte is shifted in, i.e. the
+    low 3 bits of the previous byte in bits 8-10 ORed with the new byte.
+    """
+    fec_reg = key
+    fec_output = 0
+    for _ in range(8):
+        fec_output = (fec_output << 2) | FEC_ENCODE_TABLE[fec_reg >> 7]
+        fec_reg = (fec_reg << 1) & 0x07ff
+    return fec_output
+
+
+# FEC_ENCODE_BYTE_TABLE[state << 8 | byte] is the 16 bit encoder output
+FEC_ENCODE_BYTE_TABLE = tuple(_encode_fec_byte(key) for key in range(0x800))
+
+# Encoder output for the first and second byte of each 4 byte chunk,
+# already mapped through the interleaver
+_FEC_ENCODE_INTERLEAVED = tuple(
+    tuple(
+        INTERLEAVE_TABLES[i][out >> 8] | INTERLEAVE_TABLES[i + 1][out & 0xff]
+        for out in FEC_ENCODE_BYTE_TABLE
+    )
+    for i in (0, 2)
+)
+
+
+def encoded_length(n: int) -> int:
+    """Return the length of the FEC encoded form of an n byte payload"""
+    return ((n + len(FEC_TERMINATOR)) * 2 + 3) // 4 * 4
+
+
+def _encode_fec_words(raw) -> list:
+    """Encode and interleave a payload into a list of little endian 32 bit chunks"""
+    keys = []
+    state = 0
+    for c in raw:
+        keys.append(state | c)
+        state = (c & 0x7) << 8
+    for c in FEC_TERMINATOR:
+        keys.append(state | c)
+        state = (c & 0x7) << 8
+
+    first, second = _FEC_ENCODE_INTERLEAVED
+    words = [first[k0] | second[k1] for k0, k1 in zip(keys[0::2], keys[1::2])]
+    if len(keys) % 2:
+        # the final chunk is padded with zeros, which interleave to nothing
+        words.append(first[keys[-1]])
+    return words
+
+
 def encode_fec(raw: bytes):
     """Encode bytes with the CC1110 FEC + interleaving mechanism
     
     Poorly copied and half-heartedly translated to Python from CC1110 DN504 (A)
     """
-    rv = b""
-    terminated = raw + b"\x0b\x0b"
-    fec_reg = 0
-    chunk = b""
-    for c in terminated:
-        fec_reg = (fec_reg & 0x700) | c
-        fec_output = 0
-        for j in range(8):
-            fec_output = (fec_output << 2) | FEC_ENCODE_TABLE[fec_reg >> 7]
-            fec_reg = (fec_reg << 1) & 0x07ff
-        chunk += fec_output.to_bytes(2, byteorder="big")
-        if len(chunk) == 4:
-            rv += interleave(chunk)
-            chunk = b""
-    if len(chunk) == 0:
-        pass
-    elif len(chunk) == 2:
-        rv += interleave(chunk + b"\0\0")
-    else:
-        raise Exception(f"unexpected chunk length {len(chunk)}")
-    return rv
\ No newline at end of file
+    words = _encode_fec_words(raw)
+    return struct.pack(f"<{len(words)}I", *words)
+
+
+def encode_fec_into(raw: bytes, out, offset: int = 0) -> int:
+    """Encode bytes directly into a writable buffer at the given offset
+
+    The buffer may be a bytearray or a writable memoryview and must have
+    room for encoded_length(len(raw)) bytes. Returns the number of bytes
+    written.
+    """
+    words = _encode_fec_words(raw)
+    n = len(words) * 4
+    if offset < 0 or offset + n > len(out):
+        raise ValueError("output buffer too small")
+    struct.pack_into(f"<{len(words)}I", out, offset, *words)
+    return n
+
+
+def encode_fec_batch(payloads) -> tuple:
+    """Encode many payloads back to back into a single preallocated buffer
+
+    Returns a tuple of the bytearray and the (offset, length) span of
+    each encoded payload within it.
+    """
+    payloads = list(payloads)
+    spans = []
+    offset = 0
+    for p in payloads:
+        n = encoded_length(len(p))
+        spans.append((offset, n))
+        offset += n
+
+    buf = bytearray(offset)
+    for p, (offset, _) in zip(payloads, spans):
+        encode_fec_into(p, buf, offset)
+    return buf, spans
@@ -0,0 +1,121 @@
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it speeds up searching with bit errors allowed
+    np = None
+
+from satcom.openlst.receiver import FRAME_PREFIX_LENGTH, encoded_frame_length
+from satcom.openlst.space_packet_lib import SPACE_PACKET_ASM
+
+POPCOUNT8 = tuple(bin(b).count('1') for b in range(256))
+_NUMPY_POPCOUNT8 = None if np is None else np.array(POPCOUNT8, dtype=np.uint8)
+# candidate ASM positions tested per numpy pass
+_SEARCH_WINDOW = 1024
+
+
+class FrameSynchronizer():
+    """Finds OpenLST frames in a continuous, byte aligned stream
+
+    Arbitrary sized chunks are passed to feed(), which returns the encoded
+    frames (the bytes following each ASM) completed by that chunk. Frame
+    lengths are taken from the decoded packet length byte. Bytes are only
+    ever scanned once, and only the unmatched tail of the stream or the
+    frame in progress is kept, so memory stays bounded.
+
+    With max_bit_errors > 0, an ASM is also matched when up to that many
+    of its bits are flipped.
+    """
+
+    def __init__(self, max_bit_errors: int = 0, asm: bytes = SPACE_PACKET_ASM):
+        self.max_bit_errors = max_bit_errors
+        self.asm = bytes(asm)
+        self._buf = bytearray()
+        # offset in _buf where the next ASM search starts
+        self._scan = 0
+        # encoded length of the frame at the start of _buf, once known
+        self._frame_length = None
+        self._in_frame = False
+        self.frames = 0
+        self.discarded = 0
+
+    def reset(self):
+        """Drops any partial frame and buffered data"""
+        self._buf.clear()
+        self._scan = 0
+        self._frame_length = None
+        self._in_frame = False
+
+    def _find_asm(self) -> int:
+        """Returns the offset of the next ASM in the buffer at or after _scan, or -1"""
+        buf = self._buf
+        if self.max_bit_errors <= 0:
+            return buf.find(self.asm, self._scan)
+
+        n = len(buf) - len(self.asm) + 1
+        if n <= self._scan:
+            return -1
+        if np is not None:
+            arr = np.frombuffer(buf, dtype=np.uint8)
+            # search a window at a time, so finding each of many frames in a
+            # large chunk does not cost a pass over the rest of the chunk
+            while self._scan < n:
+                stop = min(n, self._scan + _SEARCH_WINDOW)
+                errors = np.zeros(stop - self._scan, dtype=np.uint8)
+                for i, a in enumerate(self.asm):
+                    errors += _NUMPY_POPCOUNT8[arr[self._scan+i:stop+i] ^ a]
+                hits = np.flatnonzero(errors <= self.max_bit_errors)
+                if len(hits):
+                    return self._scan + int(hits[0])
+                self._scan = stop
+            return -1
+
+        asm = self.asm
+        for pos in range(self._scan, n):
+            errors = 0
+            for i, a in enumerate(asm):
+                errors += POPCOUNT8[buf[pos+i] ^ a]
+            if errors <= self.max_bit_errors:
+                return pos
+        return -1
+
+    def feed(self, chunk) -> list:
+        """Adds bytes from the stream, returning any frames they complete"""
+        buf = self._buf
+        buf += chunk
+        frames = []
+        # bytes before start are consumed; they are trimmed once at the end,
+        # as deleting from the front of buf moves everything after
+        start = 0
+
+        while True:
+            if not self._in_frame:
+                self._scan = max(self._scan, start)
+                pos = self._find_asm()
+                if pos < 0:
+                    # keep just enough to match an ASM split across chunks
+                    keep = len(self.asm) - 1
+                    end = max(start, len(buf) - keep)
+                    self.discarded += end - start
+                    start = end
+                    break
+                self.discarded += pos - start
+                start = pos + len(self.asm)
+                self._in_frame = True
+                self._frame_length = None
+
+            if self._frame_length is None:
+                if len(buf) - start < FRAME_PREFIX_LENGTH:
+                    break
+                self._frame_length = encoded_frame_length(buf[start:start+FRAME_PREFIX_LENGTH])
+
+            end = start + self._frame_length
+            if len(buf) < end:
+                break
+            frames.append(bytes(buf[start:end]))
+            start = end
+            self._in_frame = False
+            self.frames += 1
+
+        del buf[:start]
+        self._scan = 0
+        return frames
@@ -0,0 +1,309 @@
+import abc
+import asyncio
+
+from satcom.openlst import viterbi, whitening
+from satcom.openlst.framesync import FrameSynchronizer
+from satcom.openlst.receiver import OpenLSTReceiver, decode_frame
+from satcom.openlst.space_packet_lib import SpacePacket
+from satcom.openlst.transport import ClientPacketDeframer
+
+
+class Stage(abc.ABC):
+    """A step of a Pipeline
+
+    feed takes one item and returns the list of items it produces, which
+    may be empty, and flush returns whatever is left over at the end of
+    the stream. Stages are composed with |, and calling a stage on an
+    iterable returns a lazy iterator of its output.
+    """
+
+    @abc.abstractmethod
+    def feed(self, item) -> list:
+        """Returns the items produced from item"""
+
+    def flush(self) -> list:
+        return []
+
+    def __or__(self, other) -> 'Pipeline':
+        return Pipeline(self, other)
+
+    def __ror__(self, other) -> 'Pipeline':
+        return Pipeline(other, self)
+
+    def __call__(self, items):
+        for item in items:
+            yield from self.feed(item)
+        yield from self.flush()
+
+
+class Map(Stage):
+    """Replaces each item by fn(item)"""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def feed(self, item) -> list:
+        return [self.fn(item)]
+
+
+class Filter(Stage):
+    """Passes on the items for which predicate(item) is true"""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.rejected = 0
+
+    def feed(self, item) -> list:
+        if self.predicate(item):
+            return [item]
+        self.rejected += 1
+        return []
+
+
+class Tap(Stage):
+    """Calls fn on each item and passes the item on unchanged"""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def feed(self, item) -> list:
+        self.fn(item)
+        return [item]
+
+
+class Batch(Stage):
+    """Groups items into lists of size items, the last one possibly shorter"""
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError('size must be positive')
+        self.size = size
+        self._batch = []
+
+    def feed(self, item) -> list:
+        self._batch.append(item)
+        if len(self._batch) < self.size:
+            return []
+        batch, self._batch = self._batch, []
+        return [batch]
+
+    def flush(self) -> list:
+        batch, self._batch = self._batch, []
+        return [batch] if batch else []
+
+
+class FrameSync(Stage):
+    """Splits chunks of a byte stream into encoded frames, see FrameSynchronizer"""
+
+    def __init__(self, max_bit_errors: int = 0):
+        self.synchronizer = FrameSynchronizer(max_bit_errors)
+
+    def feed(self, chunk) -> list:
+        return self.synchronizer.feed(chunk)
+
+
+class Dewhiten(Stage):
+    """Dewhitens each frame"""
+
+    def feed(self, frame) -> list:
+        return [whitening.whiten(frame)]
+
+
+class Decode(Stage):
+    """FEC decodes each dewhitened frame into packet bytes, dropping malformed frames
+
+    See receiver.decode_frame, which OpenLSTReceiver uses too.
+    """
+
+    def __init__(self):
+        self._decoder = viterbi.ViterbiDecoder()
+        self.dropped = 0
+
+    def feed(self, frame) -> list:
+        try:
+            return [decode_frame(self._decoder, frame)]
+        except ValueError:
+            self.dropped += 1
+            return []
+
+
+class Receive(Stage):
+    """Dewhitens, decodes and parses each frame into a SpacePacket, see OpenLSTReceiver
+
+    Equivalent to Dewhiten() | Decode() | Parse(), but reuses buffers.
+    """
+
+    def __init__(self):
+        self.receiver = OpenLSTReceiver()
+
+    def feed(self, frame) -> list:
+        try:
+            return [self.receiver.receive(frame)]
+        except ValueError:
+            self.receiver.dropped += 1
+            return []
+
+
+class Parse(Stage):
+    """Parses packet bytes with packet_class.from_bytes, dropping malformed packets"""
+
+    def __init__(self, packet_class=SpacePacket):
+        self.packet_class = packet_class
+        self.dropped = 0
+
+    def feed(self, bs) -> list:
+        try:
+            return [self.packet_class.from_bytes(bs)]
+        except ValueError:
+            self.dropped += 1
+            return []
+
+
+class Deframe(Stage):
+    """Splits chunks of a serial byte stream into ClientPackets, see ClientPacketDeframer"""
+
+    def __init__(self):
+        self.deframer = ClientPacketDeframer()
+
+    def feed(self, chunk) -> list:
+        return self.deframer.feed(chunk)
+
+
+async def _aclose(source):
+    if hasattr(source, 'aclose'):
+        await source.aclose()
+
+
+async def _buffered(source, size: int):
+    """Reads an async iterable ahead into a queue of at most size items"""
+    queue = asyncio.Queue(size)
+    done = object()
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+        finally:
+            # once cancelled, nothing reads the queue, which may be full
+            if not cancelled:
+                await queue.put(done)
+
+    cancelled = False
+    finished = False
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                finished = True
+                break
+            yield item
+    finally:
+        if not finished:
+            # stopped early, e.g. the consumer broke out of its loop
+            cancelled = True
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            await _aclose(source)
+    # raises the source's exception, if any
+    await task
+
+
+async def _aiter(source):
+    if hasattr(source, '__aiter__'):
+        try:
+            async for item in source:
+                yield item
+        finally:
+            await _aclose(source)
+    else:
+        for item in source:
+            yield item
+
+
+class Pipeline(Stage):
+    """Chains stages, each fed the output of the one before
+
+    e.g. FrameSync() | Receive() | Filter(lambda p: p.header.port == 1)
+    turns chunks of a demodulated byte stream into the SpacePackets sent
+    to port 1. Items are pushed through all stages one input at a time,
+    so memory use does not grow with the length of the stream. Plain
+    callables are taken as Map stages.
+    """
+
+    def __init__(self, *stages):
+        self.stages = []
+        for stage in stages:
+            if isinstance(stage, Pipeline):
+                self.stages += stage.stages
+            elif isinstance(stage, Stage):
+                self.stages.append(stage)
+            elif callable(stage):
+                self.stages.append(Map(stage))
+            else:
+                raise ValueError(f'not a stage: {stage!r}')
+
+    def feed(self, item) -> list:
+        items = [item]
+        for stage in self.stages:
+            out = []
+            for item in items:
+                out += stage.feed(item)
+            if not out:
+                return out
+            items = out
+        return items
+
+    def flush(self) -> list:
+        items = []
+        for stage in self.stages:
+            # items left in earlier stages still go through the later ones
+            out = []
+            for item in items:
+                out += stage.feed(item)
+            items = out + stage.flush()
+        return items
+
+    def run(self, source, sink=None) -> int:
+        """Feeds every item of source through, passing each output to sink, returning the output count"""
+        count = 0
+        for item in self(source):
+            if sink is not None:
+                sink(item)
+            count += 1
+        return count
+
+    async def stream(self, source, buffer: int = 0):
+        """Yields the output for an async or plain iterable source
+
+        With buffer > 0 the source is read ahead by a separate task into a
+        queue of at most buffer items, so that a slow consumer does not
+        stall e.g. a socket reader, and a fast source is held back once
+        the queue is full. Closing the stream early closes the source.
+        """
+        items = _aiter(source)
+        if buffer > 0:
+            items = _buffered(items, buffer)
+        try:
+            async for item in items:
+                for out in self.feed(item):
+                    yield out
+        finally:
+            # also when the consumer stops early, so the source is closed
+            await items.aclose()
+        for out in self.flush():
+            yield out
+
+    async def run_async(self, source, sink=None, buffer: int = 0) -> int:
+        """Like run for an async source, awaiting sink's result if it is a coroutine"""
+        count = 0
+        async for item in self.stream(source, buffer):
+            if sink is not None:
+                res = sink(item)
+                if asyncio.iscoroutine(res):
+                    await res
+            count += 1
+        return count
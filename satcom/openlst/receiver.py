@@ -0,0 +1,110 @@
+import time
+
+from satcom.openlst import fec, viterbi, whitening
+from satcom.openlst.space_packet_lib import (
+    SPACE_PACKET_FOOTER_LENGTH,
+    SPACE_PACKET_HEADER_LENGTH,
+    SPACE_PACKET_MAX_LENGTH,
+    SpacePacket,
+)
+
+MAX_ENCODED_LENGTH = fec.encoded_length(SPACE_PACKET_MAX_LENGTH)
+
+# Encoded bytes needed before the decoder releases the packet length byte
+FRAME_PREFIX_LENGTH = 8
+
+
+def encoded_frame_length(prefix) -> int:
+    """Returns the encoded length of a frame from its first FRAME_PREFIX_LENGTH bytes"""
+    if len(prefix) < FRAME_PREFIX_LENGTH:
+        raise ValueError('insufficient data')
+    symbols = fec.deinterleave_frame(whitening.whiten(prefix[:FRAME_PREFIX_LENGTH]))
+    length = viterbi.ViterbiDecoder().decode(symbols)[0] + 1
+    return fec.encoded_length(length)
+
+
+def decode_frame(decoder, frame) -> bytes:
+    """Decodes the packet bytes from a dewhitened frame with a ViterbiDecoder
+
+    Only as many encoded bytes as the decoded length byte calls for are
+    decoded, so trailing bytes are ignored. Raises ValueError if the frame
+    is malformed.
+    """
+    n = len(frame) // 4 * 4
+    if n < FRAME_PREFIX_LENGTH:
+        raise ValueError('insufficient data')
+    decoder.reset()
+    out = decoder.decode(fec.deinterleave_frame(frame[:FRAME_PREFIX_LENGTH]))
+    length = out[0] + 1
+    if length > SPACE_PACKET_MAX_LENGTH:
+        raise ValueError(f'packet too long: {length} bytes')
+    if length < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH:
+        raise ValueError('insufficient data')
+    encoded = fec.encoded_length(length)
+    if encoded > n:
+        raise ValueError(f'truncated frame: want={encoded} got={n} bytes')
+    out += decoder.decode(fec.deinterleave_frame(frame[FRAME_PREFIX_LENGTH:encoded]))
+    out += decoder.flush()
+    return out[:length]
+
+
+class OpenLSTReceiver():
+    """Decodes raw demodulated OpenLST frames into SpacePackets
+
+    A frame is the encoded bytes following the ASM. Each frame is copied
+    into a reusable buffer, dewhitened in place, FEC decoded by a reused
+    Viterbi decoder and parsed. Only as many encoded bytes as the decoded
+    length byte calls for are processed, so trailing bytes are ignored.
+
+    Cumulative seconds spent in each stage are kept in `timings`.
+    """
+
+    def __init__(self):
+        self._buf = bytearray(MAX_ENCODED_LENGTH)
+        self._view = memoryview(self._buf)
+        self._decoder = viterbi.ViterbiDecoder()
+        self.timings = {'dewhiten': 0.0, 'decode': 0.0, 'parse': 0.0}
+        self.frames = 0
+        self.dropped = 0
+
+    def reset_stats(self):
+        """Clears the stage timings and frame counters"""
+        for k in self.timings:
+            self.timings[k] = 0.0
+        self.frames = 0
+        self.dropped = 0
+
+    def receive(self, frame) -> SpacePacket:
+        """Decodes one frame, raising ValueError if it is malformed"""
+        self.frames += 1
+        timings = self.timings
+
+        t0 = time.perf_counter()
+        n = min(len(frame), MAX_ENCODED_LENGTH) // 4 * 4
+        if n < FRAME_PREFIX_LENGTH:
+            raise ValueError('insufficient data')
+        view = self._view[:n]
+        view[:] = memoryview(frame)[:n]
+        whitening.whiten_inplace(view)
+
+        t1 = time.perf_counter()
+        out = decode_frame(self._decoder, view)
+
+        t2 = time.perf_counter()
+        pkt = SpacePacket.from_bytes(out)
+
+        t3 = time.perf_counter()
+        timings['dewhiten'] += t1 - t0
+        timings['decode'] += t2 - t1
+        timings['parse'] += t3 - t2
+        return pkt
+
+    def process(self, frames):
+        """Yields a SpacePacket for each frame, counting and skipping malformed ones"""
+        for frame in frames:
+            try:
+                pkt = self.receive(frame)
+            except ValueError:
+                self.dropped += 1
+                continue
+            yield pkt
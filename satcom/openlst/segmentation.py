@@ -0,0 +1,234 @@
+import collections
+import struct
+import time
+
+from satcom.openlst.space_packet_lib import (
+    SPACE_PACKET_FOOTER_LENGTH,
+    SPACE_PACKET_HEADER_LENGTH,
+    SPACE_PACKET_MAX_LENGTH,
+    SpacePacket,
+    SpacePacketFooter,
+    SpacePacketHeader,
+    pack_space_packet_into,
+)
+
+# first sequence_number of the transfer, segment size, total length
+SEGMENT_HEADER_STRUCT = struct.Struct('<HBI')
+SEGMENT_HEADER_LENGTH = SEGMENT_HEADER_STRUCT.size
+MAX_SEGMENT_SIZE = SPACE_PACKET_MAX_LENGTH - SPACE_PACKET_HEADER_LENGTH - SPACE_PACKET_FOOTER_LENGTH - SEGMENT_HEADER_LENGTH
+
+
+def segment_count(length: int, segment_size: int = MAX_SEGMENT_SIZE) -> int:
+    """Returns the number of packets a transfer of length bytes is split into"""
+    return max(1, -(-length // segment_size))
+
+
+def _check_transfer(length: int, segment_size: int):
+    if segment_size < 1 or segment_size > MAX_SEGMENT_SIZE:
+        raise ValueError(f'segment_size must be 1-{MAX_SEGMENT_SIZE}')
+    if segment_count(length, segment_size) > 65536:
+        raise ValueError(f'too much data for one sequence number range: {length} bytes')
+
+
+def segment(data, header: SpacePacketHeader, hardware_id: int = 0, segment_size: int = MAX_SEGMENT_SIZE):
+    """Yields the SpacePackets carrying data
+
+    A transfer takes consecutive sequence numbers from
+    header.sequence_number, wrapping at 65536, and each packet's data is
+    a segment header followed by a slice of data. The data of all
+    packets is laid out once in one buffer, and each packet's data is a
+    read-only view of it.
+    """
+    _check_transfer(len(data), segment_size)
+    n = len(data)
+    count = segment_count(n, segment_size)
+    src = memoryview(data)
+    first = header.sequence_number
+    payload = bytearray(count * SEGMENT_HEADER_LENGTH + n)
+    view = memoryview(payload)
+    spans = []
+    offset = 0
+    for i in range(count):
+        chunk = src[i*segment_size:(i+1)*segment_size]
+        length = SEGMENT_HEADER_LENGTH + len(chunk)
+        SEGMENT_HEADER_STRUCT.pack_into(payload, offset, first, segment_size, n)
+        view[offset+SEGMENT_HEADER_LENGTH:offset+length] = chunk
+        spans.append((offset, length))
+        offset += length
+    view = view.toreadonly()
+
+    for i, (offset, length) in enumerate(spans):
+        hdr = SpacePacketHeader(
+            port=header.port,
+            sequence_number=(first + i) & 0xFFFF,
+            destination=header.destination,
+            command_number=header.command_number
+        )
+        yield SpacePacket(view[offset:offset+length], hdr, SpacePacketFooter(hardware_id=hardware_id))
+
+
+def segment_into(data, header: SpacePacketHeader, hardware_id: int = 0,
+                 segment_size: int = MAX_SEGMENT_SIZE, out: bytearray = None) -> tuple:
+    """Encodes all packets carrying data back to back into one buffer
+
+    Segments are copied from data straight into out, which grows as
+    needed, so no per-packet objects are built. Returns a memoryview of
+    the packets and the (offset, length) of each.
+    """
+    _check_transfer(len(data), segment_size)
+    n = len(data)
+    count = segment_count(n, segment_size)
+    size = count * (SPACE_PACKET_HEADER_LENGTH + SEGMENT_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH) + n
+    if out is None:
+        out = bytearray(size)
+    elif len(out) < size:
+        out.extend(bytes(size - len(out)))
+
+    src = memoryview(data)
+    first = header.sequence_number
+    seg = SEGMENT_HEADER_STRUCT.pack(first, segment_size, n)
+    hdr = SpacePacketHeader(port=header.port, destination=header.destination, command_number=header.command_number)
+    spans = []
+    offset = 0
+    for i in range(count):
+        hdr.sequence_number = (first + i) & 0xFFFF
+        length = pack_space_packet_into(out, offset, hdr, src[i*segment_size:(i+1)*segment_size], hardware_id, seg)
+        spans.append((offset, length))
+        offset += length
+
+    return memoryview(out)[:offset], spans
+
+
+class Transfer():
+    """A partially received transfer, see Reassembler"""
+    __slots__ = ('key', 'buf', 'segment_size', 'length', 'count', 'received', 'bitmap', 'updated')
+
+    def __init__(self, key: tuple, buf, segment_size: int, length: int, now: float):
+        self.key = key
+        self.buf = buf
+        self.segment_size = segment_size
+        self.length = length
+        self.count = segment_count(length, segment_size)
+        self.received = 0
+        # one bit per segment, set once it is received
+        self.bitmap = bytearray((self.count + 7) // 8)
+        self.updated = now
+
+    def missing(self) -> list:
+        """Returns the indexes of segments not yet received"""
+        return [i for i in range(self.count) if not self.bitmap[i >> 3] & (1 << (i & 7))]
+
+
+class Reassembler():
+    """Reassembles transfers split by segment from received SpacePackets
+
+    Transfers are keyed by (hardware_id, port, first sequence_number) and
+    each is written into a buffer of its full length, allocated by
+    buffer_factory (bytearray, or e.g. an mmap) when its first segment
+    arrives. A bitmap tracks which segments have been received, so
+    segments may arrive in any order and duplicates are ignored.
+
+    Transfers not updated for timeout seconds expire, and the least
+    recently updated ones are evicted when buffers would exceed
+    memory_budget bytes.
+    """
+
+    def __init__(self, memory_budget: int = 1 << 24, timeout: float = 60.0,
+                 buffer_factory=bytearray, clock=time.monotonic):
+        self.memory_budget = memory_budget
+        self.timeout = timeout
+        self.buffer_factory = buffer_factory
+        self.clock = clock
+        # in order of last update, oldest first
+        self._transfers = collections.OrderedDict()
+        self.memory = 0
+
+        self.completed = 0
+        self.duplicates = 0
+        self.expired = 0
+        self.evicted = 0
+        self.dropped = 0
+
+    @property
+    def transfers(self) -> list:
+        """Partially received transfers, least recently updated first"""
+        return list(self._transfers.values())
+
+    def _remove(self, key: tuple) -> Transfer:
+        t = self._transfers.pop(key)
+        self.memory -= t.length
+        return t
+
+    def expire(self, now: float = None):
+        """Drops transfers not updated within timeout"""
+        if now is None:
+            now = self.clock()
+        while self._transfers:
+            t = next(iter(self._transfers.values()))
+            if now - t.updated < self.timeout:
+                break
+            self._remove(t.key)
+            self.expired += 1
+
+    def _start(self, key: tuple, segment_size: int, length: int, now: float) -> Transfer:
+        if length > self.memory_budget:
+            raise ValueError(f'transfer exceeds memory budget: {length} bytes')
+        while self.memory + length > self.memory_budget:
+            self._remove(next(iter(self._transfers)))
+            self.evicted += 1
+        t = Transfer(key, self.buffer_factory(length), segment_size, length, now)
+        self._transfers[key] = t
+        self.memory += length
+        return t
+
+    def feed(self, pkt):
+        """Adds a received packet, returning (key, data) for the transfer it completes or None
+
+        pkt is a SpacePacket or SpacePacketView. Packets failing their
+        checksum are dropped, and ValueError is raised for segments
+        inconsistent with their transfer.
+        """
+        if not pkt.crc_ok():
+            self.dropped += 1
+            return None
+
+        now = self.clock()
+        self.expire(now)
+
+        hdr = pkt.header
+        data = pkt.data
+        if len(data) < SEGMENT_HEADER_LENGTH:
+            raise ValueError('insufficient data')
+        first, segment_size, length = SEGMENT_HEADER_STRUCT.unpack_from(data, 0)
+        _check_transfer(length, segment_size)
+        key = (pkt.footer.hardware_id, hdr.port, first)
+
+        t = self._transfers.get(key)
+        if t is None:
+            t = self._start(key, segment_size, length, now)
+        elif t.segment_size != segment_size or t.length != length:
+            raise ValueError(f'segment inconsistent with transfer {key}')
+
+        i = (hdr.sequence_number - first) & 0xFFFF
+        if i >= t.count:
+            raise ValueError(f'sequence_number {hdr.sequence_number} outside transfer {key}')
+        offset = i * segment_size
+        n = len(data) - SEGMENT_HEADER_LENGTH
+        if n != min(segment_size, length - offset):
+            raise ValueError(f'unexpected segment length: {n} bytes')
+
+        t.updated = now
+        self._transfers.move_to_end(key)
+        bit = 1 << (i & 7)
+        if t.bitmap[i >> 3] & bit:
+            self.duplicates += 1
+            return None
+        t.bitmap[i >> 3] |= bit
+        t.buf[offset:offset+n] = memoryview(data)[SEGMENT_HEADER_LENGTH:]
+        t.received += 1
+
+        if t.received < t.count:
+            return None
+        self._remove(key)
+        self.completed += 1
+        return key, t.buf
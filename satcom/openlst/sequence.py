@@ -0,0 +1,126 @@
+SEQUENCE_MODULUS = 1 << 16
+# sequence numbers less than half the modulus ahead are newer, the rest older
+SEQUENCE_HALF = SEQUENCE_MODULUS >> 1
+
+# outcomes of SequenceTracker.observe
+IN_ORDER = 0
+GAP = 1
+REORDERED = 2
+DUPLICATE = 3
+STALE = 4
+
+
+class SequenceStream():
+    """Sequence number state and counters of one (hardware_id, port)
+
+    top is the newest sequence number seen and bit i of window is set if
+    top - i has been seen, for the last span sequence numbers: at most
+    window_size, and none from before the first packet.
+    """
+    __slots__ = ('top', 'window', 'span', 'received', 'gaps', 'recovered', 'reordered', 'duplicates', 'stale')
+
+    def __init__(self, top: int):
+        self.top = top
+        self.window = 1
+        self.span = 1
+        self.received = 1
+        # sequence numbers skipped, and how many of those arrived late
+        self.gaps = 0
+        self.recovered = 0
+        self.reordered = 0
+        self.duplicates = 0
+        self.stale = 0
+
+    @property
+    def lost(self) -> int:
+        """Sequence numbers skipped and not (yet) received"""
+        return self.gaps - self.recovered
+
+
+class SequenceTracker():
+    """Tracks 16 bit sequence numbers per (hardware_id, port)
+
+    Each packet is classified in constant time against a sliding bitmap
+    of the last window_size sequence numbers of its stream, handling
+    wraparound at 65535: newer sequence numbers are IN_ORDER or skip a
+    GAP, and older ones are REORDERED if not seen before, a DUPLICATE if
+    they were, or STALE if they fall behind the window.
+    """
+
+    def __init__(self, window_size: int = 256):
+        if window_size < 1 or window_size > SEQUENCE_HALF:
+            raise ValueError(f'window_size must be 1-{SEQUENCE_HALF}')
+        self.window_size = window_size
+        self._mask = (1 << window_size) - 1
+        self.streams = {}
+
+    def observe(self, hardware_id: int, port: int, sequence_number: int) -> int:
+        """Records a sequence number, returning how it arrived"""
+        key = (hardware_id, port)
+        s = self.streams.get(key)
+        if s is None:
+            self.streams[key] = SequenceStream(sequence_number)
+            return IN_ORDER
+
+        s.received += 1
+        ahead = (sequence_number - s.top) & 0xFFFF
+        if ahead == 0:
+            s.duplicates += 1
+            return DUPLICATE
+        if ahead < SEQUENCE_HALF:
+            s.top = sequence_number
+            s.window = ((s.window << ahead) | 1) & self._mask
+            s.span = min(self.window_size, s.span + ahead)
+            if ahead == 1:
+                return IN_ORDER
+            s.gaps += ahead - 1
+            return GAP
+
+        behind = SEQUENCE_MODULUS - ahead
+        if behind >= s.span:
+            s.stale += 1
+            return STALE
+        bit = 1 << behind
+        if s.window & bit:
+            s.duplicates += 1
+            return DUPLICATE
+        s.window |= bit
+        s.recovered += 1
+        s.reordered += 1
+        return REORDERED
+
+    def observe_packet(self, pkt) -> int:
+        """Records the sequence number of a SpacePacket or ClientPacket
+
+        Client packets have no port, so they are tracked as port 0.
+        """
+        hdr = pkt.header
+        hardware_id = getattr(hdr, 'hardware_id', None)
+        if hardware_id is None:
+            hardware_id = pkt.footer.hardware_id
+        return self.observe(hardware_id, getattr(hdr, 'port', 0), hdr.sequence_number)
+
+    def filter(self, packets):
+        """Yields packets, dropping duplicates"""
+        for pkt in packets:
+            if self.observe_packet(pkt) != DUPLICATE:
+                yield pkt
+
+    def reset(self):
+        """Forgets all streams"""
+        self.streams.clear()
+
+    def _total(self, name: str) -> int:
+        return sum(getattr(s, name) for s in self.streams.values())
+
+    @property
+    def duplicates(self) -> int:
+        return self._total('duplicates')
+
+    @property
+    def reordered(self) -> int:
+        return self._total('reordered')
+
+    @property
+    def lost(self) -> int:
+        return sum(s.lost for s in self.streams.values())
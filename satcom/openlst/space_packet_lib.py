@@ -1,5 +1,7 @@
-from pydantic import BaseModel
+import struct
+from dataclasses import dataclass
 
+from satcom.openlst import crc
 from satcom.utils import utils
 
 
@@ -8,9 +10,17 @@ SPACE_PACKET_ASM = bytes([0xD3, 0x91, 0xD3, 0x91])
 
 SPACE_PACKET_HEADER_LENGTH = 6
 SPACE_PACKET_FOOTER_LENGTH = 4
+# the length byte counts the bytes following it, and is at most 254
+SPACE_PACKET_MAX_LENGTH = 255
 
+# length, port, sequence_number, destination, command_number
+SPACE_PACKET_HEADER_STRUCT = struct.Struct('<BBHBB')
+# hardware_id, crc16 checksum
+SPACE_PACKET_FOOTER_STRUCT = struct.Struct('<HH')
 
-class SpacePacketHeader(BaseModel):
+
+@dataclass(slots=True)
+class SpacePacketHeader():
     length: int = 0
     port: int = 0
     sequence_number:  int = 0
@@ -29,37 +39,43 @@ class SpacePacketHeader(BaseModel):
             return ValueError('command_number must be 0-255')
         return None
 
+    def _fields(self) -> tuple:
+        return (self.length, self.port, self.sequence_number, self.destination, self.command_number)
+
     def to_bytes(self) -> bytes:
         """Packs space packet header metadata into bytes"""
-        bs = bytearray(SPACE_PACKET_HEADER_LENGTH)
-
-        bs[0] = self.length
-        bs[1] = self.port
-        bs[2:4] = utils.pack_ushort_little_endian(self.sequence_number)
-        bs[4] = self.destination
-        bs[5] = self.command_number
-
-        return bytes(bs)
+        try:
+            return SPACE_PACKET_HEADER_STRUCT.pack(*self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack space packet header: {e}') from e
+
+    def pack_into(self, buf, offset: int = 0):
+        """Packs space packet header metadata into buf at offset"""
+        try:
+            SPACE_PACKET_HEADER_STRUCT.pack_into(buf, offset, *self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack space packet header: {e}') from e
 
     @classmethod
     def from_bytes(cls, bs: bytes):
         """Unpacks space packet header metadata from bytes"""
         if len(bs) != SPACE_PACKET_HEADER_LENGTH:
             raise ValueError('unexpected header length')
+        return cls.unpack_from(bs)
 
-        obj = cls(
-            length = bs[0],
-            port = bs[1],
-            sequence_number = utils.unpack_ushort_little_endian(bs[2:4]),
-            destination = bs[4],
-            command_number = bs[5]
-        )
-
-        return obj
-
-class SpacePacketFooter(BaseModel):
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        """Unpacks space packet header metadata from buf at offset"""
+        try:
+            # fields are declared in wire order
+            return cls(*SPACE_PACKET_HEADER_STRUCT.unpack_from(buf, offset))
+        except struct.error as e:
+            raise ValueError(f'cannot unpack space packet header: {e}') from e
+
+@dataclass(slots=True)
+class SpacePacketFooter():
     hardware_id: int = 0
-    crc16_checksum: bytes = []
+    crc16_checksum: bytes = b''
 
     def err(self):
         """Throws an error if any fields are out of bounds"""
@@ -69,107 +85,214 @@ class SpacePacketFooter(BaseModel):
             return ValueError('crc16_checksum set incorrectly.')
         return None
 
-    def to_bytes(self) -> bytes:
-        """Packs space packet footer metadata into bytes"""
-        bs = bytearray(SPACE_PACKET_FOOTER_LENGTH)
-
-        bs[0:2] = utils.pack_ushort_little_endian(self.hardware_id)
-
+    def _fields(self) -> tuple:
+        ck = 0
         if len(self.crc16_checksum) != 0:
-            # big to little endian mapping
-            bs[2] = self.crc16_checksum[1]
-            bs[3] = self.crc16_checksum[0]
+            # checksum is held big endian, but sent little endian
+            ck = (self.crc16_checksum[0] << 8) | self.crc16_checksum[1]
+        return (self.hardware_id, ck)
 
-        return bytes(bs)
+    def to_bytes(self) -> bytes:
+        """Packs space packet footer metadata into bytes"""
+        try:
+            return SPACE_PACKET_FOOTER_STRUCT.pack(*self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack space packet footer: {e}') from e
+
+    def pack_into(self, buf, offset: int = 0):
+        """Packs space packet footer metadata into buf at offset"""
+        try:
+            SPACE_PACKET_FOOTER_STRUCT.pack_into(buf, offset, *self._fields())
+        except struct.error as e:
+            raise ValueError(f'cannot pack space packet footer: {e}') from e
 
     @classmethod
     def from_bytes(cls, bs: bytes):
         """Unpack space packet footer from bytes"""
         if len(bs) != SPACE_PACKET_FOOTER_LENGTH:
             return ValueError('unexpected footer length')
+        return cls.unpack_from(bs)
 
-        crc16_checksum = bytearray(2)
-        # little to big endian mapping
-        crc16_checksum[0] = bs[3]
-        crc16_checksum[1] = bs[2]
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0):
+        """Unpack space packet footer from buf at offset"""
+        try:
+            hardware_id, ck = SPACE_PACKET_FOOTER_STRUCT.unpack_from(buf, offset)
+        except struct.error as e:
+            raise ValueError(f'cannot unpack space packet footer: {e}') from e
 
         obj = cls(
-            hardware_id = utils.unpack_ushort_little_endian(bs[0:2]),
-            crc16_checksum = bytes(crc16_checksum)
+            hardware_id = hardware_id,
+            crc16_checksum = ck.to_bytes(2, byteorder='big')
         )
 
         return obj
 
+def pack_space_packet_into(buf, offset: int, header: SpacePacketHeader, data, hardware_id: int,
+                           prefix: bytes = b'') -> int:
+    """Packs a space packet carrying prefix then data into buf at offset, returning its length
+
+    The length byte is computed from the data rather than taken from
+    header, and the checksum is computed over the packed bytes. prefix,
+    e.g. a segment header, saves joining it to data first.
+    """
+    n = SPACE_PACKET_HEADER_LENGTH + len(prefix) + len(data) + SPACE_PACKET_FOOTER_LENGTH
+    if n > SPACE_PACKET_MAX_LENGTH:
+        raise ValueError(f'packet too long: {n} bytes')
+    end = offset + n
+    try:
+        SPACE_PACKET_HEADER_STRUCT.pack_into(
+            buf, offset,
+            n - 1,
+            header.port,
+            header.sequence_number,
+            header.destination,
+            header.command_number
+        )
+        pos = offset + SPACE_PACKET_HEADER_LENGTH
+        if prefix:
+            buf[pos:pos+len(prefix)] = prefix
+            pos += len(prefix)
+        buf[pos:end-SPACE_PACKET_FOOTER_LENGTH] = data
+        # the checksum covers the hardware_id, so it is packed in two passes
+        SPACE_PACKET_FOOTER_STRUCT.pack_into(buf, end - SPACE_PACKET_FOOTER_LENGTH, hardware_id, 0)
+        ck = crc.crc16(memoryview(buf)[offset:end-2])
+        SPACE_PACKET_FOOTER_STRUCT.pack_into(buf, end - SPACE_PACKET_FOOTER_LENGTH, hardware_id, ck)
+    except struct.error as e:
+        raise ValueError(f'cannot pack space packet: {e}') from e
+    return n
+
 class SpacePacket():
+    """Space packet with a lazily encoded, cached wire form
+
+    The packet is encoded, and its checksum computed, at most once until
+    the header or footer change. Packets from from_bytes keep the
+    received checksum, so crc_ok compares it against one computed over
+    the received bytes instead of replacing it. The checksum of a new or
+    modified packet is filled in when the footer or the encoding is next
+    accessed, while a checksum assigned to footer.crc16_checksum of an
+    otherwise unchanged packet is sent as given.
+    """
     def __init__(self, data: bytes, header=None, footer=None):
         self.header = header or SpacePacketHeader()
         self.header.length = SPACE_PACKET_HEADER_LENGTH + len(data) + SPACE_PACKET_FOOTER_LENGTH - 1
+        if self.header.length > SPACE_PACKET_MAX_LENGTH - 1:
+            raise ValueError(f'too much data: {len(data)} bytes')
         self._data = data
+        # encoded bytes, and the header and footer fields they were encoded from
+        self._encoded = None
+        self._key = None
+        # received bytes and whether their checksum matched, see from_bytes
+        self._received = None
+        self._crc_ok = None
         self.footer = footer or SpacePacketFooter()
-        self.footer.crc16_checksum = self._make_packet_checksum()
 
     @property
     def data(self):
         """Protects data from being modified after instantiation"""
         return self._data
 
+    @property
+    def footer(self) -> SpacePacketFooter:
+        """The footer, with the checksum of the current header and data
+
+        If the packet cannot be encoded, e.g. a field is out of range, the
+        checksum is left as it was; to_bytes raises and err reports why.
+        """
+        if self._snapshot() != self._key:
+            try:
+                self._encode()
+            except ValueError:
+                pass
+        return self._footer
+
+    @footer.setter
+    def footer(self, footer: SpacePacketFooter):
+        # a new footer gets a new checksum, like a new packet
+        self._footer = footer
+        self._encoded = None
+        self._key = None
+        self._received = None
+        self._crc_ok = None
+
+    def _snapshot(self) -> tuple:
+        return self.header._fields() + (self._footer.hardware_id, self._footer.crc16_checksum)
+
+    def _encode(self) -> bytes:
+        """Encodes the packet unless the cached encoding is still current"""
+        key = self._snapshot()
+        if key == self._key and self._encoded is not None:
+            return self._encoded
+        # only the checksum was assigned since the last encoding
+        assigned = self._key is not None and key != self._key and key[:-1] == self._key[:-1]
+        if key != self._key:
+            # modified since it was received, the received bytes no longer apply
+            self._received = None
+            self._crc_ok = None
+
+        ftr = self._footer
+        buf = bytearray(SPACE_PACKET_HEADER_LENGTH + len(self._data) + SPACE_PACKET_FOOTER_LENGTH)
+        n = pack_space_packet_into(buf, 0, self.header, self._data, ftr.hardware_id)
+        ck = bytes([buf[n-1], buf[n-2]])
+        if assigned:
+            ftr.pack_into(buf, n - SPACE_PACKET_FOOTER_LENGTH)
+            self._crc_ok = ftr.crc16_checksum == ck
+        else:
+            ftr.crc16_checksum = ck
+            if self._received is None:
+                self._crc_ok = True
+
+        self._encoded = bytes(buf)
+        self._key = self._snapshot()
+        return self._encoded
+
+    def crc_ok(self) -> bool:
+        """Compares the received checksum to one computed over the packet"""
+        if self._snapshot() != self._key:
+            self._encode()
+        if self._crc_ok is None:
+            bs = self._received
+            self._crc_ok = crc.crc16(memoryview(bs)[:len(bs)-2]) == (bs[-2] | (bs[-1] << 8))
+        return self._crc_ok
+
     def _verify_crc16(self):
         """Compares expected CRC of packet to computed CRC"""
-        got = self.footer.crc16_checksum
-        want = self._make_packet_checksum()
-
-        if got[0] != want[0] or got[1] != want[1]:
+        if not self.crc_ok():
+            got = self._footer.crc16_checksum
+            bs = self._encoded if self._received is None else self._received
+            want = crc.crc16(memoryview(bs)[:len(bs)-2]).to_bytes(2, byteorder='big')
             return ValueError(f'checksum mismatch: got={got} want={want}')
 
-    def _make_packet_checksum(self) -> bytes:
-        """Creates checksum of packet from candidate bytes"""
-        bs = self.to_bytes()
-        inp = bs[0:len(bs)-2]
-
-        # Evaluate checksum
-        ck = 0xFFFF
-        for b in inp:
-            for _ in range(0,8):
-                if (((ck & 0x8000) >> 8) ^ (b & 0x80)) > 0:
-                    ck = (ck << 1) ^ 0x8005
-                else:
-                    ck = ck << 1
-                b = b << 1
-        ck = ck & 0xFFFF
-
-        ckb = bytes(utils.pack_ushort_big_endian(ck))
-
-        return ckb
-
     def err(self):
         """Throws an error if any parameters are out of bounds"""
-        if self.header.err() is not None:
-            return self.header.err()
-        if self.footer.err() is not None:
-            return self.footer.err()
+        err = self.header.err()
+        if err is not None:
+            return err
         if self.header.length != SPACE_PACKET_HEADER_LENGTH + len(self.data) + SPACE_PACKET_FOOTER_LENGTH - 1:
             return ValueError('packet length unequal to header length')
-        if self._verify_crc16() is not None:
-            return self._verify_crc16()
-        return None
+        try:
+            err = self._verify_crc16()
+        except ValueError as e:
+            return e
+        if err is not None:
+            return err
+        return self.footer.err()
 
     def to_bytes(self) -> bytes:
         """Encodes space packet to byte slice, including header, data, and footer"""
-        buf = bytearray(self.header.length)
-
-        buf[:SPACE_PACKET_HEADER_LENGTH] = self.header.to_bytes()
-        buf[SPACE_PACKET_HEADER_LENGTH:] = self.data
-        buf[SPACE_PACKET_HEADER_LENGTH+len(self.data):] = self.footer.to_bytes()
-        return bytes(buf)
+        return self._encode()
 
     @classmethod
     def from_bytes(cls, bs: bytes):
         """Hydrates the space packet from provided byte array, returning non-nil if errors are present"""
-        if len(bs) < SPACE_PACKET_HEADER_LENGTH:
+        if len(bs) < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH:
             return ValueError('insufficient data')
 
-        hdr = SpacePacketHeader.from_bytes(bs[0:SPACE_PACKET_HEADER_LENGTH])
-        ftr = SpacePacketFooter.from_bytes(bs[len(bs)-SPACE_PACKET_FOOTER_LENGTH:])
+        # a copy, so that the caller may reuse its receive buffer
+        bs = bytes(bs)
+        hdr = SpacePacketHeader.unpack_from(bs, 0)
+        ftr = SpacePacketFooter.unpack_from(bs, len(bs) - SPACE_PACKET_FOOTER_LENGTH)
+        received_length = hdr.length
 
         obj = cls(
             data=bs[SPACE_PACKET_HEADER_LENGTH : len(bs)-SPACE_PACKET_FOOTER_LENGTH],
@@ -177,4 +300,100 @@ class SpacePacket():
             footer=ftr
         )
 
+        obj._received = bs
+        obj._key = obj._snapshot()
+        if received_length == obj.header.length:
+            # the received bytes are already the encoding
+            obj._encoded = bs
+
         return obj
+
+class SpacePacketView():
+    """Read-only space packet over a slice of a larger buffer
+
+    Nothing is copied or decoded up front: header and footer fields are
+    unpacked from the underlying memoryview when accessed, and data is a
+    sub-view. The buffer must not be modified while views are in use.
+    """
+    __slots__ = ('_view',)
+
+    def __init__(self, buf, offset: int = 0, length: int = None):
+        mv = utils.byte_view(buf)
+        if length is None:
+            if offset >= len(mv):
+                raise ValueError('insufficient data')
+            # the length byte counts the bytes following it
+            length = mv[offset] + 1
+        if length < SPACE_PACKET_HEADER_LENGTH + SPACE_PACKET_FOOTER_LENGTH or offset + length > len(mv):
+            raise ValueError('insufficient data')
+        self._view = mv[offset:offset+length].toreadonly()
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    @property
+    def header(self) -> SpacePacketHeader:
+        """Decodes the full header"""
+        return SpacePacketHeader.unpack_from(self._view, 0)
+
+    @property
+    def footer(self) -> SpacePacketFooter:
+        """Decodes the full footer"""
+        return SpacePacketFooter.unpack_from(self._view, len(self._view) - SPACE_PACKET_FOOTER_LENGTH)
+
+    @property
+    def length(self) -> int:
+        return self._view[0]
+
+    @property
+    def port(self) -> int:
+        return self._view[1]
+
+    @property
+    def sequence_number(self) -> int:
+        return self._view[2] | (self._view[3] << 8)
+
+    @property
+    def destination(self) -> int:
+        return self._view[4]
+
+    @property
+    def command_number(self) -> int:
+        return self._view[5]
+
+    @property
+    def hardware_id(self) -> int:
+        n = len(self._view)
+        return self._view[n-4] | (self._view[n-3] << 8)
+
+    @property
+    def crc16(self) -> int:
+        """The received checksum as an integer"""
+        n = len(self._view)
+        return self._view[n-2] | (self._view[n-1] << 8)
+
+    @property
+    def data(self) -> memoryview:
+        """Sub-view of the packet data"""
+        return self._view[SPACE_PACKET_HEADER_LENGTH:len(self._view)-SPACE_PACKET_FOOTER_LENGTH]
+
+    def crc_ok(self) -> bool:
+        """Compares the received checksum to one computed over the packet"""
+        return crc.crc16(self._view[:len(self._view)-2]) == self.crc16
+
+    def to_bytes(self) -> bytes:
+        """Copies the packet out of the buffer"""
+        return self._view.tobytes()
+
+    def to_packet(self):
+        """Hydrates a SpacePacket from the view"""
+        return SpacePacket.from_bytes(self._view.tobytes())
+
+
+def iter_space_packet_views(buf, offset: int = 0):
+    """Yields a SpacePacketView for each of a run of concatenated space packets"""
+    mv = utils.byte_view(buf)
+    while offset < len(mv):
+        view = SpacePacketView(mv, offset)
+        offset += len(view)
+        yield view
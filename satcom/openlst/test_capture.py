@@ -0,0 +1,125 @@
+import gc
+import os
+import tempfile
+import unittest
+import warnings
+import satcom.openlst.capture as capture
+import satcom.openlst.client_packet_lib as client_pkt_lib
+import satcom.openlst.space_packet_lib as space_pkt_lib
+
+def make_packet(i: int) -> bytes:
+    """Builds an encoded space packet"""
+    hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=i, command_number=i % 7)
+    ftr = space_pkt_lib.SpacePacketFooter(hardware_id=300 + i % 3)
+    return space_pkt_lib.SpacePacket(bytes([i & 0xFF]) * (i % 20), hdr, ftr).to_bytes()
+
+class TestCapture(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'pass.cap')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_write_read(self):
+        """Verifies packets, timestamps and crc status round trip"""
+        pkts = [make_packet(i) for i in range(50)]
+        bad = bytearray(pkts[7])
+        bad[-1] ^= 0xFF
+        pkts[7] = bytes(bad)
+
+        with capture.CaptureWriter(self.path) as w:
+            for i, pkt in enumerate(pkts):
+                self.assertEqual(w.write(pkt, timestamp=1000.0 + i * 0.5), i)
+
+        with capture.CaptureReader(self.path) as r:
+            self.assertEqual(len(r), 50)
+            self.assertEqual([v.to_bytes() for v in r], pkts)
+            view = r[-1]
+            self.assertIsInstance(view, space_pkt_lib.SpacePacketView)
+            self.assertEqual(view.sequence_number, 49)
+            self.assertEqual(r.timestamp(10), 1005.0)
+            self.assertEqual(r.crc_status(7), capture.CRC_BAD)
+            self.assertEqual(r.crc_status(8), capture.CRC_OK)
+            del view
+
+            self.assertEqual(r.time_range(1002.0, 1004.25), range(4, 9))
+            self.assertEqual([v.sequence_number for v in r.between(1024.0)], [48, 49])
+            self.assertEqual(r.time_range(2000.0), range(50, 50))
+            with self.assertRaises(IndexError):
+                r[50]
+
+    def test_append_and_recover(self):
+        """Verifies appending to a closed capture and recovering an unclosed one"""
+        with capture.CaptureWriter(self.path) as w:
+            for i in range(5):
+                w.write(make_packet(i), timestamp=float(i))
+        with capture.CaptureWriter(self.path) as w:
+            w.write(make_packet(5), timestamp=5.0)
+            with self.assertRaises(ValueError):
+                w.write(make_packet(6), timestamp=4.0)
+
+        w = capture.CaptureWriter(self.path)
+        w.write(make_packet(6), timestamp=6.0)
+        w.flush()
+        # simulate a crash: the file has records past the old index, and no new one
+        w._file.close()
+
+        with self.assertRaises(ValueError):
+            capture.CaptureReader(self.path)
+        with capture.CaptureReader(self.path, recover=True) as r:
+            self.assertEqual([v.sequence_number for v in r], list(range(7)))
+
+        with capture.CaptureWriter(self.path) as w:
+            self.assertEqual(len(w), 7)
+            w.write(make_packet(7), timestamp=7.0)
+        with capture.CaptureReader(self.path) as r:
+            self.assertEqual([v.sequence_number for v in r], list(range(8)))
+
+    def test_client_packets(self):
+        """Verifies captures of client packets are read as client packet views"""
+        hdr = client_pkt_lib.ClientPacketHeader(hardware_id=9, sequence_number=3, destination=1, command_number=2)
+        pkt = client_pkt_lib.ClientPacket(b'abc', hdr)
+
+        with capture.CaptureWriter(self.path, kind=capture.KIND_CLIENT) as w:
+            w.write(pkt, timestamp=1.0)
+        with self.assertRaises(ValueError):
+            capture.CaptureWriter(self.path)
+
+        with capture.CaptureReader(self.path) as r:
+            view = r[0]
+            self.assertIsInstance(view, client_pkt_lib.ClientPacketView)
+            self.assertEqual(view.to_bytes(), pkt.to_bytes())
+            self.assertEqual(r.crc_status(0), capture.CRC_NONE)
+            del view
+
+    def test_not_a_capture(self):
+        """Verifies other files are rejected"""
+        with open(self.path, 'wb') as f:
+            f.write(b'\x00' * 64)
+
+        with self.assertRaises(ValueError):
+            capture.CaptureReader(self.path)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            with self.assertRaises(ValueError):
+                capture.CaptureWriter(self.path)
+            gc.collect()
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+    def test_views_outlive_reader(self):
+        """Verifies a reader can be closed while views of its packets are in use"""
+        with capture.CaptureWriter(self.path) as w:
+            for i in range(10):
+                w.write(make_packet(i), timestamp=float(i))
+
+        with capture.CaptureReader(self.path) as r:
+            for v in r:
+                pass
+        self.assertEqual(v.to_bytes(), make_packet(9))
+        with capture.CaptureReader(self.path) as r:
+            for v in r.between(2.0, 5.0):
+                pass
+        self.assertEqual(v.sequence_number, 4)
+        r.close()
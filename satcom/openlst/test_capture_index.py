@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import satcom.openlst.capture as capture
+import satcom.openlst.capture_index as capture_index
+import satcom.openlst.space_packet_lib as space_pkt_lib
+
+def make_packet(i: int) -> bytes:
+    """Builds an encoded space packet"""
+    hdr = space_pkt_lib.SpacePacketHeader(port=i % 2, sequence_number=i, command_number=i % 7)
+    ftr = space_pkt_lib.SpacePacketFooter(hardware_id=300 + i % 3)
+    return space_pkt_lib.SpacePacket(bytes([i & 0xFF]) * (i % 20), hdr, ftr).to_bytes()
+
+class TestCaptureIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'pass.cap')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, start: int, end: int):
+        with capture.CaptureWriter(self.path) as w:
+            for i in range(start, end):
+                w.write(make_packet(i), timestamp=float(i))
+
+    def test_query(self):
+        """Verifies queries match a scan of the capture"""
+        self.write(0, 100)
+        index = capture_index.CaptureIndex(self.path)
+        self.assertEqual(index.update(), 100)
+
+        def scan(start, end, **fields):
+            with capture.CaptureReader(self.path) as r:
+                return [i for i in r.time_range(start, end)
+                        if all(getattr(r[i], k) == v for k, v in fields.items())]
+
+        for start, end, fields in [
+            (None, None, {}),
+            (10.0, 60.0, {}),
+            (None, None, {'hardware_id': 301}),
+            (20.0, 80.0, {'hardware_id': 302, 'command_number': 3}),
+            (0.0, 100.0, {'hardware_id': 300, 'port': 1, 'command_number': 0}),
+            (50.0, 40.0, {'hardware_id': 300}),
+            (None, None, {'hardware_id': 999}),
+        ]:
+            self.assertEqual(index.query(start, end, **fields), scan(start, end, **fields))
+
+        self.assertEqual(index.query(crc_status=capture.CRC_BAD), [])
+        with self.assertRaises(ValueError):
+            index.query(sequence_number=1)
+
+    def test_incremental_update(self):
+        """Verifies appended records are indexed, and the sidecar is reused and rebuilt"""
+        self.write(0, 30)
+        index = capture_index.CaptureIndex(self.path)
+        self.assertEqual(index.update(), 30)
+        self.write(30, 45)
+        self.assertEqual(index.update(), 15)
+        self.assertEqual(index.update(), 0)
+
+        reloaded = capture_index.CaptureIndex(self.path)
+        self.assertEqual(len(reloaded), 45)
+        self.assertEqual(reloaded.update(), 0)
+        self.assertEqual(reloaded.query(hardware_id=300, start=30.0), [30, 33, 36, 39, 42])
+
+        # a replaced capture is reindexed from scratch
+        os.remove(self.path)
+        with capture.CaptureWriter(self.path) as w:
+            for i in range(5):
+                w.write(make_packet(i), timestamp=500.0 + i)
+        self.assertEqual(reloaded.update(), 5)
+        self.assertEqual(reloaded.query(hardware_id=301), [1, 4])
+
+    def test_search(self):
+        """Verifies search yields matching packets across captures"""
+        self.write(0, 10)
+        other = os.path.join(self.dir.name, 'other.cap')
+        with capture.CaptureWriter(other) as w:
+            w.write(make_packet(4), timestamp=20.0)
+
+        got = list(capture_index.search([self.path, other], hardware_id=301, command_number=4))
+        self.assertEqual(got, [(self.path, 4, 4.0, make_packet(4)), (other, 0, 20.0, make_packet(4))])
+        self.assertTrue(os.path.exists(capture_index.sidecar_path(other)))
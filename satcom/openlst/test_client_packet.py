@@ -83,3 +83,39 @@ class TestClientPacket(unittest.TestCase):
         pkt = p.from_bytes(val)
 
         self.assertIsNotNone(pkt.err())
+
+    def test_client_packet_header_pack_into(self):
+        """Verifies ClientPacketHeader packs and unpacks at an offset"""
+        hdr = client_pkt_lib.ClientPacketHeader(
+            length=10,
+            hardware_id=755,
+            sequence_number=12,
+            destination=212,
+            command_number=57
+        )
+        buf = bytearray(9)
+
+        hdr.pack_into(buf, 1)
+
+        want = bytes([0x00, 0x0A, 0xF3, 0x02, 0x0C, 0x00, 0xD4, 0x39, 0x00])
+        self.assertEqual(buf, want, f'unexpected result: want={want} got={buf}')
+        self.assertEqual(client_pkt_lib.ClientPacketHeader.unpack_from(buf, 1), hdr)
+
+        with self.assertRaises(ValueError):
+            client_pkt_lib.ClientPacketHeader.unpack_from(buf, 4)
+
+    def test_client_packet_view(self):
+        """Verifies ClientPacketView decodes fields without copying"""
+        val = bytes([0x09, 0xFF, 0x03, 0x04, 0x00, 0xFD, 0x38, 0x01, 0x02, 0x03])
+        buf = b'\x00' + val + val
+
+        view = client_pkt_lib.ClientPacketView(buf, 1)
+
+        self.assertEqual(len(view), len(val))
+        self.assertEqual(view.hardware_id, 1023)
+        self.assertEqual(view.sequence_number, 4)
+        self.assertEqual(view.destination, 253)
+        self.assertEqual(view.command_number, 56)
+        self.assertEqual(view.header, client_pkt_lib.ClientPacketHeader.from_bytes(val[:7]))
+        self.assertEqual(view.data, b'\x01\x02\x03')
+        self.assertEqual(view.to_packet().to_bytes(), val)
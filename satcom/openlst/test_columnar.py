@@ -0,0 +1,66 @@
+import unittest
+import satcom.openlst.columnar as columnar
+import satcom.openlst.space_packet_lib as space_pkt_lib
+
+def make_packets(n: int) -> list:
+    """Builds n encoded space packets of varying lengths"""
+    pkts = []
+    for i in range(n):
+        hdr = space_pkt_lib.SpacePacketHeader(
+            port=i % 3,
+            sequence_number=1000 + i * 300,
+            destination=i,
+            command_number=200 + i
+        )
+        ftr = space_pkt_lib.SpacePacketFooter(hardware_id=0x100 + i)
+        pkts.append(space_pkt_lib.SpacePacket(bytes([i]) * (i * 5 + 1), hdr, ftr).to_bytes())
+    return pkts
+
+@unittest.skipIf(columnar.np is None, 'numpy not installed')
+class TestColumnar(unittest.TestCase):
+
+    def test_decode_space_packets(self):
+        """Verifies columns match per-packet decoding"""
+        pkts = make_packets(12)
+        buf = bytearray(b''.join(pkts))
+        # corrupt the data of packet 7
+        buf[sum(len(p) for p in pkts[:7]) + 6] ^= 0x01
+
+        rows = columnar.decode_space_packets(buf)
+
+        self.assertEqual(len(rows), 12)
+        for i, (row, pkt) in enumerate(zip(rows, pkts)):
+            hdr = space_pkt_lib.SpacePacketHeader.from_bytes(pkt[:6])
+            ftr = space_pkt_lib.SpacePacketFooter.from_bytes(pkt[-4:])
+            self.assertEqual(row['length'], hdr.length)
+            self.assertEqual(row['port'], hdr.port)
+            self.assertEqual(row['sequence_number'], hdr.sequence_number)
+            self.assertEqual(row['destination'], hdr.destination)
+            self.assertEqual(row['command_number'], hdr.command_number)
+            self.assertEqual(row['hardware_id'], ftr.hardware_id)
+            self.assertEqual(row['crc16'], int.from_bytes(ftr.crc16_checksum, byteorder='big'))
+            self.assertEqual(row['crc_ok'], i != 7)
+
+            got = bytes(buf[row['data_offset']:row['data_offset']+row['data_length']])
+            want = bytes(buf[row['offset']+6:row['offset']+len(pkt)-4])
+            self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_decode_space_packets_offsets(self):
+        """Verifies decoding packets at explicit offsets and as columns"""
+        pkts = make_packets(3)
+        buf = b'\xee' * 5 + pkts[0] + b'\xee' + pkts[1] + pkts[2]
+        offsets = [5, 5 + len(pkts[0]) + 1, 5 + len(pkts[0]) + 1 + len(pkts[1])]
+
+        cols = columnar.to_columns(columnar.decode_space_packets(buf, offsets))
+
+        self.assertEqual(list(cols['offset']), offsets)
+        self.assertEqual(list(cols['sequence_number']), [1000, 1300, 1600])
+        self.assertTrue(cols['crc_ok'].all())
+
+    def test_decode_space_packets_malformed(self):
+        """Verifies truncated buffers are rejected"""
+        buf = b''.join(make_packets(3))
+
+        with self.assertRaises(ValueError):
+            columnar.decode_space_packets(buf[:-2])
+        self.assertEqual(len(columnar.decode_space_packets(b'')), 0)
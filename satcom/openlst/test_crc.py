@@ -0,0 +1,57 @@
+import unittest
+import satcom.openlst.crc as crc
+
+def bitwise_crc16(bs: bytes) -> int:
+    """Reference bit-at-a-time CRC-16 implementation"""
+    ck = 0xFFFF
+    for b in bs:
+        for _ in range(0,8):
+            if (((ck & 0x8000) >> 8) ^ (b & 0x80)) > 0:
+                ck = (ck << 1) ^ 0x8005
+            else:
+                ck = ck << 1
+            b = b << 1
+    return ck & 0xFFFF
+
+class TestCRC(unittest.TestCase):
+
+    def test_crc16_known_value(self):
+        """Verifies CRC-16 of a known space packet"""
+        bs = bytes([0x0C, 0x01, 0xA0, 0x0F, 0xFD, 0x38, 0x11, 0x22, 0x33, 0x0C, 0x00])
+
+        want = 0x45FA
+        got = crc.crc16(bs)
+
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_crc16_matches_bitwise(self):
+        """Verifies the table-driven CRC-16 is bit-exact with the bitwise reference"""
+        bs = bytes(range(256)) + bytes(reversed(range(256)))
+
+        for n in (0, 1, 2, 7, 255, 512):
+            want = bitwise_crc16(bs[:n])
+            got = crc.crc16(bs[:n])
+            self.assertEqual(got, want, f'unexpected result: n={n} want={want} got={got}')
+
+    def test_crc16_incremental(self):
+        """Verifies incremental updates match a one-shot computation"""
+        bs = b'incremental crc16 checksum'
+
+        ck = crc.CRC16()
+        ck.update(bs[:5]).update(bs[5:11])
+        ck.update(bs[11:])
+
+        want = crc.crc16(bs).to_bytes(2, byteorder='big')
+        got = ck.digest()
+
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_crc16_batch(self):
+        """Verifies batch CRC-16 over spans of a contiguous buffer"""
+        bs = bytearray(b'first packet|second|third one')
+        spans = [(0, 12), (13, 6), (20, 9), (0, 0)]
+
+        want = [crc.crc16(bs[o:o+n]) for o, n in spans]
+        got = crc.crc16_batch(bs, spans)
+
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
@@ -0,0 +1,50 @@
+import itertools
+import unittest
+import satcom.openlst.decode_pool as decode_pool
+import satcom.openlst.space_packet_lib as space_pkt_lib
+import satcom.openlst.transmitter as transmitter
+
+def make_frames(n: int) -> list:
+    """Builds n post-ASM frames, every fifth one truncated"""
+    tx = transmitter.OpenLSTTransmitter(hardware_id=7)
+    frames = []
+    for i in range(n):
+        hdr = space_pkt_lib.SpacePacketHeader(sequence_number=i, command_number=1)
+        frame = bytes(tx.frame(bytes([i & 0xFF]) * (i % 50), hdr))[transmitter.SYNC_LENGTH:]
+        if i % 5 == 4:
+            frame = frame[:12]
+        frames.append(frame)
+    return frames
+
+class TestDecodePool(unittest.TestCase):
+
+    def test_process_in_order(self):
+        """Verifies packets come out in frame order, skipping malformed frames"""
+        frames = make_frames(60)
+
+        with decode_pool.DecodePool(workers=2, batch_size=4, max_pending=3) as pool:
+            got = list(pool.process(frames))
+            again = list(pool.process(frames[:7]))
+
+        self.assertEqual([p.header.sequence_number for p in got], [i for i in range(60) if i % 5 != 4])
+        self.assertTrue(all(p.crc_ok() for p in got))
+        self.assertEqual(got[3].data, bytes([3]) * 3)
+        self.assertEqual([p.header.sequence_number for p in again], [0, 1, 2, 3, 5, 6])
+        self.assertEqual(pool.frames, 67)
+        self.assertEqual(pool.dropped, 13)
+
+    def test_backpressure(self):
+        """Verifies frames are only read as packets are consumed"""
+        frames = make_frames(10)
+        read = []
+
+        def source():
+            for i in itertools.count():
+                read.append(i)
+                yield frames[i % 4]
+
+        with decode_pool.DecodePool(workers=1, batch_size=5, max_pending=2) as pool:
+            got = list(itertools.islice(pool.process(source()), 3))
+
+        self.assertEqual([p.header.sequence_number for p in got], [0, 1, 2])
+        self.assertLessEqual(len(read), 2 * 5 + 1)
@@ -26,4 +26,120 @@ class TestFEC(unittest.TestCase):
 
         got = chunk0 + chunk1 + chunk2
         want = bytearray(b'fec')
-        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
\ No newline at end of file
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_fec_decode_frame(self):
+        """Verifies whole frame FEC decoding"""
+        bs = bytes(b'*j\x03\x00J=L\xe2\x04\x03\x04\x0e')
+
+        got = fec.decode_fec(bs)
+        want = b'fec'
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_fec_decode_frame_corrects_errors(self):
+        """Verifies whole frame FEC decoding matches the chunk decoder on a corrupted frame"""
+        bs = bytearray(fec.encode_fec(b'ihgfedcba'))
+        bs[3] ^= 0x10
+        bs[17] ^= 0x01
+
+        gen = fec.decode_fec_chunk()
+        gen.send(None)
+        want = b''.join(gen.send(bs[i:i+4]) for i in range(0, len(bs), 4))
+        got = fec.decode_fec(bytes(bs))
+
+        self.assertEqual(want, b'ihgfedcba')
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    @unittest.skipIf(fec.np is None, 'numpy not installed')
+    def test_fec_decode_batch(self):
+        """Verifies batch FEC decoding matches per-frame decoding"""
+        frames = [bytearray(fec.encode_fec(b'frame %02d' % i)) for i in range(16)]
+        frames[3][5] ^= 0x02
+        frames[9][0] ^= 0x40
+        frames[9][14] ^= 0x08
+
+        got, metrics = fec.decode_fec_batch([bytes(f) for f in frames])
+
+        for i, f in enumerate(frames):
+            want = fec.decode_fec(bytes(f))
+            self.assertEqual(bytes(got[i]), want, f'unexpected result: want={want} got={bytes(got[i])}')
+        self.assertEqual(metrics[3] - metrics[0], 1)
+        self.assertEqual(metrics[9] - metrics[0], 2)
+
+    @unittest.skipIf(fec.np is None, 'numpy not installed')
+    def test_fec_decode_batch_unequal_lengths(self):
+        """Verifies batch FEC decoding rejects frames of different lengths"""
+        frames = [fec.encode_fec(b'a'), fec.encode_fec(b'abcdef')]
+
+        with self.assertRaises(ValueError):
+            fec.decode_fec_batch(frames)
+
+    def test_interleave_roundtrip(self):
+        """Verifies interleaving is its own inverse"""
+        chunk = bytes([0x12, 0x34, 0xAB, 0xCD])
+
+        want = bytes([0x72, 0xE4, 0x2D, 0xE0])
+        got = fec.interleave(chunk)
+
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(fec.deinterleave(got), chunk)
+
+    def test_interleave_frame(self):
+        """Verifies bulk interleaving matches chunk by chunk interleaving"""
+        for n in (0, 8, 1024):
+            bs = bytes((i * 37 + 11) & 0xFF for i in range(n))
+
+            want = b''.join(fec.interleave(bs[i:i+4]) for i in range(0, n, 4))
+            got = fec.interleave_frame(bs)
+
+            self.assertEqual(got, want, f'unexpected result: n={n} want={want} got={got}')
+            self.assertEqual(fec.deinterleave_frame(got), bs)
+
+    def test_interleave_frame_bad_length(self):
+        """Verifies bulk interleaving rejects partial chunks"""
+        with self.assertRaises(ValueError):
+            fec.interleave_frame(bytes(6))
+
+    def test_fec_encode_into(self):
+        """Verifies FEC encoding into a caller supplied buffer"""
+        bs = b'ihgfedcba'
+        buf = bytearray(b'\xff' * 30)
+
+        n = fec.encode_fec_into(bs, memoryview(buf), 3)
+
+        want = fec.encode_fec(bs)
+        got = bytes(buf[3:3+n])
+        self.assertEqual(n, fec.encoded_length(len(bs)))
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(buf[:3] + buf[3+n:], b'\xff' * (30 - n))
+
+    def test_fec_encode_into_too_small(self):
+        """Verifies FEC encoding rejects a buffer that is too small"""
+        with self.assertRaises(ValueError):
+            fec.encode_fec_into(b'abcd', bytearray(8))
+
+    def test_fec_encode_batch(self):
+        """Verifies batch FEC encoding into one buffer"""
+        payloads = [b'', b'a', b'ab', b'fec', b'ihgfedcba']
+
+        buf, spans = fec.encode_fec_batch(payloads)
+
+        for p, (offset, n) in zip(payloads, spans):
+            want = fec.encode_fec(p)
+            got = bytes(buf[offset:offset+n])
+            self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(len(buf), sum(n for _, n in spans))
+
+    def test_deinterleave_soft(self):
+        """Verifies soft values are deinterleaved like the bits they stand for"""
+        frame = fec.encode_fec(b'soft interleave')
+        values = [(b >> (7 - i)) & 1 for b in frame for i in range(8)]
+
+        got = fec.deinterleave_soft(values)
+
+        want = [(b >> (7 - i)) & 1 for b in fec.deinterleave_frame(frame) for i in range(8)]
+        self.assertEqual(got, want)
+        if fec.np is not None:
+            self.assertEqual(fec.deinterleave_soft(fec.np.array(values)).tolist(), want)
+        with self.assertRaises(ValueError):
+            fec.deinterleave_soft(values[:-8])
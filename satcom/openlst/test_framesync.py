@@ -0,0 +1,99 @@
+import unittest
+import satcom.openlst.framesync as framesync
+import satcom.openlst.receiver as receiver
+import satcom.openlst.space_packet_lib as space_pkt_lib
+import satcom.openlst.transmitter as transmitter
+
+def make_stream(n: int) -> tuple:
+    """Builds n frames separated by filler bytes, returning the stream and the frames"""
+    tx = transmitter.OpenLSTTransmitter(hardware_id=3)
+    stream = bytearray(b'\x00\x13\x37')
+    frames = []
+    for i in range(n):
+        hdr = space_pkt_lib.SpacePacketHeader(sequence_number=i, command_number=1)
+        frame = bytes(tx.frame(bytes([i]) * (i * 7), hdr))
+        frames.append(frame[transmitter.SYNC_LENGTH:])
+        stream += frame + b'\x42' * i
+    return bytes(stream), frames
+
+class TestFrameSynchronizer(unittest.TestCase):
+
+    def test_feed_whole_stream(self):
+        """Verifies frames are found in a single chunk"""
+        stream, want = make_stream(4)
+        sync = framesync.FrameSynchronizer()
+
+        got = sync.feed(stream)
+
+        self.assertEqual(got, want)
+        self.assertEqual(sync.frames, 4)
+
+    def test_feed_small_chunks(self):
+        """Verifies frames and ASMs split across chunk boundaries are found"""
+        stream, want = make_stream(6)
+
+        for size in (1, 3, 5, 64):
+            sync = framesync.FrameSynchronizer()
+            got = []
+            for i in range(0, len(stream), size):
+                got += sync.feed(stream[i:i+size])
+            self.assertEqual(got, want, f'unexpected result for chunk size {size}')
+
+    def test_feed_bit_errors(self):
+        """Verifies ASMs with bit errors are matched only when tolerated"""
+        stream, want = make_stream(3)
+        stream = bytearray(stream)
+        pos = stream.find(space_pkt_lib.SPACE_PACKET_ASM)
+        stream[pos] ^= 0x01
+        stream[pos+2] ^= 0x80
+
+        got = framesync.FrameSynchronizer().feed(stream)
+        self.assertEqual(got, want[1:])
+
+        got = framesync.FrameSynchronizer(max_bit_errors=2).feed(stream)
+        self.assertEqual(got, want)
+
+    @unittest.skipIf(framesync.np is None, 'numpy not installed')
+    def test_feed_bit_errors_without_numpy(self):
+        """Verifies the pure Python bit error search matches the numpy one"""
+        stream, want = make_stream(3)
+        stream = bytearray(stream)
+        stream[stream.find(space_pkt_lib.SPACE_PACKET_ASM) + 1] ^= 0x04
+
+        np = framesync.np
+        framesync.np = None
+        try:
+            got = framesync.FrameSynchronizer(max_bit_errors=1).feed(stream)
+        finally:
+            framesync.np = np
+
+        self.assertEqual(got, want)
+
+    def test_feed_large_chunk(self):
+        """Verifies frames far into a single large chunk are found, with and without bit errors"""
+        stream, want = make_stream(4)
+        stream = (b'\x55' * 5000).join([stream] * 3)
+
+        for max_bit_errors in (0, 1):
+            sync = framesync.FrameSynchronizer(max_bit_errors=max_bit_errors)
+            self.assertEqual(sync.feed(stream), want * 3)
+            self.assertLess(len(sync._buf), len(space_pkt_lib.SPACE_PACKET_ASM))
+
+    def test_feed_bounded_memory(self):
+        """Verifies data without an ASM is not retained"""
+        sync = framesync.FrameSynchronizer()
+
+        for _ in range(100):
+            self.assertEqual(sync.feed(b'\x55' * 1000 + b'\xd3\x91'), [])
+
+        self.assertLess(len(sync._buf), len(space_pkt_lib.SPACE_PACKET_ASM))
+        self.assertEqual(sync.feed(b'\xd3\x91'), [])
+
+    def test_frames_decode(self):
+        """Verifies synchronized frames decode to space packets"""
+        stream, _ = make_stream(3)
+        rx = receiver.OpenLSTReceiver()
+
+        got = [pkt.header.sequence_number for pkt in rx.process(framesync.FrameSynchronizer().feed(stream))]
+
+        self.assertEqual(got, [0, 1, 2])
@@ -0,0 +1,148 @@
+import asyncio
+import unittest
+import satcom.openlst.client_packet_lib as client_pkt_lib
+import satcom.openlst.pipeline as pipeline
+import satcom.openlst.space_packet_lib as space_pkt_lib
+import satcom.openlst.transmitter as transmitter
+import satcom.openlst.transport as transport
+
+def make_stream(n: int) -> bytes:
+    """Builds n frames separated by filler bytes"""
+    tx = transmitter.OpenLSTTransmitter(hardware_id=3)
+    stream = bytearray(b'\x00\x13\x37')
+    for i in range(n):
+        hdr = space_pkt_lib.SpacePacketHeader(port=i % 2, sequence_number=i, command_number=1)
+        stream += bytes(tx.frame(bytes([i]) * (i * 3), hdr)) + b'\x42' * i
+    return bytes(stream)
+
+def chunks(bs: bytes, size: int):
+    for i in range(0, len(bs), size):
+        yield bs[i:i+size]
+
+class TestPipeline(unittest.TestCase):
+
+    def test_stages_match_receiver(self):
+        """Verifies separate dewhiten, decode and parse stages match Receive"""
+        tx = transmitter.OpenLSTTransmitter(hardware_id=3)
+        frames = []
+        for i in range(8):
+            hdr = space_pkt_lib.SpacePacketHeader(sequence_number=i, command_number=2)
+            frames.append(bytes(tx.frame(bytes([i]) * (i * 5), hdr))[transmitter.SYNC_LENGTH:])
+        frames[5] = frames[5][:20]
+        frames[6] = frames[6][:4]
+
+        receive = pipeline.Receive()
+        decode = pipeline.Decode()
+        split = pipeline.Dewhiten() | decode | pipeline.Parse()
+
+        want = list(receive(frames))
+        got = list(split(frames))
+
+        self.assertEqual([p.to_bytes() for p in got], [p.to_bytes() for p in want])
+        self.assertEqual([p.header.sequence_number for p in got], [0, 1, 2, 3, 4, 7])
+        self.assertEqual(decode.dropped, 2)
+        self.assertEqual(receive.receiver.dropped, 2)
+
+    def test_filter_and_sink(self):
+        """Verifies filter, map and tap stages and the run sink"""
+        stream = make_stream(12)
+        seen = []
+        port1 = pipeline.Filter(lambda p: p.header.port == 1)
+        pipe = pipeline.FrameSync() | pipeline.Receive() | pipeline.Tap(seen.append) | port1
+        pipe = pipe | (lambda p: p.header.sequence_number)
+
+        got = []
+        self.assertEqual(pipe.run(chunks(stream, 7), got.append), len(got))
+        self.assertEqual(got, [1, 3, 5, 7, 9, 11])
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(port1.rejected, 6)
+
+    def test_batch_flush(self):
+        """Verifies items held by a stage are flushed through the later ones"""
+        pipe = pipeline.Pipeline(pipeline.Batch(4), len, pipeline.Batch(2))
+        self.assertEqual(list(pipe(range(10))), [[4, 4], [2]])
+        self.assertEqual(list(pipe(range(3))), [[3]])
+        with self.assertRaises(ValueError):
+            pipeline.Pipeline(3)
+
+    def test_client_packets(self):
+        """Verifies serial byte streams are deframed into client packets"""
+        pkts = [
+            client_pkt_lib.ClientPacket(bytes([i]) * i, client_pkt_lib.ClientPacketHeader(hardware_id=9, sequence_number=i))
+            for i in range(5)
+        ]
+        stream = b'noise'.join(transport.frame_client_packet(p) for p in pkts)
+        pipe = pipeline.Deframe() | pipeline.Filter(lambda p: p.header.sequence_number % 2 == 0)
+
+        got = list(pipe(chunks(stream, 3)))
+        self.assertEqual([p.to_bytes() for p in got], [pkts[i].to_bytes() for i in (0, 2, 4)])
+
+    def test_async(self):
+        """Verifies async sources, buffered reads and coroutine sinks"""
+        stream = make_stream(12)
+        read = []
+
+        async def source():
+            for chunk in chunks(stream, 5):
+                read.append(chunk)
+                await asyncio.sleep(0)
+                yield chunk
+
+        async def main():
+            got = []
+
+            async def sink(pkt):
+                await asyncio.sleep(0)
+                got.append(pkt.header.sequence_number)
+
+            pipe = pipeline.FrameSync() | pipeline.Receive()
+            n = await pipe.run_async(source(), sink, buffer=4)
+            plain = [p.header.sequence_number async for p in pipe.stream(chunks(stream, 64))]
+            return n, got, plain
+
+        n, got, plain = asyncio.run(main())
+        want = list(range(12))
+        self.assertEqual(got, want)
+        self.assertEqual(n, len(want))
+        self.assertEqual(plain, want)
+        self.assertEqual(b''.join(read), stream)
+
+    def test_async_early_exit(self):
+        """Verifies stopping a buffered stream early stops reading and closes the source"""
+        stream = make_stream(12)
+        read = []
+        closed = []
+
+        async def source():
+            try:
+                for chunk in chunks(stream, 5):
+                    read.append(chunk)
+                    yield chunk
+            finally:
+                closed.append(True)
+
+        async def main():
+            pipe = pipeline.FrameSync() | pipeline.Receive()
+            packets = pipe.stream(source(), buffer=2)
+            got = []
+            async for pkt in packets:
+                got.append(pkt.header.sequence_number)
+                if len(got) == 2:
+                    break
+            await packets.aclose()
+            n = len(read)
+            await asyncio.sleep(0.01)
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            return got, n, pending
+
+        got, n, pending = asyncio.run(main())
+        self.assertEqual(got, [0, 1])
+        self.assertEqual(pending, [])
+        self.assertEqual(closed, [True])
+        self.assertEqual(len(read), n)
+        self.assertLess(len(read), len(stream) // 5)
+
+    def test_stage_is_abstract(self):
+        """Verifies stages must implement feed"""
+        with self.assertRaises(TypeError):
+            pipeline.Stage()
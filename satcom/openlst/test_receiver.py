@@ -0,0 +1,64 @@
+import unittest
+import satcom.openlst.fec as fec
+import satcom.openlst.receiver as receiver
+import satcom.openlst.space_packet_lib as space_pkt_lib
+import satcom.openlst.whitening as whitening
+
+def make_frame(data: bytes, sequence_number: int = 1) -> tuple:
+    """Builds a space packet and its encoded, whitened over-the-air frame"""
+    hdr = space_pkt_lib.SpacePacketHeader(
+        port=1,
+        sequence_number=sequence_number,
+        destination=253,
+        command_number=56
+    )
+    ftr = space_pkt_lib.SpacePacketFooter(hardware_id=12)
+    pkt = space_pkt_lib.SpacePacket(data, hdr, ftr)
+    return pkt, whitening.whiten(fec.encode_fec(pkt.to_bytes()))
+
+class TestReceiver(unittest.TestCase):
+
+    def test_receive(self):
+        """Verifies a frame is decoded into the original space packet"""
+        rx = receiver.OpenLSTReceiver()
+
+        for data in (b'\x11', b'\x11\x22', bytes(range(200))):
+            pkt, frame = make_frame(data)
+            got = rx.receive(frame)
+
+            want = pkt.to_bytes()
+            self.assertIsNone(got.err(), msg=got.err())
+            self.assertEqual(got.to_bytes(), want, f'unexpected result: want={want} got={got.to_bytes()}')
+
+        self.assertEqual(rx.frames, 3)
+        self.assertGreater(rx.timings['decode'], 0)
+
+    def test_receive_corrects_errors_and_ignores_trailer(self):
+        """Verifies bit errors are corrected and bytes after the frame ignored"""
+        pkt, frame = make_frame(b'hello openlst')
+        frame = bytearray(frame + b'\x55' * 13)
+        frame[10] ^= 0x01
+
+        got = receiver.OpenLSTReceiver().receive(frame)
+
+        self.assertEqual(got.data, b'hello openlst', f'unexpected result: got={got.data}')
+
+    def test_receive_truncated(self):
+        """Verifies a truncated frame is rejected"""
+        _, frame = make_frame(bytes(40))
+
+        with self.assertRaises(ValueError):
+            receiver.OpenLSTReceiver().receive(frame[:40])
+
+    def test_process(self):
+        """Verifies processing a stream of frames skips malformed ones"""
+        rx = receiver.OpenLSTReceiver()
+        frames = [make_frame(b'abc', i)[1] for i in range(5)]
+        frames.insert(2, frames[1][:12])
+
+        got = [pkt.header.sequence_number for pkt in rx.process(frames)]
+
+        want = [0, 1, 2, 3, 4]
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(rx.frames, 6)
+        self.assertEqual(rx.dropped, 1)
@@ -0,0 +1,131 @@
+import mmap
+import random
+import unittest
+import satcom.openlst.segmentation as segmentation
+import satcom.openlst.space_packet_lib as space_pkt_lib
+
+def make_header(sequence_number: int) -> space_pkt_lib.SpacePacketHeader:
+    """Builds the header for a test transfer"""
+    return space_pkt_lib.SpacePacketHeader(port=3, sequence_number=sequence_number, destination=1, command_number=9)
+
+class FakeClock():
+    """Clock advanced by the test"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestSegmentation(unittest.TestCase):
+
+    def test_segment_into(self):
+        """Verifies packets encoded into one buffer match segmented SpacePackets"""
+        data = bytes(random.Random(1).getrandbits(8) for _ in range(1000))
+
+        pkts = list(segmentation.segment(data, make_header(65534), 7, 100))
+        want = [pkt.to_bytes() for pkt in pkts]
+        view, spans = segmentation.segment_into(data, make_header(65534), 7, 100)
+        got = [bytes(view[o:o+n]) for o, n in spans]
+
+        self.assertEqual(len(want), 10)
+        self.assertEqual(got, want)
+        self.assertEqual([space_pkt_lib.SpacePacketView(p).sequence_number for p in got[:4]], [65534, 65535, 0, 1])
+        # fragment data are read-only views of one shared buffer
+        self.assertTrue(all(p.data.readonly and p.data.obj is pkts[0].data.obj for p in pkts))
+
+    def test_full_segments_valid(self):
+        """Verifies full size segments have a valid length byte"""
+        pkt = next(segmentation.segment(bytes(1000), space_pkt_lib.SpacePacketHeader()))
+
+        self.assertEqual(segmentation.MAX_SEGMENT_SIZE, 238)
+        self.assertEqual(pkt.header.length, 254)
+        self.assertIsNone(pkt.err())
+
+        view, spans = segmentation.segment_into(bytes(1000), space_pkt_lib.SpacePacketHeader())
+        self.assertIsNone(space_pkt_lib.SpacePacket.from_bytes(bytes(view[:spans[0][1]])).err())
+        with self.assertRaises(ValueError):
+            list(segmentation.segment(bytes(1000), space_pkt_lib.SpacePacketHeader(), segment_size=239))
+
+    def test_reassemble_out_of_order(self):
+        """Verifies segments are reassembled in any order, ignoring duplicates"""
+        data = bytes(random.Random(2).getrandbits(8) for _ in range(5000))
+        pkts = list(segmentation.segment(data, make_header(100), 7))
+        order = list(pkts)
+        random.Random(3).shuffle(order)
+        order[-1:-1] = order[:2]
+        r = segmentation.Reassembler()
+
+        got = [r.feed(space_pkt_lib.SpacePacket.from_bytes(p.to_bytes())) for p in order]
+
+        done = [g for g in got if g is not None]
+        self.assertEqual(len(done), 1)
+        key, buf = done[0]
+        self.assertEqual(key, (7, 3, 100))
+        self.assertEqual(bytes(buf), data)
+        self.assertEqual(r.memory, 0)
+        self.assertEqual(r.completed, 1)
+        self.assertEqual(got[-1], done[0])
+        self.assertEqual(r.duplicates, 2)
+
+    def test_reassemble_views_into_mmap(self):
+        """Verifies reassembly from packet views into mmap buffers"""
+        data = b'0123456789' * 100
+        view, spans = segmentation.segment_into(data, make_header(5), 2, 64)
+        r = segmentation.Reassembler(buffer_factory=lambda n: mmap.mmap(-1, n))
+
+        got = [r.feed(space_pkt_lib.SpacePacketView(view, o, n)) for o, n in spans]
+
+        key, buf = got[-1]
+        self.assertIsInstance(buf, mmap.mmap)
+        self.assertEqual(buf[:], data)
+
+    def test_missing_and_corrupted(self):
+        """Verifies gaps are reported and corrupted packets dropped"""
+        data = bytes(3000)
+        pkts = [bytearray(p.to_bytes()) for p in segmentation.segment(data, make_header(0), 1, 200)]
+        pkts[4][-5] ^= 0x01
+        r = segmentation.Reassembler()
+
+        for i, p in enumerate(pkts):
+            if i not in (2, 9):
+                self.assertIsNone(r.feed(space_pkt_lib.SpacePacket.from_bytes(bytes(p))))
+
+        self.assertEqual(r.dropped, 1)
+        self.assertEqual(r.transfers[0].missing(), [2, 4, 9])
+
+    def test_expiry_and_budget(self):
+        """Verifies stale and least recently updated transfers are dropped"""
+        clock = FakeClock()
+        r = segmentation.Reassembler(memory_budget=2500, timeout=10, clock=clock)
+        transfers = [list(segmentation.segment(bytes(1000), make_header(i * 100), 1)) for i in range(4)]
+
+        r.feed(transfers[0][0])
+        clock.now = 5
+        r.feed(transfers[1][0])
+        r.feed(transfers[0][1])
+        clock.now = 7
+        r.feed(transfers[2][0])
+        self.assertEqual([t.key[2] for t in r.transfers], [0, 200])
+        self.assertEqual(r.evicted, 1)
+        self.assertEqual(r.memory, 2000)
+
+        clock.now = 15
+        r.feed(transfers[3][0])
+        self.assertEqual([t.key[2] for t in r.transfers], [200, 300])
+        self.assertEqual(r.expired, 1)
+
+        with self.assertRaises(ValueError):
+            r.feed(next(segmentation.segment(bytes(3000), make_header(0), 1)))
+
+    def test_inconsistent_segment(self):
+        """Verifies segments out of their transfer's range are rejected"""
+        pkts = list(segmentation.segment(bytes(500), make_header(0), 1, 100))
+        r = segmentation.Reassembler()
+        r.feed(pkts[0])
+
+        bad = next(segmentation.segment(bytes(500), make_header(0), 1, 100))
+        bad.header.sequence_number = 5
+
+        with self.assertRaises(ValueError):
+            r.feed(bad)
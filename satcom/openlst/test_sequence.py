@@ -0,0 +1,67 @@
+import unittest
+import satcom.openlst.client_packet_lib as client_pkt_lib
+import satcom.openlst.sequence as sequence
+import satcom.openlst.space_packet_lib as space_pkt_lib
+
+class TestSequenceTracker(unittest.TestCase):
+
+    def test_observe(self):
+        """Verifies in order, gap, reordered, duplicate and stale arrivals"""
+        tracker = sequence.SequenceTracker(window_size=8)
+
+        got = [tracker.observe(1, 2, seq) for seq in [10, 11, 14, 12, 12, 11, 15, 30, 20, 29, 9]]
+
+        want = [
+            sequence.IN_ORDER, sequence.IN_ORDER, sequence.GAP, sequence.REORDERED,
+            sequence.DUPLICATE, sequence.DUPLICATE, sequence.IN_ORDER, sequence.GAP,
+            sequence.STALE, sequence.REORDERED, sequence.STALE
+        ]
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+        s = tracker.streams[(1, 2)]
+        self.assertEqual(s.received, 11)
+        self.assertEqual(s.duplicates, 2)
+        self.assertEqual(s.reordered, 2)
+        self.assertEqual(s.stale, 2)
+        # 12-13 and 16-29 were skipped, then 12 and 29 arrived
+        self.assertEqual(s.gaps, 2 + 14)
+        self.assertEqual(s.lost, 16 - 2)
+
+    def test_wraparound(self):
+        """Verifies sequence numbers wrap at 65535"""
+        tracker = sequence.SequenceTracker()
+
+        got = [tracker.observe(1, 0, seq) for seq in [65533, 65534, 0, 65535, 1, 65535]]
+
+        want = [
+            sequence.IN_ORDER, sequence.IN_ORDER, sequence.GAP, sequence.REORDERED,
+            sequence.IN_ORDER, sequence.DUPLICATE
+        ]
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(tracker.lost, 0)
+
+    def test_before_first_packet(self):
+        """Verifies packets older than the first seen are not counted as recovered"""
+        tracker = sequence.SequenceTracker()
+
+        self.assertEqual(tracker.observe(1, 0, 100), sequence.IN_ORDER)
+        self.assertEqual(tracker.observe(1, 0, 99), sequence.STALE)
+        self.assertEqual(tracker.lost, 0)
+
+    def test_filter_duplicates(self):
+        """Verifies duplicates are dropped per hardware_id and port"""
+        def space(hwid, port, seq):
+            hdr = space_pkt_lib.SpacePacketHeader(port=port, sequence_number=seq)
+            return space_pkt_lib.SpacePacket(b'', hdr, space_pkt_lib.SpacePacketFooter(hardware_id=hwid))
+
+        def client(hwid, seq):
+            hdr = client_pkt_lib.ClientPacketHeader(hardware_id=hwid, sequence_number=seq)
+            return client_pkt_lib.ClientPacket(b'', hdr)
+
+        pkts = [space(1, 1, 5), space(1, 2, 5), space(2, 1, 5), space(1, 1, 5), client(1, 6), client(1, 6), space(1, 1, 6)]
+        tracker = sequence.SequenceTracker()
+
+        got = list(tracker.filter(pkts))
+
+        self.assertEqual(got, [pkts[i] for i in (0, 1, 2, 4, 6)])
+        self.assertEqual(tracker.duplicates, 2)
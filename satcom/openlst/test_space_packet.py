@@ -74,6 +74,16 @@ class TestSpacePacket(unittest.TestCase):
         with self.assertRaises(ValueError):
             space_pkt_lib.SpacePacket(dat, hdr, ftr)
 
+    def test_new_space_packet_max_length(self):
+        """Verifies the longest packet has a valid length byte, and one more byte is rejected"""
+        n = space_pkt_lib.SPACE_PACKET_MAX_LENGTH - space_pkt_lib.SPACE_PACKET_HEADER_LENGTH - space_pkt_lib.SPACE_PACKET_FOOTER_LENGTH
+        pkt = space_pkt_lib.SpacePacket(bytes(n), space_pkt_lib.SpacePacketHeader(), space_pkt_lib.SpacePacketFooter())
+
+        self.assertEqual(pkt.header.length, 254)
+        self.assertIsNone(pkt.err())
+        with self.assertRaises(ValueError):
+            space_pkt_lib.SpacePacket(bytes(n + 1))
+
     def test_new_space_packet_to_bytes_success(self):
         """Verifies successful space packet creation"""
         dat = bytes([0x11, 0x22, 0x33])
@@ -107,3 +117,178 @@ class TestSpacePacket(unittest.TestCase):
 
         self.assertIsNone(pkt.err(), msg=pkt.err())
         self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_space_packet_header_slots(self):
+        """Verifies headers are slotted and hold no instance dict"""
+        hdr = space_pkt_lib.SpacePacketHeader(length=13)
+        ftr = space_pkt_lib.SpacePacketFooter(hardware_id=1)
+
+        self.assertFalse(hasattr(hdr, '__dict__'))
+        self.assertFalse(hasattr(ftr, '__dict__'))
+        with self.assertRaises(AttributeError):
+            hdr.lenght = 14
+
+    def test_import_without_pydantic(self):
+        """Verifies importing the packet libraries does not load pydantic"""
+        import subprocess, sys
+        code = (
+            'import sys\n'
+            'import satcom.csp_v1, satcom.openlst.client_packet_lib, satcom.openlst.space_packet_lib\n'
+            'sys.exit("pydantic" in sys.modules)\n'
+        )
+        self.assertEqual(subprocess.run([sys.executable, '-c', code]).returncode, 0)
+
+    def test_space_packet_header_pack_into(self):
+        """Verifies SpacePacketHeader and SpacePacketFooter pack and unpack at an offset"""
+        hdr = space_pkt_lib.SpacePacketHeader(length=13, port=1, sequence_number=4, destination=253, command_number=56)
+        ftr = space_pkt_lib.SpacePacketFooter(hardware_id=270, crc16_checksum=bytes([0x0A, 0x0B]))
+        buf = bytearray(16)
+
+        hdr.pack_into(buf, 2)
+        ftr.pack_into(buf, 10)
+
+        want = bytes([0x00, 0x00, 0x0D, 0x01, 0x04, 0x00, 0xFD, 0x38, 0x00, 0x00, 0x0E, 0x01, 0x0B, 0x0A, 0x00, 0x00])
+        self.assertEqual(buf, want, f'unexpected result: want={want} got={buf}')
+        self.assertEqual(space_pkt_lib.SpacePacketHeader.unpack_from(buf, 2), hdr)
+        self.assertEqual(space_pkt_lib.SpacePacketFooter.unpack_from(buf, 10), ftr)
+
+    def test_space_packet_header_out_of_range(self):
+        """Verifies packing an out of range field raises ValueError"""
+        hdr = space_pkt_lib.SpacePacketHeader(length=13, sequence_number=70000)
+
+        with self.assertRaises(ValueError):
+            hdr.to_bytes()
+
+    def test_space_packet_view(self):
+        """Verifies SpacePacketView decodes fields without copying"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=0xC0, sequence_number=4, destination=253, command_number=56)
+        ftr = space_pkt_lib.SpacePacketFooter(hardware_id=1023)
+        pkt = space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr, ftr).to_bytes()
+        buf = bytearray(b'\x99\x99' + pkt + b'\x99')
+
+        view = space_pkt_lib.SpacePacketView(buf, 2)
+
+        self.assertEqual(len(view), len(pkt))
+        self.assertEqual(view.port, 0xC0)
+        self.assertEqual(view.sequence_number, 4)
+        self.assertEqual(view.destination, 253)
+        self.assertEqual(view.command_number, 56)
+        self.assertEqual(view.hardware_id, 1023)
+        self.assertEqual(view.header, space_pkt_lib.SpacePacketHeader.from_bytes(pkt[:6]))
+        self.assertIsInstance(view.data, memoryview)
+        self.assertEqual(view.data, b'\x01\x02\x03')
+        self.assertTrue(view.crc_ok())
+        self.assertEqual(view.to_packet().to_bytes(), pkt)
+
+        buf[5] ^= 0xFF
+        self.assertFalse(view.crc_ok())
+
+    def test_iter_space_packet_views(self):
+        """Verifies iterating views over concatenated space packets"""
+        pkts = [
+            space_pkt_lib.SpacePacket(bytes([i]) * i, space_pkt_lib.SpacePacketHeader(sequence_number=i)).to_bytes()
+            for i in range(1, 5)
+        ]
+
+        got = [v.sequence_number for v in space_pkt_lib.iter_space_packet_views(b''.join(pkts))]
+
+        self.assertEqual(got, [1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            list(space_pkt_lib.iter_space_packet_views(b''.join(pkts)[:-1]))
+
+    def test_space_packet_from_bytes_corrupted(self):
+        """Verifies the received checksum is kept and a corrupted packet is detected"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=4, destination=253, command_number=56)
+        val = bytearray(space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr).to_bytes())
+        val[7] ^= 0x10
+
+        pkt = space_pkt_lib.SpacePacket.from_bytes(bytes(val))
+
+        self.assertFalse(pkt.crc_ok())
+        self.assertIsInstance(pkt.err(), ValueError)
+        self.assertEqual(pkt.footer.crc16_checksum, bytes([val[-1], val[-2]]))
+        self.assertEqual(pkt.to_bytes(), val)
+
+    def test_space_packet_encoding_cached(self):
+        """Verifies the packet is encoded once and re-encoded only when modified"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=4, destination=253, command_number=56)
+        pkt = space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr)
+
+        first = pkt.to_bytes()
+        self.assertIsNone(pkt.err())
+        self.assertIs(pkt.to_bytes(), first)
+
+        pkt.header.sequence_number = 5
+        pkt.footer.hardware_id = 9
+        got = pkt.to_bytes()
+        want = space_pkt_lib.SpacePacket(
+            bytes([0x01, 0x02, 0x03]),
+            space_pkt_lib.SpacePacketHeader(port=1, sequence_number=5, destination=253, command_number=56),
+            space_pkt_lib.SpacePacketFooter(hardware_id=9)
+        ).to_bytes()
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertIsNone(pkt.err())
+
+    def test_space_packet_footer_checksum(self):
+        """Verifies a new packet's footer has its checksum, and an assigned checksum is sent as given"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=4, destination=253, command_number=56)
+        pkt = space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr, space_pkt_lib.SpacePacketFooter(hardware_id=12))
+
+        self.assertIsNone(pkt.footer.err())
+        good = pkt.footer.crc16_checksum
+        first = pkt.to_bytes()
+        self.assertEqual(first[-2:], good[::-1])
+
+        pkt.footer.crc16_checksum = b'\x12\x34'
+        got = pkt.to_bytes()
+        self.assertEqual(got, first[:-2] + b'\x34\x12')
+        self.assertFalse(pkt.crc_ok())
+        self.assertIsInstance(pkt.err(), ValueError)
+
+        pkt.footer.crc16_checksum = good
+        self.assertEqual(pkt.to_bytes(), first)
+        self.assertTrue(pkt.crc_ok())
+        self.assertIsNone(pkt.err())
+
+    def test_space_packet_from_reused_buffer(self):
+        """Verifies a packet parsed from a receive buffer is unaffected by reusing the buffer"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=4, destination=253, command_number=56)
+        val = space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr).to_bytes()
+        buf = bytearray(val)
+
+        for src in (buf, memoryview(buf)):
+            buf[:] = val
+            pkt = space_pkt_lib.SpacePacket.from_bytes(src)
+            buf[:] = bytes(len(buf))
+
+            self.assertTrue(pkt.crc_ok())
+            self.assertIsNone(pkt.err())
+            self.assertEqual(pkt.to_bytes(), val)
+            self.assertEqual(pkt.data, bytes([0x01, 0x02, 0x03]))
+
+    def test_space_packet_footer_out_of_range(self):
+        """Verifies reading the footer of a packet with a field out of range does not raise"""
+        pkt = space_pkt_lib.SpacePacket(b'abc', footer=space_pkt_lib.SpacePacketFooter(hardware_id=70000))
+
+        self.assertEqual(pkt.footer.hardware_id, 70000)
+        self.assertIsInstance(pkt.footer.err(), ValueError)
+        self.assertIsInstance(pkt.err(), ValueError)
+        with self.assertRaises(ValueError):
+            pkt.to_bytes()
+
+        pkt.footer.hardware_id = 7
+        self.assertIsNone(pkt.footer.err())
+        self.assertIsNone(pkt.err())
+
+    def test_space_packet_modified_after_receipt(self):
+        """Verifies modifying a received packet replaces the received checksum"""
+        hdr = space_pkt_lib.SpacePacketHeader(port=1, sequence_number=4, destination=253, command_number=56)
+        val = bytearray(space_pkt_lib.SpacePacket(bytes([0x01, 0x02, 0x03]), hdr).to_bytes())
+        val[-1] ^= 0xFF
+        pkt = space_pkt_lib.SpacePacket.from_bytes(bytes(val))
+        self.assertFalse(pkt.crc_ok())
+
+        pkt.header.sequence_number = 6
+
+        self.assertTrue(pkt.crc_ok())
+        self.assertIsNone(pkt.err())
@@ -0,0 +1,79 @@
+import unittest
+import satcom.openlst.fec as fec
+import satcom.openlst.receiver as receiver
+import satcom.openlst.space_packet_lib as space_pkt_lib
+import satcom.openlst.transmitter as transmitter
+import satcom.openlst.whitening as whitening
+
+def make_header(sequence_number: int = 4000) -> space_pkt_lib.SpacePacketHeader:
+    """Builds a space packet header for test commands"""
+    return space_pkt_lib.SpacePacketHeader(
+        port=1,
+        sequence_number=sequence_number,
+        destination=253,
+        command_number=56
+    )
+
+class TestTransmitter(unittest.TestCase):
+
+    def test_frame(self):
+        """Verifies a frame matches the step by step construction"""
+        dat = bytes([0x11, 0x22, 0x33])
+        pkt = space_pkt_lib.SpacePacket(dat, make_header(), space_pkt_lib.SpacePacketFooter(hardware_id=12))
+        tx = transmitter.OpenLSTTransmitter(hardware_id=12)
+
+        got = bytes(tx.frame(dat, make_header()))
+
+        want = (
+            space_pkt_lib.SPACE_PACKET_PREAMBLE +
+            space_pkt_lib.SPACE_PACKET_ASM +
+            whitening.whiten(fec.encode_fec(pkt.to_bytes()))
+        )
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(len(got), transmitter.frame_length(len(dat)))
+
+    def test_frame_too_long(self):
+        """Verifies a frame with too much data is rejected"""
+        tx = transmitter.OpenLSTTransmitter()
+
+        with self.assertRaises(ValueError):
+            tx.frame(bytes(1024), make_header())
+
+        # the length byte of the longest packet is 254
+        n = space_pkt_lib.SPACE_PACKET_MAX_LENGTH - space_pkt_lib.SPACE_PACKET_HEADER_LENGTH - space_pkt_lib.SPACE_PACKET_FOOTER_LENGTH
+        pkt = receiver.OpenLSTReceiver().receive(tx.frame(bytes(n), make_header())[transmitter.SYNC_LENGTH:])
+        self.assertIsNone(pkt.err())
+        with self.assertRaises(ValueError):
+            tx.frame(bytes(n + 1), make_header())
+
+    def test_frame_batch(self):
+        """Verifies batch frames are received back as the original commands"""
+        tx = transmitter.OpenLSTTransmitter(hardware_id=7)
+        commands = [(bytes([i]) * i, make_header(i)) for i in range(1, 6)]
+
+        buf, spans = tx.frame_batch(commands)
+
+        rx = receiver.OpenLSTReceiver()
+        for (data, header), (offset, n) in zip(commands, spans):
+            frame = buf[offset+transmitter.SYNC_LENGTH:offset+n]
+            pkt = rx.receive(frame)
+            self.assertEqual(pkt.data, data, f'unexpected result: want={data} got={pkt.data}')
+            self.assertEqual(pkt.header.sequence_number, header.sequence_number)
+            self.assertEqual(pkt.footer.hardware_id, 7)
+        self.assertEqual(len(buf), sum(n for _, n in spans))
+
+    def test_frame_batch_into(self):
+        """Verifies batch frames can be written to a caller supplied buffer"""
+        tx = transmitter.OpenLSTTransmitter()
+        commands = [(b'abc', make_header(1)), (b'defg', make_header(2))]
+        out = bytearray(256)
+
+        buf, spans = tx.frame_batch(commands, out)
+
+        for (data, header), (offset, n) in zip(commands, spans):
+            want = bytes(tx.frame(data, header))
+            got = bytes(out[offset:offset+n])
+            self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+        with self.assertRaises(ValueError):
+            tx.frame_batch(commands, bytearray(16))
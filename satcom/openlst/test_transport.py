@@ -0,0 +1,228 @@
+import asyncio
+import os
+import tty
+import unittest
+import satcom.openlst.client_packet_lib as client_pkt_lib
+import satcom.openlst.transport as transport
+
+def make_packet(sequence_number: int, data: bytes = b'\x01\x02') -> client_pkt_lib.ClientPacket:
+    """Builds a client packet for test commands"""
+    hdr = client_pkt_lib.ClientPacketHeader(
+        hardware_id=1023,
+        sequence_number=sequence_number,
+        destination=253,
+        command_number=56
+    )
+    return client_pkt_lib.ClientPacket(data, hdr)
+
+def make_reply(pkt: client_pkt_lib.ClientPacket) -> client_pkt_lib.ClientPacket:
+    """Builds the fake radio's response to a command"""
+    hdr = client_pkt_lib.ClientPacketHeader(
+        hardware_id=pkt.header.hardware_id,
+        sequence_number=pkt.header.sequence_number,
+        destination=pkt.header.destination,
+        command_number=0x10
+    )
+    return client_pkt_lib.ClientPacket(pkt.data[::-1], hdr)
+
+class FakeRadio(transport.OpenLSTProtocol):
+    """Replies to every batch of `batch` commands in reverse order"""
+
+    def __init__(self, batch: int = 1):
+        super().__init__(on_packet=self.handle)
+        self.batch = batch
+        self.received = []
+
+    def handle(self, pkt):
+        self.received.append(pkt)
+        if len(self.received) % self.batch == 0:
+            for p in reversed(self.received[-self.batch:]):
+                self.send(make_reply(p))
+
+class FakeDatagramRadio(transport.OpenLSTDatagramProtocol):
+    """Replies to each datagram command"""
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        for pkt in self._deframer.feed(data):
+            self.transport.sendto(transport.frame_client_packet(make_reply(pkt)), addr)
+
+class TestDeframer(unittest.TestCase):
+
+    def test_deframe(self):
+        """Verifies packets are deframed from a noisy, chunked stream"""
+        pkts = [make_packet(i, bytes([i]) * i) for i in range(5)]
+        stream = b'\x00\x22\x22' + b'\x55'.join(transport.frame_client_packet(p) for p in pkts)
+        deframer = transport.ClientPacketDeframer()
+
+        got = []
+        for i in range(0, len(stream), 3):
+            got += deframer.feed(stream[i:i+3])
+
+        want = [p.to_bytes() for p in pkts]
+        self.assertEqual([p.to_bytes() for p in got], want)
+        self.assertEqual(deframer.discarded, 3 + 4)
+
+    def test_deframe_large_read(self):
+        """Verifies many packets in one read are deframed, keeping only the unfinished tail"""
+        pkts = [make_packet(i, bytes([i & 0xFF]) * (i % 30)) for i in range(2000)]
+        stream = b'\x55'.join(transport.frame_client_packet(p) for p in pkts)
+        deframer = transport.ClientPacketDeframer()
+
+        got = deframer.feed(stream + transport.frame_client_packet(pkts[0])[:5])
+
+        self.assertEqual([p.to_bytes() for p in got], [p.to_bytes() for p in pkts])
+        self.assertEqual(deframer.discarded, 1999)
+        self.assertEqual(len(deframer._buf), 5)
+
+    def test_deframe_bad_length(self):
+        """Verifies a start sequence with an impossible length is skipped"""
+        pkt = make_packet(9)
+        stream = b'\x22\x69\x02' + transport.frame_client_packet(pkt)
+
+        got = transport.ClientPacketDeframer().feed(stream)
+
+        self.assertEqual([p.to_bytes() for p in got], [pkt.to_bytes()])
+
+class TestTransport(unittest.TestCase):
+
+    def test_tcp_pipelined_requests(self):
+        """Verifies concurrent requests are matched to out of order responses"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            server = await loop.create_server(lambda: FakeRadio(batch=4), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                radio = await transport.open_tcp('127.0.0.1', port)
+                replies = await asyncio.gather(*[
+                    radio.request(make_packet(i, bytes([i, i + 1])), timeout=5) for i in range(8)
+                ])
+                self.assertEqual(radio.outstanding, 0)
+                radio.close()
+            return replies
+
+        replies = asyncio.run(run())
+        for i, reply in enumerate(replies):
+            self.assertEqual(reply.header.sequence_number, i)
+            self.assertEqual(reply.data, bytes([i + 1, i]))
+
+    def test_udp_command(self):
+        """Verifies commands over UDP are assigned sequence numbers and answered"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            server, _ = await loop.create_datagram_endpoint(FakeDatagramRadio, local_addr=('127.0.0.1', 0))
+            radio = await transport.open_udp(server.get_extra_info('sockname'))
+            replies = await asyncio.gather(*[
+                radio.command(1023, 253, 56, b'ab', timeout=5) for _ in range(3)
+            ])
+            radio.close()
+            server.close()
+            return replies
+
+        replies = asyncio.run(run())
+        self.assertEqual([r.header.sequence_number for r in replies], [1, 2, 3])
+        self.assertEqual([r.data for r in replies], [b'ba'] * 3)
+
+    def test_udp_error_received(self):
+        """Verifies a refused datagram fails outstanding requests but leaves the link usable"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            # a port with nothing bound to it, so the request is refused
+            probe, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, local_addr=('127.0.0.1', 0))
+            addr = probe.get_extra_info('sockname')
+            probe.close()
+
+            radio = await transport.open_udp(addr)
+            with self.assertRaises(ConnectionRefusedError):
+                await radio.request(make_packet(1), timeout=5)
+            self.assertEqual(radio.outstanding, 0)
+            self.assertFalse(radio.transport.is_closing())
+
+            server, _ = await loop.create_datagram_endpoint(FakeDatagramRadio, local_addr=addr)
+            reply = await radio.command(1023, 253, 56, b'ab', timeout=5)
+            radio.close()
+            server.close()
+            return reply
+
+        reply = asyncio.run(run())
+        self.assertEqual(reply.data, b'ba')
+
+    def test_pty_request(self):
+        """Verifies requests over a pty pair"""
+        master, slave = os.openpty()
+        tty.setraw(slave)
+
+        async def run():
+            radio_end = FakeRadio()
+            loop = asyncio.get_running_loop()
+            radio = await transport.open_fd(master)
+            reader = os.fdopen(os.dup(slave), 'rb', buffering=0)
+            writer = os.fdopen(os.dup(slave), 'wb', buffering=0)
+            await loop.connect_read_pipe(lambda: radio_end, reader)
+            write_transport, _ = await loop.connect_write_pipe(asyncio.BaseProtocol, writer)
+            radio_end._write = write_transport.write
+
+            reply = await radio.request(make_packet(77, b'xyz'), timeout=5)
+            radio.close()
+            radio_end.transport.close()
+            write_transport.close()
+            return reply
+
+        try:
+            reply = asyncio.run(run())
+        finally:
+            os.close(master)
+            os.close(slave)
+        self.assertEqual(reply.header.sequence_number, 77)
+        self.assertEqual(reply.data, b'zyx')
+
+    def test_request_timeout(self):
+        """Verifies an unanswered request times out and is forgotten"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            server = await loop.create_server(lambda: FakeRadio(batch=2), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                radio = await transport.open_tcp('127.0.0.1', port)
+                with self.assertRaises(asyncio.TimeoutError):
+                    await radio.request(make_packet(5), timeout=0.05)
+                self.assertEqual(radio.outstanding, 0)
+                radio.close()
+
+        asyncio.run(run())
+
+    def test_connection_lost_fails_requests(self):
+        """Verifies outstanding requests fail when the connection closes"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            server = await loop.create_server(lambda: FakeRadio(batch=100), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                radio = await transport.open_tcp('127.0.0.1', port)
+                pending = asyncio.ensure_future(radio.request(make_packet(1)))
+                await asyncio.sleep(0.01)
+                radio.close()
+                with self.assertRaises(ConnectionError):
+                    await pending
+
+        asyncio.run(run())
+
+    def test_duplicate_sequence_number(self):
+        """Verifies a sequence number cannot be outstanding twice"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            server = await loop.create_server(lambda: FakeRadio(batch=100), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                radio = await transport.open_tcp('127.0.0.1', port)
+                first = asyncio.ensure_future(radio.request(make_packet(1)))
+                await asyncio.sleep(0)
+                with self.assertRaises(ValueError):
+                    await radio.request(make_packet(1))
+                radio.close()
+                with self.assertRaises(ConnectionError):
+                    await first
+
+        asyncio.run(run())
@@ -0,0 +1,124 @@
+import unittest
+import satcom.openlst.fec as fec
+import satcom.openlst.viterbi as viterbi
+
+def unpack_symbols(bs: bytes) -> list:
+    """Splits symbol bytes into 2-bit symbols, MSB first"""
+    return [(b >> shift) & 0x3 for b in bs for shift in (6, 4, 2, 0)]
+
+def unpack_soft(bs: bytes) -> list:
+    """Splits bytes into soft values of +-1 per bit, MSB first"""
+    return [1 if (b >> (7 - i)) & 1 else -1 for b in bs for i in range(8)]
+
+class TestViterbi(unittest.TestCase):
+
+    def test_decoder_streaming(self):
+        """Verifies decoding in pieces matches decoding in one call"""
+        symbols = fec.deinterleave_frame(fec.encode_fec(b'openlst viterbi'))
+
+        want = viterbi.ViterbiDecoder().decode(symbols)
+        dec = viterbi.ViterbiDecoder()
+        got = dec.decode(symbols[:5]) + dec.decode(symbols[5:13]) + dec.decode(symbols[13:])
+
+        self.assertEqual(want, b'openlst viterbi')
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_decoder_metric(self):
+        """Verifies the path metric counts corrected bit errors"""
+        # an even length payload needs no padding chunk, so a clean frame
+        # is a valid codeword; the last byte is still in the traceback
+        bs = bytearray(fec.encode_fec(b'abcd'))
+        dec = viterbi.ViterbiDecoder()
+        dec.decode(fec.deinterleave_frame(bytes(bs)))
+        self.assertEqual(dec.metric, 0)
+
+        bs[1] ^= 0x04
+        dec.reset()
+        got = dec.decode(fec.deinterleave_frame(bytes(bs)))
+        self.assertEqual(got, b'abc', f'unexpected result: want={b"abc"} got={got}')
+        self.assertEqual(dec.metric, 1)
+
+    @unittest.skipIf(viterbi.np is None, 'numpy not installed')
+    def test_decode_symbols_numpy(self):
+        """Verifies the numpy decoder matches the pure Python decoder"""
+        frames = [bytearray(fec.encode_fec(b'%05d' % i)) for i in range(4)]
+        frames[1][2] ^= 0x80
+        frames[3] = bytearray(b'\x5a' * len(frames[3]))
+        symbols = [unpack_symbols(fec.deinterleave_frame(bytes(f))) for f in frames]
+
+        out, metric = viterbi.decode_symbols_numpy(symbols)
+
+        for i, f in enumerate(frames):
+            dec = viterbi.ViterbiDecoder()
+            want = dec.decode(fec.deinterleave_frame(bytes(f)))
+            got = bytes(out[i])
+            self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+            self.assertEqual(metric[i], dec.metric)
+
+    def test_decoder_flush(self):
+        """Verifies flushing releases the final byte of an even length payload"""
+        for payload in (b'ab', b'abc', b'even', b'odd'):
+            dec = viterbi.ViterbiDecoder()
+            got = dec.decode(fec.deinterleave_frame(fec.encode_fec(payload))) + dec.flush()
+
+            self.assertEqual(got[:len(payload)], payload, f'unexpected result: want={payload} got={got}')
+
+    def test_soft_decoder_matches_hard(self):
+        """Verifies soft decoding of +-1 values matches hard decoding"""
+        for payload in (b'a', b'ab', b'openlst soft viterbi'):
+            bs = bytearray(fec.encode_fec(payload))
+            bs[2] ^= 0x10
+
+            hard = viterbi.ViterbiDecoder()
+            want = hard.decode(fec.deinterleave_frame(bytes(bs))) + hard.flush()
+            soft = viterbi.SoftViterbiDecoder()
+            values = fec.deinterleave_soft(unpack_soft(bs))
+            # odd sized pieces split symbols across calls
+            got = soft.decode(values[:7]) + soft.decode(values[7:]) + soft.flush()
+
+            self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+            self.assertEqual(soft.metric, hard.metric)
+
+    def test_soft_decoder_uses_confidence(self):
+        """Verifies low confidence errors are corrected where hard decisions fail"""
+        values = unpack_soft(fec.encode_fec(b'abcd'))
+        # flip a burst of bits, each with low confidence
+        for i in range(8, 14):
+            values[i] = -values[i]
+        strong = [v * viterbi.SOFT_MAX for v in values]
+        for i in range(8, 14):
+            strong[i] = values[i]
+
+        hard = fec.decode_fec(bytes(
+            sum((v > 0) << (7 - j) for j, v in enumerate(strong[k:k+8]))
+            for k in range(0, len(strong), 8)
+        ))
+        got = fec.decode_fec_soft(strong)
+
+        self.assertNotEqual(hard[:3], b'abc')
+        self.assertEqual(got[:3], b'abc')
+
+    def test_quantize_soft(self):
+        """Verifies soft values are scaled and clipped"""
+        got = viterbi.quantize_soft([0.1, -0.2, 2.0, -0.05], scale=10)
+        self.assertEqual(got, [1, -2, 7, 0])
+
+        got = viterbi.quantize_soft([1.0, -1.0, 0.5, -0.5], bits=3)
+        self.assertEqual(got, [2, -2, 1, -1])
+
+    @unittest.skipIf(viterbi.np is None, 'numpy not installed')
+    def test_decode_soft_numpy(self):
+        """Verifies the numpy soft decoder matches the pure Python soft decoder"""
+        np = viterbi.np
+        rng = np.random.default_rng(3)
+        frames = [fec.encode_fec(b'%06d' % i) for i in range(5)]
+        values = np.array([unpack_soft(f) for f in frames], dtype=float)
+        values = viterbi.quantize_soft(values + rng.normal(0, 0.7, values.shape))
+
+        got, metrics = fec.decode_fec_soft_batch(values)
+
+        for row, metric, vals in zip(got, metrics, values):
+            dec = viterbi.SoftViterbiDecoder()
+            want = dec.decode(fec.deinterleave_soft(vals.tolist()))
+            self.assertEqual(bytes(row), want, f'unexpected result: want={want} got={bytes(row)}')
+            self.assertEqual(metric, dec.metric)
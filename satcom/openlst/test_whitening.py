@@ -21,4 +21,43 @@ class TestWhitening(unittest.TestCase):
         got = whitening.whiten(bs, gen)
         want = bytes(b'openlst')
 
-        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
\ No newline at end of file
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_whitening_resume(self):
+        """Validates whitening across calls continues the PN9 sequence"""
+        bs = bytes(range(200)) * 4
+        gen = whitening.pn9()
+
+        want = whitening.whiten(bs)
+        got = whitening.whiten(bs[:3], gen) + whitening.whiten(bs[3:600], gen) + whitening.whiten(bs[600:], gen)
+
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_whitening_sequence_period(self):
+        """Validates the PN9 byte sequence repeats every 511 bytes"""
+        gen = whitening.pn9()
+        seq = bytes(next(gen) for _ in range(1022))
+
+        self.assertEqual(seq[:511], seq[511:])
+        self.assertEqual(seq[:511], whitening.PN9_SEQUENCE)
+
+    def test_whitening_inplace(self):
+        """Validates in-place whitening of a memoryview"""
+        buf = bytearray(b'xxfoobarxx')
+
+        whitening.whiten_inplace(memoryview(buf)[2:8])
+
+        want = b'xx\x99\x8er\xf8\x8c\xf7xx'
+        self.assertEqual(buf, want, f'unexpected result: want={want} got={buf}')
+
+    def test_whitening_soft(self):
+        """Verifies soft values change sign where whitening flips bits"""
+        raw = bytes(range(40))
+        values = [1 if (b >> (7 - i)) & 1 else -1 for b in raw for i in range(8)]
+
+        got = whitening.whiten_soft(values, whitening.PN9(5))
+
+        want = [1 if (b >> (7 - i)) & 1 else -1 for b in whitening.whiten(raw, whitening.PN9(5)) for i in range(8)]
+        self.assertEqual(got, want)
+        if whitening.np is not None:
+            self.assertEqual(whitening.whiten_soft(whitening.np.array(values), whitening.PN9(5)).tolist(), want)
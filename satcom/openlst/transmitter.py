@@ -0,0 +1,86 @@
+from satcom.openlst import fec, whitening
+from satcom.openlst.space_packet_lib import (
+    SPACE_PACKET_ASM,
+    SPACE_PACKET_FOOTER_LENGTH,
+    SPACE_PACKET_HEADER_LENGTH,
+    SPACE_PACKET_MAX_LENGTH,
+    SPACE_PACKET_PREAMBLE,
+    SpacePacketHeader,
+    pack_space_packet_into,
+)
+
+SYNC_LENGTH = len(SPACE_PACKET_PREAMBLE) + len(SPACE_PACKET_ASM)
+
+MAX_FRAME_LENGTH = SYNC_LENGTH + fec.encoded_length(SPACE_PACKET_MAX_LENGTH)
+
+
+def frame_length(data_length: int) -> int:
+    """Returns the over-the-air length of a frame carrying data_length bytes"""
+    packet_length = SPACE_PACKET_HEADER_LENGTH + data_length + SPACE_PACKET_FOOTER_LENGTH
+    return SYNC_LENGTH + fec.encoded_length(packet_length)
+
+
+class OpenLSTTransmitter():
+    """Builds complete OpenLST over-the-air frames in reusable buffers
+
+    A frame is the preamble, the ASM and the FEC encoded, whitened space
+    packet. The packet is serialized and checksummed once into a scratch
+    buffer and then encoded and whitened straight into the output buffer.
+    """
+
+    def __init__(self, hardware_id: int = 0):
+        self.hardware_id = hardware_id
+        self._packet = bytearray(SPACE_PACKET_MAX_LENGTH)
+        self._frame = bytearray(MAX_FRAME_LENGTH)
+        self._batch = bytearray()
+
+    def _write_packet(self, data, header: SpacePacketHeader, hardware_id: int) -> memoryview:
+        """Serializes a space packet into the scratch buffer"""
+        n = pack_space_packet_into(self._packet, 0, header, data, hardware_id)
+        return memoryview(self._packet)[:n]
+
+    def write_frame_into(self, out, offset: int, data, header: SpacePacketHeader, hardware_id: int = None) -> int:
+        """Writes a complete frame into a writable buffer, returning its length"""
+        if hardware_id is None:
+            hardware_id = self.hardware_id
+        packet = self._write_packet(data, header, hardware_id)
+
+        view = memoryview(out)
+        view[offset:offset+len(SPACE_PACKET_PREAMBLE)] = SPACE_PACKET_PREAMBLE
+        view[offset+len(SPACE_PACKET_PREAMBLE):offset+SYNC_LENGTH] = SPACE_PACKET_ASM
+        n = fec.encode_fec_into(packet, view, offset + SYNC_LENGTH)
+        whitening.whiten_inplace(view[offset+SYNC_LENGTH:offset+SYNC_LENGTH+n])
+        return SYNC_LENGTH + n
+
+    def frame(self, data, header: SpacePacketHeader, hardware_id: int = None) -> memoryview:
+        """Builds a frame in the transmitter's buffer
+
+        The returned view is only valid until the next call to frame().
+        """
+        n = self.write_frame_into(self._frame, 0, data, header, hardware_id)
+        return memoryview(self._frame)[:n]
+
+    def frame_batch(self, commands, out=None) -> tuple:
+        """Builds back-to-back frames for (data, header) commands in one buffer
+
+        Frames are written into out if given, otherwise into a batch buffer
+        owned by the transmitter that is grown as needed and reused between
+        calls. Returns a tuple of a view over the written frames and the
+        (offset, length) span of each frame within it.
+        """
+        commands = list(commands)
+        total = sum(frame_length(len(data)) for data, _ in commands)
+        if out is None:
+            if len(self._batch) < total:
+                self._batch = bytearray(total)
+            out = self._batch
+        elif len(out) < total:
+            raise ValueError('output buffer too small')
+
+        spans = []
+        offset = 0
+        for data, header in commands:
+            n = self.write_frame_into(out, offset, data, header)
+            spans.append((offset, n))
+            offset += n
+        return memoryview(out)[:total], spans
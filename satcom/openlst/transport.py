@@ -0,0 +1,215 @@
+import asyncio
+import os
+
+from satcom.openlst.client_packet_lib import (
+    CLIENT_PACKET_ASM,
+    CLIENT_PACKET_HEADER_LENGTH,
+    ClientPacket,
+    ClientPacketHeader,
+)
+
+
+def frame_client_packet(pkt: ClientPacket) -> bytes:
+    """Prefixes an encoded client packet with the serial start bytes"""
+    return CLIENT_PACKET_ASM + pkt.to_bytes()
+
+
+class ClientPacketDeframer():
+    """Splits a byte stream of framed client packets into ClientPackets
+
+    Each packet is the start bytes followed by the packet itself, whose
+    first byte counts the bytes after it. Bytes outside of a frame are
+    discarded, so the deframer resynchronizes after line noise.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.discarded = 0
+
+    def feed(self, chunk) -> list:
+        """Adds bytes from the stream, returning any packets they complete"""
+        buf = self._buf
+        buf += chunk
+        packets = []
+        asm = len(CLIENT_PACKET_ASM)
+        # bytes before pos are consumed, and trimmed once at the end
+        pos = 0
+
+        while True:
+            found = buf.find(CLIENT_PACKET_ASM, pos)
+            if found < 0:
+                end = max(pos, len(buf) - (asm - 1))
+                self.discarded += end - pos
+                pos = end
+                break
+            self.discarded += found - pos
+            pos = found
+            if len(buf) <= pos + asm:
+                break
+
+            n = buf[pos+asm] + 1
+            if n < CLIENT_PACKET_HEADER_LENGTH:
+                # not a real frame, look for the next start bytes
+                pos += 1
+                self.discarded += 1
+                continue
+            if len(buf) < pos + asm + n:
+                break
+            packets.append(ClientPacket.from_bytes(bytes(buf[pos+asm:pos+asm+n])))
+            pos += asm + n
+
+        del buf[:pos]
+        return packets
+
+
+class OpenLSTProtocol(asyncio.Protocol):
+    """asyncio protocol speaking framed client packets to an OpenLST radio
+
+    Requests are pipelined: any number may be outstanding at once, and
+    each is resolved when a packet with the same sequence number arrives.
+    Packets that answer no outstanding request are passed to on_packet.
+    """
+
+    def __init__(self, on_packet=None):
+        self.on_packet = on_packet
+        self.transport = None
+        self._write = None
+        self._write_transport = None
+        self._deframer = ClientPacketDeframer()
+        self._pending = {}
+        self._sequence_number = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # read-only for pipes, see open_fd
+        self._write = getattr(transport, 'write', None)
+
+    def connection_lost(self, exc):
+        self._fail_pending(exc or ConnectionError('connection closed'))
+        self._write = None
+
+    def _fail_pending(self, err: Exception):
+        """Fails every outstanding request with err"""
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(err)
+        self._pending.clear()
+
+    def data_received(self, data):
+        for pkt in self._deframer.feed(data):
+            self.packet_received(pkt)
+
+    def packet_received(self, pkt: ClientPacket):
+        """Resolves the request matching the packet's sequence number"""
+        fut = self._pending.pop(pkt.header.sequence_number, None)
+        if fut is not None and not fut.done():
+            fut.set_result(pkt)
+        elif self.on_packet is not None:
+            self.on_packet(pkt)
+
+    def close(self):
+        """Closes the connection, failing any outstanding requests"""
+        if self._write_transport is not None:
+            self._write_transport.close()
+        if self.transport is not None:
+            self.transport.close()
+
+    @property
+    def outstanding(self) -> int:
+        """Number of requests awaiting a response"""
+        return len(self._pending)
+
+    def next_sequence_number(self) -> int:
+        """Returns the next 16 bit sequence number not used by an outstanding request"""
+        for _ in range(65536):
+            self._sequence_number = (self._sequence_number + 1) & 0xFFFF
+            if self._sequence_number not in self._pending:
+                return self._sequence_number
+        raise RuntimeError('all sequence numbers are outstanding')
+
+    def send(self, pkt: ClientPacket):
+        """Writes a packet without waiting for a response"""
+        if self._write is None:
+            raise ConnectionError('not connected')
+        self._write(frame_client_packet(pkt))
+
+    async def request(self, pkt: ClientPacket, timeout: float = None) -> ClientPacket:
+        """Sends a packet and waits for the response with the same sequence number"""
+        seq = pkt.header.sequence_number
+        if seq in self._pending:
+            raise ValueError(f'sequence_number {seq} already outstanding')
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[seq] = fut
+        try:
+            self.send(pkt)
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            if self._pending.get(seq) is fut:
+                del self._pending[seq]
+
+    async def command(self, hardware_id: int, destination: int, command_number: int,
+                      data: bytes = b'', timeout: float = None) -> ClientPacket:
+        """Sends a command with the next free sequence number and waits for the response"""
+        hdr = ClientPacketHeader(
+            hardware_id=hardware_id,
+            sequence_number=self.next_sequence_number(),
+            destination=destination,
+            command_number=command_number
+        )
+        return await self.request(ClientPacket(data, hdr), timeout)
+
+
+class OpenLSTDatagramProtocol(OpenLSTProtocol, asyncio.DatagramProtocol):
+    """OpenLSTProtocol over a connected datagram transport"""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._write = transport.sendto
+
+    def datagram_received(self, data, addr):
+        self.data_received(data)
+
+    def error_received(self, exc):
+        # e.g. ICMP port unreachable: the transport stays open, and later
+        # requests may still be answered once the radio is reachable
+        self._fail_pending(exc)
+
+
+class _PipeWriter(asyncio.BaseProtocol):
+    """Write side of a file descriptor connection, see open_fd"""
+
+
+async def open_tcp(host: str, port: int, on_packet=None) -> OpenLSTProtocol:
+    """Connects to a radio over TCP, e.g. a serial-to-network bridge"""
+    loop = asyncio.get_running_loop()
+    _, protocol = await loop.create_connection(lambda: OpenLSTProtocol(on_packet), host, port)
+    return protocol
+
+
+async def open_udp(remote_addr: tuple, local_addr: tuple = None, on_packet=None) -> OpenLSTDatagramProtocol:
+    """Connects to a radio over UDP, one framed packet per datagram"""
+    loop = asyncio.get_running_loop()
+    _, protocol = await loop.create_datagram_endpoint(
+        lambda: OpenLSTDatagramProtocol(on_packet),
+        local_addr=local_addr,
+        remote_addr=remote_addr
+    )
+    return protocol
+
+
+async def open_fd(fd: int, on_packet=None) -> OpenLSTProtocol:
+    """Connects to a radio over a serial port or pty file descriptor
+
+    The descriptor is duplicated for the read and write sides, and should
+    already be configured (baud rate, raw mode) by the caller.
+    """
+    loop = asyncio.get_running_loop()
+    protocol = OpenLSTProtocol(on_packet)
+    reader = os.fdopen(os.dup(fd), 'rb', buffering=0)
+    writer = os.fdopen(os.dup(fd), 'wb', buffering=0)
+    await loop.connect_read_pipe(lambda: protocol, reader)
+    write_transport, _ = await loop.connect_write_pipe(_PipeWriter, writer)
+    protocol._write_transport = write_transport
+    protocol._write = write_transport.write
+    return protocol
@@ -0,0 +1,387 @@
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional and only needed for the *_numpy decoders
+    np = None
+
+
+# Trellis of the CC1110 rate 1/2, K=4 convolutional code (DN504). Indexed
+# by destination state: the two source states, the encoder output symbol on
+# each of the two incoming branches, and the input bit the state implies.
+TRELLIS_SOURCE_STATES = (
+    (0, 4), (0, 4), (1, 5), (1, 5), (2, 6), (2, 6), (3, 7), (3, 7),
+)
+TRELLIS_TRANSITION_OUTPUT = (
+    (0, 3), (3, 0), (1, 2), (2, 1), (3, 0), (0, 3), (2, 1), (1, 2),
+)
+TRELLIS_TRANSITION_INPUT = (0, 1, 0, 1, 0, 1, 0, 1,)
+
+N_STATES = 8
+
+# Number of decoded bits kept per survivor path. Output bytes are taken
+# from bits 24-31, i.e. with a traceback depth of 24 symbols.
+PATH_BITS = 32
+PATH_MASK = (1 << PATH_BITS) - 1
+
+# BRANCH_METRICS[symbol][dest_state] = (metric via source 0, metric via source 1)
+BRANCH_METRICS = tuple(
+    tuple(
+        (bin(symbol ^ out0).count('1'), bin(symbol ^ out1).count('1'))
+        for out0, out1 in TRELLIS_TRANSITION_OUTPUT
+    )
+    for symbol in range(4)
+)
+
+
+def _acs(cost: tuple, symbol: int):
+    """Runs one add-compare-select step over all trellis states
+
+    Returns the normalized next costs, the surviving source state of each
+    destination state and the amount the costs were normalized by. Ties
+    resolve to the second source state, as in the original decoder.
+    """
+    nxt = []
+    survivors = []
+    for (src0, src1), (bm0, bm1) in zip(TRELLIS_SOURCE_STATES, BRANCH_METRICS[symbol]):
+        cost0 = cost[src0] + bm0
+        cost1 = cost[src1] + bm1
+        if cost0 < cost1:
+            nxt.append(cost0)
+            survivors.append(src0)
+        else:
+            nxt.append(cost1)
+            survivors.append(src1)
+    min_cost = min(nxt)
+    return tuple(c - min_cost for c in nxt), tuple(survivors), min_cost
+
+
+def _enumerate_costs() -> tuple:
+    """Enumerates every normalized cost vector reachable from the zero state
+
+    Returns the cost vectors, with the zero state first, and the per-symbol
+    ACS results for each of them, expressed in terms of cost vector indices.
+    Hard decision metrics keep the costs bounded, so there are only a few
+    hundred such vectors.
+    """
+    costs = [(0,) * N_STATES]
+    ids = {costs[0]: 0}
+    steps = []
+    for cost in costs:
+        row = []
+        for symbol in range(4):
+            nxt, survivors, min_cost = _acs(cost, symbol)
+            if nxt not in ids:
+                ids[nxt] = len(costs)
+                costs.append(nxt)
+            row.append((ids[nxt], survivors, min_cost))
+        steps.append(tuple(row))
+    return tuple(costs), tuple(steps)
+
+
+COSTS, SYMBOL_TRANSITIONS = _enumerate_costs()
+
+# ACS results for a whole symbol byte (four 2-bit symbols), keyed by
+# cost index << 8 | byte and filled in lazily as combinations are seen.
+_BYTE_TRANSITIONS = {}
+
+
+def _make_byte_transition(key: int) -> tuple:
+    """Composes four ACS steps into a single transition for one symbol byte
+
+    The transition is (next cost index, source path of each state, the 4 bits
+    each state appends to that path, metric accumulated over the byte).
+    """
+    cost_id = key >> 8
+    byte = key & 0xFF
+    sources = tuple(range(N_STATES))
+    bits = (0,) * N_STATES
+    metric = 0
+    for shift in (6, 4, 2, 0):
+        cost_id, survivors, min_cost = SYMBOL_TRANSITIONS[cost_id][(byte >> shift) & 0x3]
+        sources = tuple(sources[s] for s in survivors)
+        bits = tuple((bits[s] << 1) | i for s, i in zip(survivors, TRELLIS_TRANSITION_INPUT))
+        metric += min_cost
+
+    transition = (cost_id, sources, bits, metric)
+    return _BYTE_TRANSITIONS.setdefault(key, transition)
+
+
+class ViterbiDecoder():
+    """Hard decision Viterbi decoder for the CC1110 FEC code
+
+    Consumes deinterleaved symbol bytes, each holding four 2-bit symbols
+    MSB first, and returns the decoded bytes. State carries over between
+    calls, so a frame can be decoded in one call or chunk by chunk.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Returns the decoder to its initial state"""
+        self._cost_id = 0
+        self._paths = [0] * N_STATES
+        self._path_bits = 0
+        # Accumulated Hamming distance of the best path so far
+        self.metric = 0
+
+    def decode(self, symbols) -> bytes:
+        """Decodes a buffer of symbol bytes, returning any completed output bytes"""
+        transitions = _BYTE_TRANSITIONS
+        cost_id = self._cost_id
+        paths = self._paths
+        path_bits = self._path_bits
+        metric = self.metric
+        out = bytearray()
+
+        for b in symbols:
+            key = (cost_id << 8) | b
+            t = transitions.get(key)
+            if t is None:
+                t = _make_byte_transition(key)
+            cost_id, sources, bits, m = t
+            metric += m
+            paths = [((paths[s] << 4) | x) & PATH_MASK for s, x in zip(sources, bits)]
+
+            path_bits += 4
+            if path_bits >= PATH_BITS:
+                out.append((paths[0] >> 24) & 0xFF)
+                path_bits -= 8
+
+        self._cost_id = cost_id
+        self._paths = paths
+        self._path_bits = path_bits
+        self.metric = metric
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """Pushes the last byte still held in the traceback out of the decoder
+
+        A frame of whole 4 byte chunks leaves one decoded byte behind when
+        the payload length is even. Feeding two more symbol bytes releases
+        it; the trellis termination bytes keep it correct.
+        """
+        return self.decode(b'\0\0')
+
+
+def decoded_length(n_symbols: int) -> int:
+    """Returns the number of bytes decoded from a stream of n_symbols symbols"""
+    if n_symbols < PATH_BITS:
+        return 0
+    return (n_symbols - PATH_BITS) // 8 + 1
+
+
+def decode_symbols_numpy(symbols):
+    """Decodes 2-bit symbols with numpy, running one trellis per row in lockstep
+
+    Accepts a (T,) or (N, T) integer array of symbols and returns a tuple of
+    the decoded (N, decoded_length(T)) uint8 array and the (N,) path metrics.
+    Results are identical to ViterbiDecoder for every row.
+    """
+    if np is None:
+        raise ImportError('decode_symbols_numpy requires numpy')
+
+    symbols = np.asarray(symbols, dtype=np.uint8)
+    if symbols.ndim == 1:
+        symbols = symbols[np.newaxis, :]
+    n, t = symbols.shape
+
+    bm = np.array(BRANCH_METRICS, dtype=np.int32)
+    bm0, bm1 = bm[:, :, 0], bm[:, :, 1]
+    src0 = np.array([s[0] for s in TRELLIS_SOURCE_STATES])
+    src1 = np.array([s[1] for s in TRELLIS_SOURCE_STATES])
+    inputs = np.array(TRELLIS_TRANSITION_INPUT, dtype=np.uint32)
+
+    cost = np.zeros((n, N_STATES), dtype=np.int32)
+    paths = np.zeros((n, N_STATES), dtype=np.uint32)
+    metric = np.zeros(n, dtype=np.int64)
+    out = np.zeros((n, decoded_length(t)), dtype=np.uint8)
+
+    j = 0
+    for k in range(t):
+        sym = symbols[:, k]
+        cost0 = cost[:, src0] + bm0[sym]
+        cost1 = cost[:, src1] + bm1[sym]
+        take0 = cost0 < cost1
+        cost = np.where(take0, cost0, cost1)
+        min_cost = cost.min(axis=1)
+        cost -= min_cost[:, np.newaxis]
+        metric += min_cost
+        paths = (np.where(take0, paths[:, src0], paths[:, src1]) << 1) | inputs
+
+        if k + 1 >= PATH_BITS and (k + 1 - PATH_BITS) % 8 == 0:
+            out[:, j] = (paths[:, 0] >> 24) & 0xFF
+            j += 1
+
+    return out, metric
+
+
+# Soft decision input: one value per coded bit, in air order, positive
+# for a 1 and negative for a 0, with magnitude giving the confidence.
+# Values are quantized to integers in -SOFT_MAX..SOFT_MAX.
+SOFT_BITS = 4
+SOFT_MAX = (1 << (SOFT_BITS - 1)) - 1
+
+# (destination state, source states, output symbols, input bit) per state
+_SOFT_TRELLIS = tuple(
+    (dest, src0, src1, out0, out1, TRELLIS_TRANSITION_INPUT[dest])
+    for dest, ((src0, src1), (out0, out1)) in enumerate(zip(TRELLIS_SOURCE_STATES, TRELLIS_TRANSITION_OUTPUT))
+)
+
+
+def quantize_soft(soft, scale: float = None, bits: int = SOFT_BITS):
+    """Quantizes soft values to integers in -(2**(bits-1)-1)..2**(bits-1)-1
+
+    Values are multiplied by scale and rounded; by default, scale maps
+    the mean magnitude to half of the range. A numpy array is returned
+    for numpy input, and a list otherwise.
+    """
+    top = (1 << (bits - 1)) - 1
+    if np is not None and isinstance(soft, np.ndarray):
+        if scale is None:
+            mean = float(np.abs(soft).mean()) if soft.size else 0.0
+            scale = top / (2 * mean) if mean else 1.0
+        return np.clip(np.rint(soft * scale), -top, top).astype(np.int8)
+
+    soft = list(soft)
+    if scale is None:
+        mean = sum(abs(s) for s in soft) / len(soft) if soft else 0.0
+        scale = top / (2 * mean) if mean else 1.0
+    return [max(-top, min(top, int(round(s * scale)))) for s in soft]
+
+
+class SoftViterbiDecoder():
+    """Soft decision Viterbi decoder for the CC1110 FEC code
+
+    Consumes deinterleaved, quantized soft values, two per symbol, and
+    returns the decoded bytes. A branch costs the magnitude of each soft
+    value whose sign disagrees with the branch output, so for inputs of
+    +-1 the result and metric are those of ViterbiDecoder. State carries
+    over between calls, as for ViterbiDecoder.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Returns the decoder to its initial state"""
+        self._cost = [0] * N_STATES
+        self._paths = [0] * N_STATES
+        self._path_bits = 0
+        self._pending = None
+        # Accumulated soft metric of the best path so far
+        self.metric = 0
+
+    def decode(self, soft) -> bytes:
+        """Decodes a sequence of soft values, returning any completed output bytes"""
+        trellis = _SOFT_TRELLIS
+        cost = self._cost
+        paths = self._paths
+        path_bits = self._path_bits
+        metric = self.metric
+        out = bytearray()
+
+        it = iter(soft)
+        if self._pending is not None:
+            it = itertools.chain((self._pending,), it)
+            self._pending = None
+        for hi in it:
+            lo = next(it, None)
+            if lo is None:
+                self._pending = hi
+                break
+            hi = int(hi)
+            lo = int(lo)
+            # cost of each output symbol: mismatched bits weighted by confidence
+            hi0, hi1 = (hi, 0) if hi > 0 else (0, -hi)
+            lo0, lo1 = (lo, 0) if lo > 0 else (0, -lo)
+            bm = (hi0 + lo0, hi0 + lo1, hi1 + lo0, hi1 + lo1)
+
+            nxt = [0] * N_STATES
+            nxt_paths = [0] * N_STATES
+            for dest, src0, src1, out0, out1, bit in trellis:
+                cost0 = cost[src0] + bm[out0]
+                cost1 = cost[src1] + bm[out1]
+                if cost0 < cost1:
+                    nxt[dest] = cost0
+                    nxt_paths[dest] = ((paths[src0] << 1) | bit) & PATH_MASK
+                else:
+                    nxt[dest] = cost1
+                    nxt_paths[dest] = ((paths[src1] << 1) | bit) & PATH_MASK
+            min_cost = min(nxt)
+            metric += min_cost
+            cost = [c - min_cost for c in nxt]
+            paths = nxt_paths
+
+            path_bits += 1
+            if path_bits >= PATH_BITS:
+                out.append((paths[0] >> 24) & 0xFF)
+                path_bits -= 8
+
+        self._cost = cost
+        self._paths = paths
+        self._path_bits = path_bits
+        self.metric = metric
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """Pushes the last byte still held in the traceback out of the decoder, see ViterbiDecoder.flush"""
+        return self.decode([-SOFT_MAX] * 16)
+
+
+def decode_soft_numpy(soft):
+    """Decodes soft values with numpy, running one trellis per row in lockstep
+
+    Accepts a (2T,) or (N, 2T) integer array of deinterleaved, quantized
+    soft values and returns a tuple of the decoded (N, decoded_length(T))
+    uint8 array and the (N,) path metrics. Results are identical to
+    SoftViterbiDecoder for every row.
+    """
+    if np is None:
+        raise ImportError('decode_soft_numpy requires numpy')
+
+    soft = np.asarray(soft, dtype=np.int32)
+    if soft.ndim == 1:
+        soft = soft[np.newaxis, :]
+    n, t2 = soft.shape
+    if t2 % 2:
+        raise ValueError('soft values must come in pairs')
+    t = t2 // 2
+
+    hi, lo = soft[:, 0::2], soft[:, 1::2]
+    hi0, hi1 = np.maximum(hi, 0), np.maximum(-hi, 0)
+    lo0, lo1 = np.maximum(lo, 0), np.maximum(-lo, 0)
+    # bm[:, k, symbol] is the cost of output symbol at step k
+    bm = np.stack([hi0 + lo0, hi0 + lo1, hi1 + lo0, hi1 + lo1], axis=-1)
+
+    src0 = np.array([s[0] for s in TRELLIS_SOURCE_STATES])
+    src1 = np.array([s[1] for s in TRELLIS_SOURCE_STATES])
+    out0 = np.array([o[0] for o in TRELLIS_TRANSITION_OUTPUT])
+    out1 = np.array([o[1] for o in TRELLIS_TRANSITION_OUTPUT])
+    inputs = np.array(TRELLIS_TRANSITION_INPUT, dtype=np.uint32)
+    bm0 = bm[:, :, out0]
+    bm1 = bm[:, :, out1]
+
+    cost = np.zeros((n, N_STATES), dtype=np.int32)
+    paths = np.zeros((n, N_STATES), dtype=np.uint32)
+    metric = np.zeros(n, dtype=np.int64)
+    out = np.zeros((n, decoded_length(t)), dtype=np.uint8)
+
+    j = 0
+    for k in range(t):
+        cost0 = cost[:, src0] + bm0[:, k]
+        cost1 = cost[:, src1] + bm1[:, k]
+        take0 = cost0 < cost1
+        cost = np.where(take0, cost0, cost1)
+        min_cost = cost.min(axis=1)
+        cost -= min_cost[:, np.newaxis]
+        metric += min_cost
+        paths = (np.where(take0, paths[:, src0], paths[:, src1]) << 1) | inputs
+
+        if k + 1 >= PATH_BITS and (k + 1 - PATH_BITS) % 8 == 0:
+            out[:, j] = (paths[:, 0] >> 24) & 0xFF
+            j += 1
+
+    return out, metric
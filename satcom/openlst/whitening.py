@@ -7,14 +7,22 @@
 #
 # This code was copied from https://github.com/rzimmerman/gr-openlst at
 # commit 09ba2480de7f5f620f398f387ab402bbf75fa64e
-# 
+#
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it speeds up in-place whitening
+    np = None
 
-def pn9():
-    """pn9 returns a generator that yields a PN9 sequence
-    
-    This can be XORed with a data stream to perform CC1110 whitening
-    or dewhitening.
-    """
+
+# The PN9 LFSR has a period of 511 steps. Each output byte advances it 8
+# steps and 8 is coprime with 511, so the byte sequence repeats every
+# 511 bytes as well.
+PN9_PERIOD = 511
+
+
+def _pn9_lfsr():
+    """Yields the PN9 sequence by stepping the LFSR 8 times per byte"""
     state = 0b111111111
     while True:
         yield state & 0xff
@@ -23,12 +31,128 @@ def pn9():
             state = (state >> 1) | (new_bit << 8)
 
 
+def _make_keystream(n: int) -> bytes:
+    """Returns the first n bytes of the PN9 sequence"""
+    gen = _pn9_lfsr()
+    return bytes(next(gen) for _ in range(n))
+
+
+PN9_SEQUENCE = _make_keystream(PN9_PERIOD)
+
+# Keystream for buffers up to this length starting at any offset is
+# served by slicing a single precomputed buffer
+_KEYSTREAM_MAX = 4096
+_KEYSTREAM = PN9_SEQUENCE * ((_KEYSTREAM_MAX + PN9_PERIOD) // PN9_PERIOD + 1)
+
+
+def keystream(offset: int, n: int) -> bytes:
+    """Returns n bytes of the PN9 sequence starting at the given offset"""
+    offset %= PN9_PERIOD
+    if n <= _KEYSTREAM_MAX:
+        return _KEYSTREAM[offset:offset+n]
+    repeats = (offset + n) // PN9_PERIOD + 1
+    return (PN9_SEQUENCE * repeats)[offset:offset+n]
+
+
+class PN9():
+    """Iterator over the PN9 sequence that tracks its position
+
+    whiten() recognizes this iterator and XORs whole buffers against the
+    precomputed sequence, advancing the position by the buffer length.
+    """
+
+    def __init__(self, offset: int = 0):
+        self.offset = offset % PN9_PERIOD
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        b = PN9_SEQUENCE[self.offset]
+        self.offset = (self.offset + 1) % PN9_PERIOD
+        return b
+
+    def take(self, n: int) -> bytes:
+        """Returns the next n bytes of the sequence"""
+        ks = keystream(self.offset, n)
+        self.offset = (self.offset + n) % PN9_PERIOD
+        return ks
+
+
+def pn9():
+    """pn9 returns an iterator that yields a PN9 sequence
+
+    This can be XORed with a data stream to perform CC1110 whitening
+    or dewhitening.
+    """
+    return PN9()
+
+
+def _take_keystream(n: int, gen) -> bytes:
+    """Returns n keystream bytes from gen, or from the sequence start if gen is None"""
+    if gen is None:
+        return keystream(0, n)
+    if isinstance(gen, PN9):
+        return gen.take(n)
+    # arbitrary iterators are consumed byte by byte
+    return bytes(p for _, p in zip(range(n), gen))
+
+
+def _xor(a, b) -> bytes:
+    """XORs two equal length buffers as big integers"""
+    v = int.from_bytes(a, byteorder='little') ^ int.from_bytes(b, byteorder='little')
+    return v.to_bytes(len(b), byteorder='little')
+
+
 def whiten(raw: bytes, gen=None):
     """Whiten/dewhiten data
-    
+
     If the gen argument is supplied, an existing pn9 generator can
     be used.
     """
-    if gen is None:
-        gen = pn9()
-    return bytes([r ^ p for r, p in zip(raw, gen)])
\ No newline at end of file
+    n = len(raw)
+    ks = _take_keystream(n, gen)
+    if len(ks) < n:
+        # like zip(), stop when the generator runs out
+        raw = raw[:len(ks)]
+    return _xor(raw, ks)
+
+
+def whiten_inplace(buf, gen=None):
+    """Whiten/dewhiten a bytearray or writable memoryview in place
+
+    If the gen argument is supplied, an existing pn9 generator can
+    be used.
+    """
+    mv = memoryview(buf).cast('B')
+    n = len(mv)
+    ks = _take_keystream(n, gen)
+    if len(ks) < n:
+        raise ValueError('keystream generator exhausted')
+    if np is not None:
+        arr = np.frombuffer(mv, dtype=np.uint8)
+        arr ^= np.frombuffer(ks, dtype=np.uint8)
+    else:
+        mv[:] = _xor(mv, ks)
+
+
+def whiten_soft(soft, gen=None):
+    """Whiten/dewhiten soft values, one per bit with positive for a 1
+
+    Whitening flips the bits where the keystream is 1, so those values
+    change sign. The length must be a multiple of 8. A numpy array is
+    returned for numpy input, and a list otherwise.
+    """
+    n = len(soft)
+    if n % 8 != 0:
+        raise ValueError('soft values must be a multiple of 8')
+    ks = _take_keystream(n // 8, gen)
+    if len(ks) < n // 8:
+        raise ValueError('keystream generator exhausted')
+    if np is not None and isinstance(soft, np.ndarray):
+        flip = np.unpackbits(np.frombuffer(ks, dtype=np.uint8)).astype(bool)
+        return np.where(flip, -soft, soft)
+    return [
+        -s if (ks[i >> 3] >> (7 - (i & 7))) & 1 else s
+        for i, s in enumerate(soft)
+    ]
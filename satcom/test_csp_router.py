@@ -0,0 +1,207 @@
+import asyncio
+import concurrent.futures
+import threading
+import unittest
+from satcom import csp_router
+from satcom import csp_v1 as csp
+
+def make_packet(destination: int, port: int, priority: int = 2, data: bytes = b'') -> bytes:
+    """Builds an encoded CSP packet"""
+    hdr = csp.PacketHeader(
+        priority=priority,
+        destination=destination,
+        destination_port=port,
+        source=1,
+        source_port=10
+    )
+    return csp.Packet(data, hdr).to_bytes()
+
+class TestCSPRouter(unittest.TestCase):
+
+    def test_route_bindings(self):
+        """Verifies specific bindings take precedence over wildcards"""
+        got = []
+        router = csp_router.CSPRouter()
+        router.bind(lambda p: got.append(('any', p.header.destination, p.header.destination_port)))
+        router.bind(lambda p: got.append(('addr', p.header.destination, p.header.destination_port)), destination=5)
+        router.bind(lambda p: got.append(('port', p.header.destination, p.header.destination_port)), destination=5, port=7)
+
+        for dst, port in [(5, 7), (5, 8), (6, 7)]:
+            self.assertTrue(router.route(make_packet(dst, port)))
+        router.dispatch()
+
+        self.assertEqual(got, [('port', 5, 7), ('addr', 5, 8), ('any', 6, 7)])
+
+        router.unbind(destination=5, port=7)
+        router.unbind()
+        self.assertIsNotNone(router.handler(5, 7))
+        self.assertIsNone(router.handler(6, 7))
+        self.assertFalse(router.route(make_packet(6, 7)))
+        self.assertEqual(router.unrouted, 1)
+
+    def test_priority_order(self):
+        """Verifies packets are dispatched by priority, then in arrival order"""
+        got = []
+        router = csp_router.CSPRouter()
+        router.bind(lambda p: got.append((p.header.priority, p.data)), destination=3)
+
+        for i, prio in enumerate([3, 2, 0, 3, 1, 0]):
+            router.route(make_packet(3, 1, prio, bytes([i])))
+        self.assertEqual(router.pending, 6)
+        self.assertEqual(router.dispatch(limit=2), 2)
+        router.dispatch()
+
+        want = [(0, b'\x02'), (0, b'\x05'), (1, b'\x04'), (2, b'\x01'), (3, b'\x00'), (3, b'\x03')]
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(router.pending, 0)
+
+    def test_bounded_queues(self):
+        """Verifies each address and port queues at most queue_size packets"""
+        router = csp_router.CSPRouter(queue_size=2)
+        router.bind(lambda p: None)
+
+        got = [router.route(make_packet(1, 1)) for _ in range(3)]
+        got.append(router.route(make_packet(1, 2)))
+
+        self.assertEqual(got, [True, True, False, True])
+        self.assertEqual(router.dropped, 1)
+        router.dispatch()
+        self.assertTrue(router.route(make_packet(1, 1)))
+
+    def test_route_packet_objects(self):
+        """Verifies decoded packets are routed like encoded ones"""
+        got = []
+        router = csp_router.CSPRouter()
+        router.bind(got.append, destination=9, port=2)
+        pkt = csp.Packet.from_bytes(make_packet(9, 2, data=b'abc'))
+
+        self.assertEqual(router.route_batch([pkt, make_packet(9, 2, data=b'def'), make_packet(9, 3)]), 2)
+        router.dispatch()
+
+        self.assertIs(got[0], pkt)
+        self.assertEqual(got[1].data, b'def')
+
+    def test_dispatch_executor(self):
+        """Verifies handlers run on the executor"""
+        threads = set()
+        done = threading.Barrier(3)
+        router = csp_router.CSPRouter(executor=concurrent.futures.ThreadPoolExecutor(2))
+
+        def handler(pkt):
+            threads.add(threading.get_ident())
+            done.wait(timeout=5)
+
+        router.bind(handler)
+        router.route(make_packet(1, 1))
+        router.route(make_packet(2, 2))
+        router.dispatch()
+        done.wait(timeout=5)
+        router.executor.shutdown()
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_dispatch_executor_failures(self):
+        """Verifies exceptions raised by handlers on the executor are counted"""
+        router = csp_router.CSPRouter(executor=concurrent.futures.ThreadPoolExecutor(2))
+
+        def handler(pkt):
+            if pkt.header.destination == 2:
+                raise RuntimeError('handler failed')
+
+        router.bind(handler)
+        for dst in (1, 2, 3, 2):
+            router.route(make_packet(dst, 1))
+        self.assertEqual(router.dispatch(), 4)
+        router.executor.shutdown()
+
+        self.assertEqual(router.failed, 2)
+        self.assertIsInstance(router.last_error, RuntimeError)
+
+    def test_serve_handler_failures(self):
+        """Verifies serve counts handler exceptions and keeps dispatching"""
+        got = []
+
+        async def handler(pkt):
+            if pkt.header.destination_port == 1:
+                raise RuntimeError('boom')
+            got.append(pkt.header.destination_port)
+
+        def plain(pkt):
+            raise ValueError('bad packet')
+
+        async def run():
+            router = csp_router.CSPRouter()
+            router.bind(handler, destination=4)
+            router.bind(plain, destination=5)
+            for dst, port in ((4, 0), (4, 1), (5, 0), (4, 2), (4, 3)):
+                router.route(make_packet(dst, port))
+            task = asyncio.ensure_future(router.serve())
+            while router.pending or len(got) < 3:
+                await asyncio.sleep(0.001)
+            self.assertFalse(task.done())
+            task.cancel()
+            return router
+
+        router = asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertEqual(got, [0, 2, 3])
+        self.assertEqual(router.failed, 2)
+        self.assertIsInstance(router.last_error, ValueError)
+
+        router.bind(plain)
+        router.route(make_packet(1, 1))
+        self.assertEqual(router.dispatch(), 1)
+        self.assertEqual(router.failed, 3)
+
+    def test_dispatch_async_executor_concurrent(self):
+        """Verifies dispatch_async runs executor handlers concurrently, up to max_in_flight"""
+        both = threading.Barrier(2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def handler(pkt):
+            with lock:
+                active.append(pkt)
+                peak.append(len(active))
+            if pkt.header.destination < 2:
+                both.wait(timeout=5)
+            with lock:
+                active.remove(pkt)
+
+        async def run():
+            executor = concurrent.futures.ThreadPoolExecutor(4)
+            router = csp_router.CSPRouter(executor=executor, max_in_flight=2)
+            router.bind(handler)
+            for dst in range(6):
+                router.route(make_packet(dst, 1))
+            n = await router.dispatch_async()
+            executor.shutdown()
+            return router, n
+
+        router, n = asyncio.run(asyncio.wait_for(run(), 10))
+        self.assertEqual(n, 6)
+        self.assertEqual(router.failed, 0)
+        self.assertEqual(max(peak), 2)
+
+    def test_serve(self):
+        """Verifies serve awaits coroutine handlers as packets are routed"""
+        got = []
+
+        async def handler(pkt):
+            await asyncio.sleep(0)
+            got.append(pkt.header.destination_port)
+
+        async def run():
+            router = csp_router.CSPRouter()
+            router.bind(handler, destination=4)
+            task = asyncio.ensure_future(router.serve())
+            for port in range(5):
+                router.route(make_packet(4, port))
+                await asyncio.sleep(0)
+            while router.pending or len(got) < 5:
+                await asyncio.sleep(0.001)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertEqual(got, [0, 1, 2, 3, 4])
@@ -45,4 +45,170 @@ class TestPacket(unittest.TestCase):
         want = bytearray(b'H \xc5\x00foobar')
 
         self.assertIsNone(pkt.err(), msg=pkt.err())
-        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
\ No newline at end of file
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+
+    def test_packet_header_pack_into(self):
+        """Verifies CSP PacketHeader packs and unpacks at an offset"""
+        ph = csp.PacketHeader(
+            priority=2,
+            destination=24,
+            destination_port=1,
+            source=10,
+            source_port=63
+        )
+        buf = bytearray(6)
+
+        ph.pack_into(buf, 1)
+
+        want = bytearray([0x00, 0x95, 0x80, 0x7F, 0x00, 0x00])
+        self.assertEqual(buf, want, f'unexpected result: want={want} got={buf}')
+        self.assertEqual(csp.PacketHeader.unpack_from(buf, 1), ph)
+
+    def test_packet_view(self):
+        """Verifies CSP PacketView decodes fields without copying"""
+        bs = bytearray([0x95, 0x80, 0x5C, 0x00, 0x66, 0x6F, 0x6F])
+
+        view = csp.PacketView(bs)
+
+        want = csp.PacketHeader.from_bytes(bs[:4])
+        got = csp.PacketHeader(
+            priority=view.priority,
+            destination=view.destination,
+            destination_port=view.destination_port,
+            source=view.source,
+            source_port=view.source_port
+        )
+        self.assertEqual(got, want, f'unexpected result: want={want} got={got}')
+        self.assertEqual(view.header, want)
+        self.assertEqual(view.data, b'foo')
+        self.assertEqual(view.to_packet().to_bytes(), bytes(bs))
+
+    def test_packet_header_round_trip(self):
+        """Verifies every field value survives encode and decode"""
+        for prio in range(4):
+            for addr in range(32):
+                for port in range(64):
+                    ph = csp.PacketHeader(
+                        priority=prio,
+                        destination=addr,
+                        destination_port=port,
+                        source=31 - addr,
+                        source_port=63 - port
+                    )
+                    got = csp.PacketHeader.from_bytes(ph.to_bytes())
+                    self.assertEqual(got, ph, f'unexpected result: want={ph} got={got}')
+
+    def test_route_keys(self):
+        """Verifies route keys match the decoded destination and destination_port"""
+        headers = [
+            csp.PacketHeader(priority=i % 4, destination=i % 32, destination_port=(i * 7) % 64, source=5, source_port=9)
+            for i in range(200)
+        ]
+        pkts = [csp.Packet(bytes([i]) * (i % 5), hdr).to_bytes() for i, hdr in enumerate(headers)]
+        buf = b''.join(pkts)
+        offsets = []
+        offset = 0
+        for pkt in pkts:
+            offsets.append(offset)
+            offset += len(pkt)
+
+        want = [(hdr.destination << csp.FLEN_PORT) | hdr.destination_port for hdr in headers]
+
+        self.assertEqual([int(k) for k in csp.route_keys(buf, offsets)], want)
+        self.assertEqual(csp.packet_route_keys(pkts), want)
+        self.assertEqual(csp.route_key(buf, offsets[33]), want[33])
+
+    def test_route_keys_without_numpy(self):
+        """Verifies route keys are computed without numpy"""
+        bs = bytes([0x95, 0x80, 0x5C, 0x00]) * 3
+
+        np = csp.np
+        csp.np = None
+        try:
+            got = csp.route_keys(bs, [0, 4, 8])
+        finally:
+            csp.np = np
+
+        self.assertEqual(got, [(24 << csp.FLEN_PORT) | 1] * 3)
+
+    def test_packet_header_flags(self):
+        """Verifies flags are encoded and decoded"""
+        ph = csp.PacketHeader(priority=1, destination=3, source=4, flags=csp.FLAG_CRC32 | csp.FLAG_HMAC)
+
+        got = ph.to_bytes()
+
+        self.assertEqual(got[3], 0x09)
+        self.assertEqual(csp.PacketHeader.from_bytes(got), ph)
+        self.assertEqual(csp.PacketView(got).flags, 0x09)
+        self.assertIsInstance(csp.PacketHeader(flags=256).err(), ValueError)
+
+    def test_crc32c(self):
+        """Verifies CRC32C against the standard check value"""
+        self.assertEqual(csp.crc32c(b'123456789'), 0xE3069283)
+        self.assertEqual(csp.crc32c(b'6789', csp.crc32c(b'12345')), 0xE3069283)
+
+    def test_encode_decode_trailers(self):
+        """Verifies CRC32 and HMAC trailers are appended, verified and removed"""
+        key = csp.HMACKey(b'not so secret')
+        hdr = csp.PacketHeader(priority=2, destination=8, destination_port=7, source=1, source_port=2,
+                               flags=csp.FLAG_CRC32 | csp.FLAG_HMAC)
+        pkt = csp.Packet(b'hello world', hdr)
+
+        for include_header in (False, True):
+            bs = csp.encode_packet(pkt, key, include_header)
+            self.assertEqual(len(bs), 4 + 11 + 4 + 4)
+            start = 0 if include_header else 4
+            self.assertEqual(int.from_bytes(bs[-4:], 'big'), csp.crc32c(bs[start:-4]))
+
+            got = csp.decode_packet(bs, key, include_header)
+            self.assertEqual(got.header, hdr)
+            self.assertEqual(got.data, b'hello world')
+
+            bad = bytearray(bs)
+            bad[6] ^= 0x01
+            with self.assertRaises(ValueError):
+                csp.decode_packet(bytes(bad), key, include_header)
+
+        # a valid CRC over a forged HMAC
+        bs = bytearray(csp.encode_packet(pkt, csp.HMACKey(b'guess')))
+        with self.assertRaises(ValueError):
+            csp.decode_packet(bytes(bs), key)
+
+        with self.assertRaises(ValueError):
+            csp.encode_packet(pkt)
+
+    def test_fragment_reassemble(self):
+        """Verifies data is fragmented and reassembled in a reused buffer"""
+        data = bytes(range(256)) * 3
+        hdr = csp.PacketHeader(destination=8, destination_port=7, flags=csp.FLAG_CRC32)
+        r = csp.Reassembler(1024)
+
+        pkts = csp.fragment(data, hdr, 100)
+        self.assertEqual(len(pkts), 8)
+
+        for _ in range(2):
+            got = []
+            for pkt in pkts:
+                self.assertTrue(pkt.header.flags & csp.FLAG_FRAG)
+                wire = csp.decode_packet(csp.encode_packet(pkt))
+                got.append(r.feed(wire))
+            self.assertEqual(got[:-1], [None] * 7)
+            self.assertEqual(got[-1], data)
+
+        # a lost fragment abandons the data in progress, counted once
+        # together with the fragment that showed it, and each later one
+        got = [r.feed(pkt) for pkt in pkts[:3] + pkts[4:] + pkts]
+        self.assertEqual(got[-1], data)
+        self.assertEqual(got[:-1], [None] * (len(got) - 1))
+        self.assertEqual(r.discarded, 4)
+
+        # a new transfer abandons the data in progress
+        got = [r.feed(pkt) for pkt in pkts[:3] + pkts]
+        self.assertEqual(got[-1], data)
+        self.assertEqual(r.discarded, 5)
+        r.feed(pkts[0])
+        r.reset()
+        self.assertEqual(r.discarded, 6)
+
+        with self.assertRaises(ValueError):
+            csp.Reassembler(100).feed(pkts[0])
@@ -1,21 +1,33 @@
 import struct
 
+# precompiled codecs, so callers do not re-parse a format string per call
+USHORT_LITTLE_ENDIAN = struct.Struct('<H') # little endian, unsigned short
+USHORT_BIG_ENDIAN = struct.Struct('>H') # big endian, unsigned short
+UINT_BIG_ENDIAN = struct.Struct('>I') # big endian, unsigned int
+
 def pack_ushort_little_endian(i: input) -> bytearray:
     """Helper to pack uint16 into a bytearray with little endian mapping"""
-    return bytearray(struct.pack('<H', i)) # little endian, unsigned short
+    return bytearray(USHORT_LITTLE_ENDIAN.pack(i))
 
 def pack_ushort_big_endian(i: int) -> bytearray:
     """Helper to pack uint16 into a bytearray using big endian mapping"""
-    return bytearray(struct.pack('>H', i)) # big endian, unsigned short
+    return bytearray(USHORT_BIG_ENDIAN.pack(i))
 
 def unpack_ushort_little_endian(bs: bytearray) -> int:
     """Helper to extract uint16 from bytearray using little endian mapping"""
-    return struct.unpack('<H', bs)[0] # little endian, unsigned short
+    return USHORT_LITTLE_ENDIAN.unpack(bs)[0]
 
 def pack_uint_big_endian(i: int) -> bytearray:
     """Helper to pack uint32 into a bytearray using big endian mapping"""
-    return bytearray(struct.pack('>I', i)) # big endian, unsigned int
+    return bytearray(UINT_BIG_ENDIAN.pack(i))
 
 def unpack_uint_big_endian(bs: bytearray) -> int:
     """Helper to extract uint32 from a bytearray using big endian mapping"""
-    return struct.unpack('>I', bs)[0] # big endian, unsigned int
\ No newline at end of file
+    return UINT_BIG_ENDIAN.unpack(bs)[0]
+
+def byte_view(buf) -> memoryview:
+    """Helper to view any buffer as a flat memoryview of unsigned bytes"""
+    mv = memoryview(buf)
+    if mv.format != 'B' or mv.ndim != 1:
+        mv = mv.cast('B')
+    return mv